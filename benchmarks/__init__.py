@@ -0,0 +1,8 @@
+"""
+Benchmarks for the MultiAgentRegistryKit framework.
+
+Each module in this package is a standalone script that measures the framework's
+own overhead. Run them from the repository root, e.g. python -m benchmarks.bench_startup,
+or run the whole suite with python -m benchmarks.run_all. Model calls go to the
+deterministic fake model in benchmarks.fake_model, so no AWS access is needed.
+"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrency Benchmark - Many sessions served concurrently on one event loop.
+
+This script runs a number of simulated users, each holding a multi-turn
+conversation in its own session, against a single RouterAgent with the fake
+model. Every turn routes the query and processes it with the selected agent
+using the asyncio API. It reports throughput, turn latency, the routing
+statistics and the session store size.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_concurrency [--sessions 1 10 100] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.core.router_agent import RouterAgent
+
+from .common import sample_queries, summarize_latencies, write_results
+from .fake_model import FakeModelProvider
+
+
+async def run_session(router, session_id, queries, latencies):
+    """
+    Play one user's conversation.
+
+    Args:
+        router (RouterAgent): The shared router
+        session_id (str): Identifier of the session
+        queries (List[str]): The user's queries
+        latencies (List[float]): List to append the turn latencies to
+    """
+    current = None
+    for query in queries:
+        began = time.perf_counter()
+        decision = await router.adecide(query, current)
+        agent = router.get_agent(decision.agent_name)
+        await agent.aprocess_query(query, session_id)
+        latencies.append(time.perf_counter() - began)
+        current = decision.agent_name
+
+
+async def run_sessions(model, sessions, turns, seed=0):
+    """
+    Serve a number of concurrent sessions.
+
+    Args:
+        model: The language model
+        sessions (int): Number of concurrent sessions
+        turns (int): Turns per session
+        seed (int): Seed of the query generator
+
+    Returns:
+        dict: Throughput, latency summary and router statistics
+    """
+    router = RouterAgent(model=model)
+    router.routing_prompt
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_session(
+                router, f"session-{index}", sample_queries(turns, seed + index), latencies
+            )
+            for index in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    stats = router.get_routing_stats()
+    return {
+        "sessions": sessions,
+        "turns_per_session": turns,
+        "turns_per_second": len(latencies) / elapsed,
+        "latency": summarize_latencies(latencies),
+        "model_routing_calls": stats["model"],
+        "session_store": router.session_store.get_stats(),
+    }
+
+
+def run(sessions=(1, 10, 100), turns=10, latency=0.05, tokens_per_second=None):
+    """
+    Run the benchmark for every number of concurrent sessions.
+
+    Args:
+        sessions (Sequence[int]): Numbers of concurrent sessions
+        turns (int): Turns per session
+        latency (float): Simulated model latency in seconds
+        tokens_per_second (Optional[float]): Simulated generation speed
+
+    Returns:
+        list: Results per number of sessions
+    """
+    model = FakeModelProvider(
+        latency=latency, tokens_per_second=tokens_per_second
+    ).create_model()
+    return [asyncio.run(run_sessions(model, count, turns)) for count in sessions]
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Simulated model latency in seconds"
+    )
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.sessions, args.turns, args.latency, args.tokens_per_second)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "latency": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+        }
+        write_results(args.output, "concurrency", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Math Benchmark - Local evaluation of math queries versus model calls.
+
+This benchmark sends math queries to a MathAgent backed by the fake model,
+with a simulated model latency, once with local evaluation enabled and once
+with it disabled. It reports how many queries the local evaluator answered
+and the latency of a turn with each setting, so the saving of answering
+calculations without a model call can be compared with its cost on queries
+that still go to the model.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_math [--repeats 20] [--latency 0.2]
+"""
+
+import argparse
+import json
+import time
+
+from src.agents.math_agent import MathAgent
+from src.config.model_config import MATH_CONFIG
+from src.core import math_evaluator
+
+from .common import summarize_latencies, write_results
+from .fake_model import FakeModelProvider
+
+# Calculations the local evaluator is expected to answer
+CALCULATIONS = [
+    "what is 2+2",
+    "calculate 15% of 80",
+    "what is 37*91",
+    "37 times 91",
+    "what is the square root of 144",
+    "(3 + 4) * 12 / 7",
+    "2^10 - 1",
+    "solve 3x + 5 = 20",
+    "solve 12x + 7 = 0",
+]
+
+# Queries the model has to answer
+PROBLEMS = [
+    "find the sum of two numbers",
+    "what is the probability of rolling two sixes",
+    "explain why the square root of 2 is irrational",
+]
+
+
+def measure(queries, model, repeats, local):
+    """
+    Measure turns of a MathAgent.
+
+    Args:
+        queries (list): The queries to send
+        model: The language model
+        repeats (int): Number of times every query is sent
+        local (bool): Whether local evaluation is enabled
+
+    Returns:
+        dict: Latency summary of all turns and of the locally answered ones
+    """
+    agent = MathAgent(model)
+    enabled = MATH_CONFIG["local_evaluation"]
+    MATH_CONFIG["local_evaluation"] = local
+    latencies = []
+    local_latencies = []
+    try:
+        for _ in range(repeats):
+            for query in queries:
+                answered = local and math_evaluator.answer(query) is not None
+                started = time.perf_counter()
+                agent.process_query(query)
+                latency = time.perf_counter() - started
+                latencies.append(latency)
+                if answered:
+                    local_latencies.append(latency)
+                agent.reset_conversation()
+    finally:
+        MATH_CONFIG["local_evaluation"] = enabled
+    return {
+        "all": summarize_latencies(latencies),
+        "local": summarize_latencies(local_latencies) if local_latencies else None,
+    }
+
+
+def run(repeats=20, latency=0.2):
+    """
+    Run the benchmark.
+
+    Args:
+        repeats (int): Number of times every query is sent per setting
+        latency (float): Simulated seconds per model call
+
+    Returns:
+        dict: Local answer coverage and turn latency with and without local
+              evaluation
+    """
+    model = FakeModelProvider(latency=latency).create_model()
+    queries = CALCULATIONS + PROBLEMS
+    answered = [query for query in queries if math_evaluator.answer(query) is not None]
+    results = {
+        "queries": len(queries),
+        "answered_locally": len(answered),
+        "coverage": len(answered) / len(queries),
+        "sympy": math_evaluator.sympy is not None,
+        "local": measure(queries, model, repeats, local=True),
+        "model_only": measure(queries, model, repeats, local=False),
+    }
+    results["speedup"] = (
+        results["model_only"]["all"]["mean_ms"] / results["local"]["all"]["mean_ms"]
+    )
+    return results
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.repeats, args.latency)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {"repeats": args.repeats, "latency": args.latency}
+        write_results(args.output, "math", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Memory Benchmark - Memory held by resident conversation histories.
+
+This benchmark compares the memory of conversation histories stored in two
+representations, measured with tracemalloc over many simulated sessions:
+- "langchain": one LangChain message object per history message, as
+  conversation states stored before MessageRecord was introduced
+- "records": one slotted MessageRecord per history message
+
+Both share the same content strings, which are created before measuring, so
+the reported memory is the overhead of each representation; the size of the
+content is reported for comparison. It also measures whole ConversationState
+objects with their message views built, as for hot sessions, and released, as
+for idle ones.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_memory [--sessions 1000] [--turns 20]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.core.conversation_state import ConversationState
+from src.core.message_record import MessageRecord, Role
+
+from .common import write_results
+
+SYSTEM_PROMPT = "You are a helpful assistant. Answer clearly and concisely."
+
+
+def make_contents(sessions, turns):
+    """
+    Generate the text of every message of every session.
+
+    Args:
+        sessions (int): Number of sessions
+        turns (int): Number of exchanges per session
+
+    Returns:
+        list: Per session, a list of (query, answer) pairs
+    """
+    return [
+        [
+            (
+                f"Session {session} question {turn}: what about topic {turn}?",
+                f"Answer {turn}: " + "lorem ipsum " * 10,
+            )
+            for turn in range(turns)
+        ]
+        for session in range(sessions)
+    ]
+
+
+def build_langchain(contents):
+    """
+    Build histories of LangChain messages.
+
+    Args:
+        contents (list): Message texts per session
+
+    Returns:
+        list: One message list per session
+    """
+    return [
+        [
+            message
+            for query, answer in exchanges
+            for message in (HumanMessage(content=query), AIMessage(content=answer))
+        ]
+        for exchanges in contents
+    ]
+
+
+def build_records(contents):
+    """
+    Build histories of message records.
+
+    Args:
+        contents (list): Message texts per session
+
+    Returns:
+        list: One record list per session
+    """
+    return [
+        [
+            record
+            for query, answer in exchanges
+            for record in (
+                MessageRecord(Role.HUMAN, query, len(query) // 4 + 4),
+                MessageRecord(Role.AI, answer, len(answer) // 4 + 4),
+            )
+        ]
+        for exchanges in contents
+    ]
+
+
+def build_states(contents, hot):
+    """
+    Build conversation states holding the histories.
+
+    Args:
+        contents (list): Message texts per session
+        hot (bool): Whether to build the message view of every state
+
+    Returns:
+        list: One conversation state per session
+    """
+    states = []
+    for exchanges in contents:
+        state = ConversationState(token_budget=None)
+        for query, answer in exchanges:
+            state.add_message(HumanMessage(content=query))
+            state.add_message(AIMessage(content=answer))
+        if hot:
+            state.messages_for(SYSTEM_PROMPT, HumanMessage(content="next query"))
+        states.append(state)
+    return states
+
+
+def traced_bytes(build, contents):
+    """
+    Measure the memory allocated by a build function and still held.
+
+    Args:
+        build (Callable): Builds the structure from the contents
+        contents (list): Message texts per session
+
+    Returns:
+        int: Bytes held by the structure, excluding the contents
+    """
+    gc.collect()
+    tracemalloc.start()
+    held = build(contents)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def run(sessions=1000, turns=20):
+    """
+    Run the benchmark.
+
+    Args:
+        sessions (int): Number of simulated sessions
+        turns (int): Number of exchanges per session
+
+    Returns:
+        dict: Memory in bytes by representation, per message and in total
+    """
+    contents = make_contents(sessions, turns)
+    messages = sessions * turns * 2
+    content_bytes = sum(
+        len(query.encode()) + len(answer.encode())
+        for exchanges in contents
+        for query, answer in exchanges
+    )
+
+    builds = {
+        "langchain": build_langchain,
+        "records": build_records,
+        "state_hot": lambda contents: build_states(contents, hot=True),
+        "state_cold": lambda contents: build_states(contents, hot=False),
+    }
+    results = {"sessions": sessions, "messages": messages, "content_bytes": content_bytes}
+    for name, build in builds.items():
+        held = traced_bytes(build, contents)
+        results[name] = {"bytes": held, "bytes_per_message": held / messages}
+    results["records_saving"] = (
+        1 - results["records"]["bytes"] / results["langchain"]["bytes"]
+    )
+    return results
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.sessions, args.turns)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {"sessions": args.sessions, "turns": args.turns}
+        write_results(args.output, "memory", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
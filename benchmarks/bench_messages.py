@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Message Building Benchmark - Prompt construction cost on long histories.
+
+This micro-benchmark compares two ways of producing the message list sent to
+the model for a new query on a conversation of many turns, without calling a
+model:
+- "rebuild": the previous approach, which creates a new system message and
+  converts the history into a fresh list message by message every turn, then
+  creates the query message a second time when recording the exchange
+- "incremental": ConversationState.messages_for, which keeps the system
+  message and the history as a ready-to-send prefix, so a turn costs a single
+  list copy and the query message sent is the one stored
+
+For each history length it reports the latency of building the list and of
+a whole turn (building plus recording the exchange).
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_messages [--turns 1000] [--samples 200]
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.core.conversation_state import ConversationState
+
+from .common import summarize_latencies, write_results
+
+SYSTEM_PROMPT = "You are a helpful assistant. Answer clearly and concisely."
+
+
+def rebuild_messages(query, state):
+    """
+    Build the message list the way agents did before it was maintained
+    incrementally.
+
+    Args:
+        query (str): The user's query
+        state (ConversationState): The conversation state
+
+    Returns:
+        list: The system prompt, the conversation history and the query
+    """
+    system_prompt = SYSTEM_PROMPT
+    if state.summary:
+        system_prompt += f"\n\nSummary of the earlier conversation:\n{state.summary}"
+    messages = [SystemMessage(content=system_prompt)]
+    for record in state.message_history:
+        messages.append(record.to_message())
+    messages.append(HumanMessage(content=query))
+    return messages
+
+
+def rebuild_turn(query, answer, state):
+    """
+    Play one turn with the rebuilding approach.
+
+    Args:
+        query (str): The user's query
+        answer (str): The simulated response
+        state (ConversationState): The conversation state
+    """
+    rebuild_messages(query, state)
+    state.add_message(HumanMessage(content=query))
+    state.add_message(AIMessage(content=answer))
+
+
+def incremental_turn(query, answer, state):
+    """
+    Play one turn with the incrementally maintained message list.
+
+    Args:
+        query (str): The user's query
+        answer (str): The simulated response
+        state (ConversationState): The conversation state
+    """
+    messages = state.messages_for(SYSTEM_PROMPT, HumanMessage(content=query))
+    state.add_message(messages[-1])
+    state.add_message(AIMessage(content=answer))
+
+
+def make_state(turns):
+    """
+    Create an unbounded conversation state holding a number of turns.
+
+    Args:
+        turns (int): Number of exchanges in the history
+
+    Returns:
+        ConversationState: The state
+    """
+    state = ConversationState(token_budget=None)
+    for turn in range(turns):
+        state.add_message(HumanMessage(content=f"Question {turn}: about topic {turn}"))
+        state.add_message(AIMessage(content=f"Answer {turn}: " + "lorem ipsum " * 20))
+    return state
+
+
+def measure(turns, samples):
+    """
+    Measure both approaches on a history of a given length.
+
+    Args:
+        turns (int): Number of exchanges in the history
+        samples (int): Number of measured builds and turns per approach
+
+    Returns:
+        dict: Build and turn latency by approach, and the build speedup
+    """
+    build_steps = {
+        "rebuild": lambda query, state: rebuild_messages(query, state),
+        "incremental": lambda query, state: state.messages_for(
+            SYSTEM_PROMPT, HumanMessage(content=query)
+        ),
+    }
+    turn_steps = {"rebuild": rebuild_turn, "incremental": incremental_turn}
+    answer = "Answer: " + "lorem ipsum " * 20
+
+    results = {}
+    for name in build_steps:
+        state = make_state(turns)
+        # Warm up the cached prefix so steady-state turns are measured
+        build_steps[name]("warm up", state)
+
+        builds = []
+        for sample in range(samples):
+            began = time.perf_counter()
+            build_steps[name](f"query {sample}", state)
+            builds.append(time.perf_counter() - began)
+
+        turn_latencies = []
+        for sample in range(samples):
+            began = time.perf_counter()
+            turn_steps[name](f"query {sample}", answer, state)
+            turn_latencies.append(time.perf_counter() - began)
+
+        results[name] = {
+            "build": summarize_latencies(builds),
+            "turn": summarize_latencies(turn_latencies),
+        }
+
+    results["build_speedup"] = (
+        results["rebuild"]["build"]["mean_ms"] / results["incremental"]["build"]["mean_ms"]
+    )
+    return {"history_turns": turns, **results}
+
+
+def run(turns=(10, 100, 1000), samples=200):
+    """
+    Run the benchmark for every history length.
+
+    Args:
+        turns (Sequence[int]): History lengths in exchanges
+        samples (int): Number of measured builds and turns per approach
+
+    Returns:
+        list: Results per history length
+    """
+    return [measure(count, samples) for count in turns]
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.turns, args.samples)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {"turns": args.turns, "samples": args.samples}
+        write_results(args.output, "messages", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Multi-turn Benchmark - Per-turn latency as the conversation history grows.
+
+This script plays a long conversation with a single agent and the fake model
+and reports, for windows of turns, the latency of a whole turn and of building
+the message list from the ConversationState. It runs once per token budget, so
+the cost of an unbounded history can be compared with a truncated one, and
+with --prompt-caching once more per budget with cache breakpoints, reporting
+the input tokens that were read from the simulated prompt cache.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_multiturn [--turns 1000] [--budgets none 100000 4000]
+        [--prompt-caching]
+"""
+
+import argparse
+import json
+import time
+
+from src.agents.general_agent import GeneralAgent
+from src.core.conversation_state import ConversationState
+from src.core.metrics import llm_tokens
+
+from .common import summarize_latencies, write_results
+from .fake_model import FakeModelProvider
+
+
+def windows(turns, size):
+    """
+    Get the turn ranges to report.
+
+    The first window and then every window ending at a power of ten are
+    reported, followed by the last window.
+
+    Args:
+        turns (int): Number of turns played
+        size (int): Number of turns per window
+
+    Returns:
+        List[Tuple[int, int]]: Start (inclusive) and end (exclusive) indexes
+    """
+    ends = {min(size, turns), turns}
+    end = 10
+    while end < turns:
+        if end >= size:
+            ends.add(end)
+        end *= 10
+    return [(end - min(size, end), end) for end in sorted(ends)]
+
+
+def token_counts(component):
+    """
+    Get the input token counters of a component.
+
+    Args:
+        component (str): Name of the agent
+
+    Returns:
+        dict: Uncached, cache read and cache write input tokens recorded so far
+    """
+    return {
+        kind: llm_tokens.get(component=component, kind=kind)
+        for kind in ("input", "cache_read", "cache_write")
+    }
+
+
+def run_conversation(model, turns, token_budget, window_size=10):
+    """
+    Play a conversation and measure every turn.
+
+    Args:
+        model: The language model
+        turns (int): Number of turns
+        token_budget (Optional[int]): Token budget of the conversation state
+        window_size (int): Number of turns per reported window
+
+    Returns:
+        dict: Latency summaries per window, the final history size and the
+              input tokens of the conversation by cache usage
+    """
+    agent = GeneralAgent(model)
+    tokens_before = token_counts("GeneralAgent")
+    agent.conversation_state = ConversationState(token_budget=token_budget)
+    state = agent.conversation_state
+
+    turn_latencies = []
+    build_latencies = []
+    for turn in range(turns):
+        query = f"Question number {turn}: tell me more about topic {turn % 17}"
+        began = time.perf_counter()
+        agent._build_messages(query, state)
+        build_latencies.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        agent.process_query(query)
+        turn_latencies.append(time.perf_counter() - began)
+
+    tokens_after = token_counts("GeneralAgent")
+    return {
+        "token_budget": token_budget,
+        "prompt_caching": model.prompt_caching,
+        "windows": [
+            {
+                "turns": f"{start + 1}-{end}",
+                "turn": summarize_latencies(turn_latencies[start:end]),
+                "build_messages": summarize_latencies(build_latencies[start:end]),
+            }
+            for start, end in windows(turns, window_size)
+        ],
+        "final_messages": len(state.message_history),
+        "final_tokens": state.total_tokens,
+        "input_tokens": {
+            kind: tokens_after[kind] - tokens_before[kind] for kind in tokens_after
+        },
+    }
+
+
+def run(
+    turns=1000, budgets=(None, 100000, 4000), response_tokens=50, prompt_caching=False
+):
+    """
+    Run the conversation once per token budget.
+
+    Args:
+        turns (int): Number of turns per conversation
+        budgets (Sequence[Optional[int]]): Token budgets to compare
+        response_tokens (int): Tokens in every model response
+        prompt_caching (bool): Also run every budget with prompt caching
+
+    Returns:
+        list: Results per token budget (and caching setting)
+    """
+    results = []
+    for caching in (False, True) if prompt_caching else (False,):
+        model = FakeModelProvider(
+            response_tokens=response_tokens, prompt_caching=caching
+        ).create_model()
+        results.extend(run_conversation(model, turns, budget) for budget in budgets)
+    return results
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument(
+        "--budgets",
+        nargs="+",
+        default=["none", "100000", "4000"],
+        help="Token budgets to compare ('none' for unbounded)",
+    )
+    parser.add_argument(
+        "--prompt-caching",
+        action="store_true",
+        help="Also run every budget with prompt cache breakpoints",
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    budgets = [None if budget == "none" else int(budget) for budget in args.budgets]
+    results = run(turns=args.turns, budgets=budgets, prompt_caching=args.prompt_caching)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {
+            "turns": args.turns,
+            "budgets": budgets,
+            "prompt_caching": args.prompt_caching,
+        }
+        write_results(args.output, "multiturn", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
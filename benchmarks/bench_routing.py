@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Routing Benchmark - RouterAgent routing throughput and latency.
+
+This script routes a deterministic mix of queries with the fake model and
+measures throughput and per-query latency for each routing path:
+- model: every query calls the model (cache and local classifier disabled)
+- cache: repeated queries are answered from the routing cache
+- local: clear-cut queries are answered by the local classifier
+- batch_packed / batch_concurrent: route_batch in both modes
+
+It also reports the precision and coverage of the local classifier at several
+confidence thresholds on labeled queries that are not among the agents'
+examples, to calibrate ROUTING_CONFIG["local_confidence_threshold"].
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_routing [--queries 2000] [--latency 0.0]
+"""
+
+import argparse
+import json
+import time
+
+from src.config.model_config import ROUTING_CONFIG
+from src.core.router_agent import RouterAgent
+from src.core.routing_cache import RoutingCache
+
+from .common import sample_queries, summarize_latencies, write_results
+from .fake_model import FakeModelProvider
+
+# Labeled queries held out from the agents' examples, many of them containing
+# numbers that do not make them math questions
+HELD_OUT_QUERIES = [
+    ("What is 12 times 34?", "MathAgent"),
+    ("Solve 7x + 3 = 0 for x", "MathAgent"),
+    ("what is 15 divided by 3", "MathAgent"),
+    ("calculate 2^10", "MathAgent"),
+    ("what is 8% of 250", "MathAgent"),
+    ("what is the derivative of x^3", "MathAgent"),
+    ("what is the integral of cos(x)", "MathAgent"),
+    ("convert 100 fahrenheit to celsius", "MathAgent"),
+    ("what is the mean of 3, 5 and 10", "MathAgent"),
+    ("is 97 a prime number", "MathAgent"),
+    ("how many days are in 2 weeks", "MathAgent"),
+    ("x = 5 in javascript", "CodingAgent"),
+    ("sort [3, 1, 2] in python", "CodingAgent"),
+    ("Write a Python function that returns the first 10 primes", "CodingAgent"),
+    ("How do I fix a KeyError in my code on line 42?", "CodingAgent"),
+    ("write a bash script that prints numbers 1 to 10", "CodingAgent"),
+    ("why does my loop run 11 times instead of 10", "CodingAgent"),
+    ("explain recursion in python", "CodingAgent"),
+    ("create a react component with 2 buttons", "CodingAgent"),
+    ("what is the time complexity of quicksort", "CodingAgent"),
+    ("my python script throws error 404", "CodingAgent"),
+    ("how do I cook pasta for 4 people", "GeneralAgent"),
+    ("what is the population of tokyo in 2020", "GeneralAgent"),
+    ("translate 3 sentences to french", "GeneralAgent"),
+    ("What should I cook tonight for 6 people?", "GeneralAgent"),
+    ("Tell me something interesting about the year 1969", "GeneralAgent"),
+    ("who won the world cup in 1998", "GeneralAgent"),
+    ("recommend 5 movies from the 90s", "GeneralAgent"),
+    ("how tall is mount everest", "GeneralAgent"),
+    ("what year did world war 2 end", "GeneralAgent"),
+    ("give me 3 tips for better sleep", "GeneralAgent"),
+    ("what causes rainbows", "GeneralAgent"),
+    ("tell me a joke", "GeneralAgent"),
+    ("list 10 countries in europe", "GeneralAgent"),
+]
+
+
+def make_router(model, cache=False, local=False):
+    """
+    Create a router with only the selected fast paths enabled.
+
+    Args:
+        model: The language model
+        cache (bool): Whether to enable the routing cache
+        local (bool): Whether to enable the local classifier
+
+    Returns:
+        RouterAgent: The router, with its routing prompt already built
+    """
+    router = RouterAgent(
+        model=model,
+        routing_cache=RoutingCache() if cache else RoutingCache(max_size=0),
+        local_confidence_threshold=(
+            ROUTING_CONFIG["local_confidence_threshold"] if local else None
+        ),
+        follow_up_threshold=None,
+    )
+    router.routing_prompt
+    return router
+
+
+def measure_single(router, queries):
+    """
+    Route queries one at a time.
+
+    Args:
+        router (RouterAgent): The router
+        queries (List[str]): The queries
+
+    Returns:
+        dict: Throughput, latency summary and routing statistics
+    """
+    latencies = []
+    start = time.perf_counter()
+    for query in queries:
+        began = time.perf_counter()
+        router.route_query(query)
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+
+    stats = router.get_routing_stats()
+    return {
+        "queries_per_second": len(queries) / elapsed,
+        "latency": summarize_latencies(latencies),
+        "model_calls": stats["model"],
+        "local_fraction": stats["local_fraction"],
+    }
+
+
+def measure_batch(router, queries, mode):
+    """
+    Route queries with a single route_batch call.
+
+    Args:
+        router (RouterAgent): The router
+        queries (List[str]): The queries
+        mode (str): "packed" or "concurrent"
+
+    Returns:
+        dict: Throughput and total time
+    """
+    start = time.perf_counter()
+    router.route_batch(queries, mode=mode)
+    elapsed = time.perf_counter() - start
+    return {
+        "queries_per_second": len(queries) / elapsed,
+        "total_ms": elapsed * 1000,
+    }
+
+
+def measure_local_accuracy(router, thresholds=(0.5, 0.6, 0.75, 0.9)):
+    """
+    Measure the local classifier on the held-out queries.
+
+    Args:
+        router (RouterAgent): A router with the local classifier enabled
+        thresholds (Sequence[float]): Confidence thresholds to evaluate
+
+    Returns:
+        dict: Per threshold, the share of queries routed locally (coverage)
+              and the share of those routed to the right agent (precision)
+    """
+    classified = [
+        (router.local_classifier.classify(query), label)
+        for query, label in HELD_OUT_QUERIES
+    ]
+    results = {}
+    for threshold in thresholds:
+        routed = [
+            agent_name == label
+            for (agent_name, confidence), label in classified
+            if confidence >= threshold
+        ]
+        results[str(threshold)] = {
+            "coverage": len(routed) / len(classified),
+            "precision": sum(routed) / len(routed) if routed else None,
+        }
+    return results
+
+
+def run(queries=2000, latency=0.0, distinct=100, seed=0):
+    """
+    Run every routing scenario.
+
+    Args:
+        queries (int): Number of queries per scenario
+        latency (float): Simulated model latency in seconds
+        distinct (int): Number of distinct queries in the cache scenario
+        seed (int): Seed of the query generator
+
+    Returns:
+        dict: Results by scenario
+    """
+    model = FakeModelProvider(latency=latency, seed=seed).create_model()
+    workload = sample_queries(queries, seed)
+    repeated = [workload[index % distinct] for index in range(queries)]
+
+    return {
+        "model": measure_single(make_router(model), workload),
+        "cache": measure_single(make_router(model, cache=True), repeated),
+        "local": measure_single(make_router(model, local=True), workload),
+        "batch_packed": measure_batch(make_router(model), workload, "packed"),
+        "batch_concurrent": measure_batch(make_router(model), workload, "concurrent"),
+        "local_accuracy": measure_local_accuracy(make_router(model, local=True)),
+    }
+
+
+def main():
+    """
+    Run the benchmark and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Simulated model latency in seconds"
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(queries=args.queries, latency=args.latency)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        parameters = {"queries": args.queries, "latency": args.latency}
+        write_results(args.output, "routing", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
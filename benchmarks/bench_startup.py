@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - RouterAgent cold start versus number of agents.
+
+This script generates packages of N synthetic agent modules and measures, in a
+fresh interpreter for every N:
+- the time to import the framework
+- the time to construct a RouterAgent
+- the time until the first routing prompt is ready (discovery and prompt generation)
+- the time of the first get_agent call (a single agent instantiation)
+
+With --manifest, an agent manifest is written next to the generated modules,
+so discovery registers the agents without importing their modules.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_startup --agents 10 100 1000 [--manifest]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import REPO_ROOT, write_results
+
+# Kept in sync with src.core.discovery, which is not imported by the parent process
+MANIFEST_FILENAME = "agents_manifest.json"
+
+AGENT_TEMPLATE = '''from src.agents.base_agent import BaseAgent
+from src.core.registry import register_agent
+
+
+@register_agent
+class BenchAgent{index}(BaseAgent):
+    def __init__(self, model):
+        super().__init__(model, "You are benchmark agent {index}.")
+
+    @classmethod
+    def get_description(cls):
+        return "Handles benchmark topic number {index} and related questions"
+'''
+
+
+class StubModel:
+    """
+    Stand-in for a chat model; startup never calls the model.
+    """
+
+
+def generate_agent_package(directory, count, manifest=False):
+    """
+    Write a package of synthetic agent modules.
+
+    Args:
+        directory (str): Directory to create the package in
+        count (int): Number of agent modules
+        manifest (bool): Whether to also write an agent manifest
+
+    Returns:
+        str: Dotted name of the generated package
+    """
+    package = f"bench_agents_{count}"
+    package_dir = os.path.join(directory, package)
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    for index in range(count):
+        path = os.path.join(package_dir, f"bench_agent_{index}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(AGENT_TEMPLATE.format(index=index))
+
+    if manifest:
+        entries = [
+            {
+                "name": f"BenchAgent{index}",
+                "description": f"Handles benchmark topic number {index} and related questions",
+                "import_path": f"{package}.bench_agent_{index}:BenchAgent{index}",
+            }
+            for index in range(count)
+        ]
+        with open(os.path.join(package_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({"agents": entries}, f)
+    return package
+
+
+def measure(package):
+    """
+    Measure the startup phases in the current interpreter.
+
+    Args:
+        package (str): Dotted name of the package containing the agents
+
+    Returns:
+        dict: Durations of each phase in milliseconds
+    """
+    start = time.perf_counter()
+    from src.core.discovery import AgentDiscovery
+    from src.core.router_agent import RouterAgent
+
+    imported = time.perf_counter()
+    router = RouterAgent(
+        model=StubModel(), agent_discovery=AgentDiscovery(package=package)
+    )
+    constructed = time.perf_counter()
+    router.routing_prompt
+    prompt_ready = time.perf_counter()
+    router.get_agent("BenchAgent0")
+    first_agent = time.perf_counter()
+
+    return {
+        "agents": len(router.agent_classes),
+        "import_ms": (imported - start) * 1000,
+        "init_ms": (constructed - imported) * 1000,
+        "first_prompt_ms": (prompt_ready - constructed) * 1000,
+        "first_get_agent_ms": (first_agent - prompt_ready) * 1000,
+        "instantiated_agents": len(router.agent_instances),
+    }
+
+
+def run(counts=(10, 100, 500), manifest=False):
+    """
+    Measure startup in a fresh interpreter for every agent count.
+
+    Args:
+        counts (Sequence[int]): Numbers of generated agents
+        manifest (bool): Whether discovery uses a manifest
+
+    Returns:
+        list: The measurements for every agent count
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            package = generate_agent_package(directory, count, manifest)
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_ROOT, directory]))
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", package],
+                cwd=REPO_ROOT,
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result["manifest"] = manifest
+            results.append(result)
+    return results
+
+
+def main():
+    """
+    Run the benchmark for every requested agent count and print JSON results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--agents", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument(
+        "--manifest", action="store_true", help="Discover agents from a manifest"
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return
+
+    results = run(args.agents, args.manifest)
+    for result in results:
+        print(json.dumps(result))
+
+    if args.output:
+        parameters = {"agents": args.agents, "manifest": args.manifest}
+        write_results(args.output, "startup", results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Common helpers shared by the benchmark scripts.
+
+This module does not import the framework, so scripts that measure import time
+can use it.
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """
+    Get a percentile of a sample by the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The sample
+        fraction (float): The percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: The percentile, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize_latencies(latencies: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize latencies measured in seconds.
+
+    Args:
+        latencies (Sequence[float]): The latencies
+
+    Returns:
+        Dict[str, float]: Count, mean, p50, p95, p99 and max in milliseconds
+    """
+    count = len(latencies)
+    return {
+        "count": count,
+        "mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000 if count else 0.0,
+    }
+
+
+def environment_info() -> Dict[str, Optional[str]]:
+    """
+    Describe the environment the benchmarks ran in.
+
+    Returns:
+        Dict[str, Optional[str]]: Timestamp, Python version, platform and the
+                                  git revision of the repository, if available
+    """
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "git_revision": revision,
+    }
+
+
+def write_results(path: str, benchmark: str, results, parameters: Dict) -> Dict:
+    """
+    Write benchmark results with their parameters and environment to JSON.
+
+    Args:
+        path (str): Output file
+        benchmark (str): Name of the benchmark
+        results: The results
+        parameters (Dict): Parameters the benchmark ran with
+
+    Returns:
+        Dict: The written document
+    """
+    document = {
+        "benchmark": benchmark,
+        "environment": environment_info(),
+        "parameters": parameters,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def sample_queries(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate a deterministic mix of queries for the built-in agents.
+
+    Args:
+        count (int): Number of queries
+        seed (int): Seed of the generator
+
+    Returns:
+        List[str]: The queries
+    """
+    rng = random.Random(seed)
+    templates = [
+        "What is {a} times {b}?",
+        "Solve {a}x + {b} = 0 for x",
+        "Write a Python function that returns the first {a} primes",
+        "How do I fix a KeyError in my code on line {a}?",
+        "Tell me something interesting about the year {a}{b}",
+        "What should I cook tonight for {a} people?",
+    ]
+    return [
+        rng.choice(templates).format(a=rng.randint(2, 99), b=rng.randint(2, 99))
+        for _ in range(count)
+    ]
@@ -0,0 +1,335 @@
+"""
+Fake Model - Deterministic stand-in for the Bedrock chat model.
+
+This module provides a LangChain chat model that answers without any network
+access, with configurable latency, token rate and error rate, and a model
+provider that creates it in place of ChatBedrock. Routing prompts are answered
+with one of the agents listed in the prompt, chosen from a hash of the query,
+so every run routes identically. Prompt caching is simulated: prefixes ending
+at a cache breakpoint are remembered, and their tokens are reported as cache
+reads when a later request repeats them.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Iterator, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.core.llm_model import LLMModelProvider
+from src.core.resilience import ResilientChatModel
+
+# Agent lines of a routing prompt, e.g. "- MathAgent: Handles math"
+_AGENT_LINE_RE = re.compile(r"^- (\w+):", re.MULTILINE)
+
+# Messages before a cache breakpoint searched for a cached prefix
+CACHE_LOOKBACK = 20
+
+# Numbered queries of a packed routing request, e.g. "3. what is 2+2"
+_NUMBERED_RE = re.compile(r"^(\d+)\. ", re.MULTILINE)
+
+
+def _text(content) -> str:
+    """
+    Get the text of message content given as a string or as content blocks.
+
+    Args:
+        content: Message content
+
+    Returns:
+        str: The concatenated text
+    """
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "") for block in content
+    )
+
+
+def _has_breakpoint(content) -> bool:
+    """
+    Check whether message content ends a cached prefix.
+
+    Args:
+        content: Message content
+
+    Returns:
+        bool: True if a content block carries cache_control
+    """
+    return not isinstance(content, str) and any(
+        isinstance(block, dict) and "cache_control" in block for block in content
+    )
+
+
+class FakeModelError(RuntimeError):
+    """
+    Error raised by the fake model to simulate a failed call.
+    """
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with simulated latency, throughput and failures.
+
+    Attributes:
+        latency (float): Seconds before the first token
+        tokens_per_second (Optional[float]): Generation speed, or None to
+                                             produce all tokens at once
+        error_rate (float): Probability that a call raises FakeModelError
+        response_tokens (int): Number of tokens in an agent response
+        seed (int): Seed of the failure sequence
+    """
+
+    latency: float = 0.0
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    response_tokens: int = 20
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr()
+    _lock: Any = PrivateAttr()
+    _cached_prefixes: set = PrivateAttr()
+
+    def model_post_init(self, __context):
+        """
+        Initialize the seeded failure sequence and the simulated prompt cache.
+        """
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, messages) -> List[str]:
+        """
+        Build the response to a conversation, as a list of tokens.
+
+        Args:
+            messages (list): The conversation sent to the model
+
+        Returns:
+            List[str]: Tokens of the response, including trailing spaces
+        """
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise FakeModelError("Simulated model failure (ThrottlingException)")
+
+        system = _text(messages[0].content) if messages else ""
+        query = _text(messages[-1].content) if messages else ""
+        agents = _AGENT_LINE_RE.findall(system) if "router agent" in system else []
+        if agents:
+            numbers = _NUMBERED_RE.findall(query)
+            if numbers and "numbered queries" in system:
+                lines = query.splitlines()
+                return [
+                    f"{number}: {self._pick(agents, line)}\n"
+                    for number, line in zip(numbers, lines)
+                ]
+            return [self._pick(agents, query)]
+        return [f"token{index} " for index in range(self.response_tokens)]
+
+    @staticmethod
+    def _pick(agents: List[str], query: str) -> str:
+        """
+        Choose an agent for a query deterministically.
+
+        Args:
+            agents (List[str]): Agent names from the routing prompt
+            query (str): The query
+
+        Returns:
+            str: The chosen agent name
+        """
+        return agents[zlib.crc32(query.encode("utf-8")) % len(agents)]
+
+    def _usage(self, messages, tokens: List[str]) -> dict:
+        """
+        Build usage metadata with approximate token counts.
+
+        Like ChatBedrock, input_tokens counts only the input tokens that were
+        neither read from nor written to the prompt cache. As with Anthropic
+        models, a breakpoint reads the longest cached prefix ending at one of
+        the CACHE_LOOKBACK messages before it, so a breakpoint that moves
+        forward every turn still hits the prefix cached by the previous turn.
+
+        Args:
+            messages (list): The conversation sent to the model
+            tokens (List[str]): Tokens of the response
+
+        Returns:
+            dict: Input, output and total token counts and cache usage
+        """
+        prefixes = []
+        prefix_tokens = 0
+        prefix_key = 0
+        for message in messages:
+            text = _text(message.content)
+            prefix_tokens += len(text) // 4 + 4
+            prefix_key = zlib.crc32(f"\0{message.type}\0{text}".encode("utf-8"), prefix_key)
+            prefixes.append((prefix_key, prefix_tokens))
+        breakpoints = [
+            index
+            for index, message in enumerate(messages)
+            if _has_breakpoint(message.content)
+        ]
+
+        cache_read = 0
+        cache_write = 0
+        with self._lock:
+            for index in breakpoints:
+                window = prefixes[max(0, index - CACHE_LOOKBACK) : index + 1]
+                for key, cached_tokens in reversed(window):
+                    if key in self._cached_prefixes:
+                        cache_read = max(cache_read, cached_tokens)
+                        break
+            if breakpoints:
+                cache_write = max(0, prefixes[breakpoints[-1]][1] - cache_read)
+                self._cached_prefixes.update(prefixes[index][0] for index in breakpoints)
+        input_tokens = prefix_tokens - cache_read - cache_write
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": len(tokens),
+            "total_tokens": prefix_tokens + len(tokens),
+            "input_token_details": {
+                "cache_read": cache_read,
+                "cache_creation": cache_write,
+            },
+        }
+
+    def _generation_time(self, tokens: List[str]) -> float:
+        """
+        Get the simulated time to produce a full response.
+
+        Args:
+            tokens (List[str]): Tokens of the response
+
+        Returns:
+            float: Seconds until the response is complete
+        """
+        if not self.tokens_per_second:
+            return self.latency
+        return self.latency + len(tokens) / self.tokens_per_second
+
+    def _result(self, messages, tokens: List[str]) -> ChatResult:
+        message = AIMessage(
+            content="".join(tokens).strip(), usage_metadata=self._usage(messages, tokens)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._reply(messages)
+        time.sleep(self._generation_time(tokens))
+        return self._result(messages, tokens)
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        tokens = self._reply(messages)
+        await asyncio.sleep(self._generation_time(tokens))
+        return self._result(messages, tokens)
+
+    def _chunks(self, messages, tokens: List[str]):
+        """
+        Yield the chunks of a streamed response with the delay before each.
+
+        Args:
+            messages (list): The conversation sent to the model
+            tokens (List[str]): Tokens of the response
+
+        Yields:
+            Tuple[float, ChatGenerationChunk]: Delay in seconds and the chunk
+        """
+        interval = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for index, token in enumerate(tokens):
+            delay = self.latency if index == 0 else interval
+            yield delay, ChatGenerationChunk(message=AIMessageChunk(content=token))
+        usage = AIMessageChunk(content="", usage_metadata=self._usage(messages, tokens))
+        yield 0.0, ChatGenerationChunk(message=usage)
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages, self._reply(messages)):
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages, self._reply(messages)):
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+
+
+class FakeModelProvider(LLMModelProvider):
+    """
+    Model provider that creates FakeChatModel instances instead of ChatBedrock.
+
+    Models are shared through the client pool and wrapped in a
+    ResilientChatModel like real ones, keyed on the fake model settings, so
+    provider and resilience overhead are measured faithfully. Simulated
+    failures look like throttling and are retried.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        error_rate: float = 0.0,
+        response_tokens: int = 20,
+        seed: int = 0,
+        **kwargs,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            latency (float): Seconds before the first token
+            tokens_per_second (Optional[float]): Generation speed
+            error_rate (float): Probability that a call fails
+            response_tokens (int): Number of tokens in an agent response
+            seed (int): Seed of the failure sequence
+            **kwargs: Arguments of LLMModelProvider
+        """
+        super().__init__(**kwargs)
+        self.fake_settings = {
+            "latency": latency,
+            "tokens_per_second": tokens_per_second,
+            "error_rate": error_rate,
+            "response_tokens": response_tokens,
+            "seed": seed,
+        }
+
+    def create_model(self):
+        """
+        Create or fetch the pooled fake model.
+
+        Returns:
+            ResilientChatModel: The wrapped fake model
+        """
+        key = (
+            "fake",
+            self.model_id,
+            self.prompt_caching,
+            *sorted(self.fake_settings.items()),
+        )
+        return self.pool.get_model(
+            key,
+            lambda: ResilientChatModel(
+                FakeChatModel(**self.fake_settings),
+                name="fake",
+                prompt_caching=self.prompt_caching,
+            ),
+        )
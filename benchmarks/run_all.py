@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Run every offline benchmark and write one JSON report.
+
+All scenarios use the deterministic fake model, so the suite needs no AWS
+access and measures only the framework's own overhead and scaling:
+- startup: RouterAgent cold start versus agent count, with and without a manifest
+- routing: routing throughput and latency per routing path
+- multiturn: per-turn latency as the conversation history grows
+- messages: prompt construction on long histories, rebuilt versus incremental
+- memory: memory of resident histories, LangChain messages versus records
+- math: math queries answered locally versus by the model
+- concurrency: many sessions served concurrently on one event loop
+
+Compare reports of two versions to catch regressions. Run it from the
+repository root:
+
+    python -m benchmarks.run_all --output results.json [--quick]
+"""
+
+import argparse
+import json
+import time
+
+from . import (
+    bench_concurrency,
+    bench_math,
+    bench_memory,
+    bench_messages,
+    bench_multiturn,
+    bench_routing,
+    bench_startup,
+)
+from .common import write_results
+
+# Parameters of the full suite and of a quick smoke run
+SUITES = {
+    "full": {
+        "startup": {"counts": [10, 100, 500]},
+        "routing": {"queries": 2000},
+        "multiturn": {"turns": 1000, "prompt_caching": True},
+        "messages": {"turns": [10, 100, 1000], "samples": 200},
+        "memory": {"sessions": 1000, "turns": 20},
+        "math": {"repeats": 20, "latency": 0.2},
+        "concurrency": {"sessions": [1, 10, 100], "turns": 10},
+    },
+    "quick": {
+        "startup": {"counts": [10, 50]},
+        "routing": {"queries": 200},
+        "multiturn": {"turns": 100, "prompt_caching": True},
+        "messages": {"turns": [10, 1000], "samples": 50},
+        "memory": {"sessions": 100, "turns": 10},
+        "math": {"repeats": 2, "latency": 0.05},
+        "concurrency": {"sessions": [1, 10], "turns": 5},
+    },
+}
+
+
+def run(parameters):
+    """
+    Run every benchmark.
+
+    Args:
+        parameters (dict): Keyword arguments of every benchmark's run function
+
+    Returns:
+        dict: Results and duration in seconds by benchmark
+    """
+    results = {}
+    for name, run_benchmark in (
+        ("startup", bench_startup.run),
+        ("routing", bench_routing.run),
+        ("multiturn", bench_multiturn.run),
+        ("messages", bench_messages.run),
+        ("memory", bench_memory.run),
+        ("math", bench_math.run),
+        ("concurrency", bench_concurrency.run),
+    ):
+        start = time.perf_counter()
+        if name == "startup":
+            result = {
+                "discovery": run_benchmark(**parameters[name]),
+                "manifest": run_benchmark(**parameters[name], manifest=True),
+            }
+        else:
+            result = run_benchmark(**parameters[name])
+        results[name] = {"results": result, "seconds": time.perf_counter() - start}
+        print(f"{name}: {results[name]['seconds']:.1f}s")
+    return results
+
+
+def main():
+    """
+    Run the suite and write the JSON report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument(
+        "--quick", action="store_true", help="Run smaller workloads as a smoke test"
+    )
+    args = parser.parse_args()
+
+    parameters = SUITES["quick" if args.quick else "full"]
+    results = run(parameters)
+    write_results(args.output, "suite", results, parameters)
+    print(json.dumps({name: result["seconds"] for name, result in results.items()}))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
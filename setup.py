@@ -24,6 +24,7 @@ setup(
     version="0.1.0",
     packages=find_packages("src"),
     package_dir={"": "src"},
+    package_data={"agents": ["agents_manifest.json"]},
     install_requires=requirements,
     entry_points={
         "console_scripts": [
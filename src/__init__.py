@@ -16,10 +16,30 @@ from src.core import (
     create_llm_model,
     ConversationState,
 )
-from src.agents import BaseAgent, MathAgent, CodingAgent, GeneralAgent
 from src.config import MODEL_CONFIG, DEFAULT_REGION, DEFAULT_MODEL_ID
 from src.main import main
 
+# Agent classes are imported lazily so that importing the package does not load
+# every agent module
+_AGENT_EXPORTS = ("BaseAgent", "MathAgent", "CodingAgent", "GeneralAgent")
+
+
+def __getattr__(name):
+    """
+    Import agent classes lazily on first access.
+
+    Args:
+        name (str): The attribute being accessed
+
+    Returns:
+        type: The requested agent class
+    """
+    if name in _AGENT_EXPORTS:
+        from src import agents
+
+        return getattr(agents, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "AgentRegistry",
     "register_agent",
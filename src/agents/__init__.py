@@ -5,11 +5,35 @@ This package contains specialized agent implementations:
 - MathAgent: Handles mathematical problems and calculations
 - CodingAgent: Addresses programming questions and code generation
 - GeneralAgent: Responds to general knowledge queries
+
+Agent modules are imported on first attribute access, so importing the package
+(for example during agent discovery) does not load every agent.
 """
 
-from .base_agent import BaseAgent
-from .math_agent import MathAgent
-from .coding_agent import CodingAgent
-from .general_agent import GeneralAgent
+import importlib
+
+# Module defining each exported class
+_EXPORTS = {
+    "BaseAgent": ".base_agent",
+    "MathAgent": ".math_agent",
+    "CodingAgent": ".coding_agent",
+    "GeneralAgent": ".general_agent",
+}
 
 __all__ = ["BaseAgent", "MathAgent", "CodingAgent", "GeneralAgent"]
+
+
+def __getattr__(name):
+    """
+    Import agent classes lazily on first access.
+
+    Args:
+        name (str): The attribute being accessed
+
+    Returns:
+        type: The requested agent class
+    """
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
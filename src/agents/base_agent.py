@@ -6,10 +6,43 @@ It handles common functionality such as conversation state management and
 query processing, allowing specialized agents to focus on their specific domains.
 """
 
+import asyncio
+import time
 from typing import Optional
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 
-from ..core.conversation_state import ConversationState
+from ..core.conversation_state import ConversationState, SUMMARIZE
+from ..core.prompt_cache import uses_prompt_caching
+from ..core.metrics import (
+    agent_latency,
+    agent_local_answers,
+    agent_tool_calls,
+    llm_errors,
+    record_usage,
+    time_to_first_token,
+)
+from ..core.session_store import SessionStore
+from ..core.streaming import StreamStats
+
+
+def _content_text(content):
+    """
+    Get the text of message content.
+
+    Args:
+        content (Union[str, list]): A string, or a list of content blocks as
+                                    produced by tool-calling models
+
+    Returns:
+        str: The concatenated text, without tool call blocks
+    """
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
 
 
 class BaseAgent:
@@ -18,14 +51,34 @@ class BaseAgent:
 
     This class provides the foundation for all specialized agents in the system.
     It handles common functionality such as:
-    - Maintaining conversation history
+    - Maintaining conversation history, either in a single conversation state
+      or per session in a shared SessionStore
     - Processing queries with context
     - Generating responses using the language model
 
     Specialized agents should inherit from this class and override the
     get_description class method to provide a description of their capabilities.
+    They may also answer some queries without the model by overriding
+    answer_locally, and give the model tools to call by setting tools.
+
+    Attributes:
+        model_overrides (Optional[dict]): Model settings of the agent that
+                                          differ from the "agent" role of
+                                          MODEL_ROLES, e.g. {"max_tokens": 4096}.
+                                          Applied when a RouterAgent creates
+                                          the agent
+        tools (Sequence[BaseTool]): LangChain tools the model may call while
+                                    answering a query. Tool calls are executed
+                                    locally and their results sent back to the
+                                    model
+        max_tool_rounds (int): Maximum number of model calls answered with
+                               tool results per query
     """
 
+    model_overrides = None
+    tools = ()
+    max_tool_rounds = 3
+
     def __init__(self, model, system_prompt):
         """
         Initialize the agent with a model and system prompt.
@@ -38,49 +91,585 @@ class BaseAgent:
         self.model = model
         self.system_prompt = system_prompt
         self.conversation_state = ConversationState()
+        # Model that summarizes histories; set by RouterAgent to the
+        # "summarizer" role model, otherwise the agent's own model is used
+        self.summary_model = None
+        self._tool_model = None
+        self.session_store: Optional[SessionStore] = None
+        self.last_stream_stats: Optional[StreamStats] = None
+
+    def get_conversation_state(self, session_id=None):
+        """
+        Get the conversation state for a session.
+
+        Without a session ID, the agent's own conversation_state is used, which
+        preserves single-user behavior. With a session ID, the state is looked
+        up in the session store, which is shared with other agents when the
+        agent is created by a RouterAgent.
 
-    def process_query(self, query):
+        Args:
+            session_id (Optional[str]): Identifier of the session
+
+        Returns:
+            ConversationState: The conversation state to use
+        """
+        if session_id is None:
+            state = self.conversation_state
+        else:
+            if self.session_store is None:
+                self.session_store = SessionStore()
+            state = self.session_store.get_state(session_id, type(self).__name__)
+
+        if state.truncation_policy == SUMMARIZE and state.summarizer is None:
+            state.summarizer = self.summarize_history
+        return state
+
+    def summarize_history(self, summary, messages):
+        """
+        Fold messages removed from the history into a running summary.
+
+        This is used as the summarizer of conversation states with the
+        "summarize" truncation policy. It calls summary_model if set, which
+        RouterAgent configures from the "summarizer" role of MODEL_ROLES, and
+        the agent's own model otherwise.
+
+        Args:
+            summary (str): The current summary (may be empty)
+            messages (list): The messages being removed from the history
+
+        Returns:
+            str: The updated summary
+        """
+        transcript = "\n".join(
+            f"{message.type}: {message.content}" for message in messages
+        )
+        prompt = [
+            SystemMessage(
+                content="Summarize the conversation below in a few sentences. "
+                "Keep facts, values and decisions that later turns may rely on."
+            ),
+            HumanMessage(
+                content=f"Previous summary:\n{summary or '(none)'}\n\n"
+                f"Conversation:\n{transcript}"
+            ),
+        ]
+        model = self.summary_model if self.summary_model is not None else self.model
+        response = model.invoke(prompt)
+        record_usage("summarizer", response)
+        return response.content
+
+    def _build_messages(self, query, state):
+        """
+        Build the message list sent to the language model for a query.
+
+        The conversation state maintains the system message and the history
+        as a ready-to-send prefix, so only the query message is created here.
+        For models that support prompt caching, the system prompt and the last
+        history message are marked as cache breakpoints, so the prefix that
+        repeats on every turn is read from the provider's prompt cache.
+
+        Args:
+            query (str): The user's query
+            state (ConversationState): The conversation state to draw history from
+
+        Returns:
+            list: The system prompt, the conversation history and the query,
+                  which is the last message
+        """
+        return state.messages_for(
+            self.system_prompt,
+            HumanMessage(content=query),
+            uses_prompt_caching(self.model),
+        )
+
+    def _update_history(self, query_message, content, state):
+        """
+        Record a completed query/response exchange in the conversation history.
+
+        Args:
+            query_message (HumanMessage): The query message that was sent to
+                                          the model, stored as is
+            content (str): The agent's response
+            state (ConversationState): The conversation state to update
+        """
+        state.add_message(query_message)
+        state.add_message(AIMessage(content=content))
+
+    async def _aupdate_history(self, query_message, content, state):
+        """
+        Record a completed exchange from a coroutine.
+
+        Adding messages may summarize the history with a blocking model call,
+        so with the "summarize" policy the update runs on a worker thread
+        instead of the event loop.
+
+        Args:
+            query_message (HumanMessage): The query message that was sent to
+                                          the model, stored as is
+            content (str): The agent's response
+            state (ConversationState): The conversation state to update
+        """
+        if state.truncation_policy == SUMMARIZE:
+            await asyncio.to_thread(self._update_history, query_message, content, state)
+        else:
+            self._update_history(query_message, content, state)
+
+    def _record_metrics(self, duration, message, first_token=None):
+        """
+        Record the latency and token usage of a completed model response.
+
+        Args:
+            duration (float): Seconds the model took to produce the response
+            message: The response message, whose usage metadata is recorded
+            first_token (Optional[float]): Seconds until the first streamed
+                                           chunk, for streamed responses
+        """
+        name = type(self).__name__
+        agent_latency.observe(duration, agent=name)
+        if first_token is not None:
+            time_to_first_token.observe(first_token, agent=name)
+        record_usage(name, message)
+
+    def answer_locally(self, query):
+        """
+        Answer a query without calling the model, if the agent can.
+
+        Agents override this for queries they can answer exactly and cheaply,
+        such as plain arithmetic. Local answers are added to the conversation
+        history like model responses.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            Optional[str]: The answer, or None to ask the model
+        """
+        return None
+
+    def _answer_locally(self, query, state, commit):
+        """
+        Try to answer a query locally and record the exchange.
+
+        Args:
+            query (str): The user's query
+            state (ConversationState): The conversation state to update
+            commit (bool): Whether to add the exchange to the conversation history
+
+        Returns:
+            Optional[str]: The local answer, or None to ask the model
+        """
+        answer = self.answer_locally(query)
+        if answer is None:
+            return None
+        agent_local_answers.inc(agent=type(self).__name__)
+        if commit:
+            self._update_history(HumanMessage(content=query), answer, state)
+        return answer
+
+    async def _aanswer_locally(self, query, state, commit):
+        """
+        Asynchronously try to answer a query locally and record the exchange.
+
+        answer_locally may do CPU-bound work, such as symbolic math, so agents
+        that override it are called in a worker thread to keep the event loop
+        responsive.
+
+        Args:
+            query (str): The user's query
+            state (ConversationState): The conversation state to update
+            commit (bool): Whether to add the exchange to the conversation history
+
+        Returns:
+            Optional[str]: The local answer, or None to ask the model
+        """
+        if type(self).answer_locally is BaseAgent.answer_locally:
+            return None
+        answer = await asyncio.to_thread(self.answer_locally, query)
+        if answer is None:
+            return None
+        agent_local_answers.inc(agent=type(self).__name__)
+        if commit:
+            await self._aupdate_history(HumanMessage(content=query), answer, state)
+        return answer
+
+    def _get_tool_model(self):
+        """
+        Get the model with the agent's tools bound, binding them on first use.
+
+        Models that do not support tool calling are used without tools.
+
+        Returns:
+            The model to call for complete responses
+        """
+        if self._tool_model is None:
+            self._tool_model = self.model
+            if self.tools:
+                try:
+                    self._tool_model = self.model.bind_tools(list(self.tools))
+                except (AttributeError, NotImplementedError):
+                    # The model answers without tools
+                    pass
+        return self._tool_model
+
+    def _run_tools(self, tool_calls):
+        """
+        Execute the tool calls requested by the model.
+
+        Failures are reported to the model as the tool result, so it can
+        correct the call or answer without the tool.
+
+        Args:
+            tool_calls (list): The tool calls of the model response
+
+        Returns:
+            list: One ToolMessage with the result of each call
+        """
+        tools = {tool.name: tool for tool in self.tools}
+        results = []
+        for call in tool_calls:
+            agent_tool_calls.inc(agent=type(self).__name__, tool=call["name"])
+            tool = tools.get(call["name"])
+            if tool is None:
+                content = f"Error: unknown tool {call['name']}"
+            else:
+                try:
+                    content = str(tool.invoke(call["args"]))
+                except Exception as e:
+                    content = f"Error: {e}"
+            results.append(ToolMessage(content=content, tool_call_id=call["id"]))
+        return results
+
+    def _needs_tools(self, message, round_number):
+        """
+        Check whether a streamed response requests tool calls to execute.
+
+        Args:
+            message (Optional[AIMessageChunk]): The assembled streamed response
+            round_number (int): Number of tool rounds already executed
+
+        Returns:
+            bool: True if the tool calls should be executed and the model
+                  called again with their results
+        """
+        return (
+            message is not None
+            and bool(getattr(message, "tool_calls", None))
+            and round_number < self.max_tool_rounds
+        )
+
+    def _invoke(self, messages):
+        """
+        Call the model, executing the tool calls it requests.
+
+        After max_tool_rounds rounds of tool calls, the next response is
+        returned as is.
+
+        Args:
+            messages (list): The messages to send
+
+        Returns:
+            BaseMessage: The final model response
+        """
+        model = self._get_tool_model()
+        messages = list(messages)
+        for _ in range(self.max_tool_rounds):
+            response = model.invoke(messages)
+            if not getattr(response, "tool_calls", None):
+                return response
+            record_usage(type(self).__name__, response)
+            messages.append(response)
+            messages.extend(self._run_tools(response.tool_calls))
+        return model.invoke(messages)
+
+    async def _ainvoke(self, messages):
+        """
+        Asynchronously call the model, executing the tool calls it requests.
+
+        Tools run in a worker thread, so CPU-bound tools such as calculate do
+        not block the event loop.
+
+        Args:
+            messages (list): The messages to send
+
+        Returns:
+            BaseMessage: The final model response
+        """
+        model = self._get_tool_model()
+        messages = list(messages)
+        for _ in range(self.max_tool_rounds):
+            response = await model.ainvoke(messages)
+            if not getattr(response, "tool_calls", None):
+                return response
+            record_usage(type(self).__name__, response)
+            messages.append(response)
+            messages.extend(await asyncio.to_thread(self._run_tools, response.tool_calls))
+        return await model.ainvoke(messages)
+
+    def commit_exchange(self, query, content, session_id=None):
+        """
+        Add an exchange produced with commit=False to the conversation history.
+
+        Args:
+            query (str): The user's query
+            content (str): The agent's response
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to update. If None, the agent's own
+                                        conversation state is updated
+        """
+        self._update_history(
+            HumanMessage(content=query), content, self.get_conversation_state(session_id)
+        )
+
+    async def acommit_exchange(self, query, content, session_id=None):
+        """
+        Asynchronously add an exchange produced with commit=False to the history.
+
+        This is the asyncio counterpart of commit_exchange, which does not
+        block the event loop while the history is summarized.
+
+        Args:
+            query (str): The user's query
+            content (str): The agent's response
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to update
+        """
+        await self._aupdate_history(
+            HumanMessage(content=query), content, self.get_conversation_state(session_id)
+        )
+
+    def process_query(self, query, session_id=None, commit=True):
         """
         Process a query with conversation history.
 
         This method:
-        1. Creates a message list with the system prompt
-        2. Adds the conversation history
-        3. Adds the current query
-        4. Invokes the language model to generate a response
-        5. Updates the conversation history with the query and response
+        1. Answers the query locally if the agent can (see answer_locally)
+        2. Otherwise creates a message list with the system prompt, the
+           conversation history and the current query
+        3. Invokes the language model to generate a response, executing the
+           tool calls it requests
+        4. Updates the conversation history with the query and response,
+           unless commit is False
 
         Args:
             query (str): The user's query
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to use. If None, the agent's own
+                                        conversation state is used
+            commit (bool): Whether to add the exchange to the conversation
+                           history. Pass False to record it later with
+                           commit_exchange, e.g. for speculative execution
 
         Returns:
             str: The agent's response
         """
-        messages = [SystemMessage(content=self.system_prompt)]
+        state = self.get_conversation_state(session_id)
+        answer = self._answer_locally(query, state, commit)
+        if answer is not None:
+            return answer
+        messages = self._build_messages(query, state)
 
-        # Add conversation history
-        for message in self.conversation_state.message_history:
-            messages.append(message)
+        started = time.perf_counter()
+        try:
+            response = self._invoke(messages)
+        except Exception:
+            llm_errors.inc(component=type(self).__name__)
+            raise
+        self._record_metrics(time.perf_counter() - started, response)
 
-        # Add current query
-        messages.append(HumanMessage(content=query))
+        # Update conversation history
+        if commit:
+            self._update_history(messages[-1], response.content, state)
+
+        return response.content
 
-        response = self.model.invoke(messages)
+    async def aprocess_query(self, query, session_id=None, commit=True):
+        """
+        Asynchronously process a query with conversation history.
+
+        This is the asyncio counterpart of process_query. It awaits the model's
+        ainvoke method, so many queries can be in flight on a single event loop
+        without blocking a worker thread per request.
+
+        Args:
+            query (str): The user's query
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to use. If None, the agent's own
+                                        conversation state is used
+            commit (bool): Whether to add the exchange to the conversation
+                           history. Pass False to record it later with
+                           commit_exchange, e.g. for speculative execution
+
+        Returns:
+            str: The agent's response
+        """
+        state = self.get_conversation_state(session_id)
+        answer = await self._aanswer_locally(query, state, commit)
+        if answer is not None:
+            return answer
+        messages = self._build_messages(query, state)
+
+        started = time.perf_counter()
+        try:
+            response = await self._ainvoke(messages)
+        except Exception:
+            llm_errors.inc(component=type(self).__name__)
+            raise
+        self._record_metrics(time.perf_counter() - started, response)
 
         # Update conversation history
-        self.conversation_state.add_message(HumanMessage(content=query))
-        self.conversation_state.add_message(AIMessage(content=response.content))
+        if commit:
+            await self._aupdate_history(messages[-1], response.content, state)
 
         return response.content
 
-    def reset_conversation(self):
+    def stream_query(
+        self,
+        query,
+        session_id=None,
+        stats: Optional[StreamStats] = None,
+        commit=True,
+    ):
+        """
+        Process a query with conversation history, streaming the response.
+
+        This generator yields response text as it arrives from the model's
+        streaming interface. Once the stream is exhausted, the query and the
+        assembled response are added to the conversation history. If the
+        consumer stops early, nothing is recorded. A local answer (see
+        answer_locally) is yielded as a single chunk. When the model requests
+        tool calls, they are executed and the response to their results is
+        streamed in turn, up to max_tool_rounds rounds.
+
+        Args:
+            query (str): The user's query
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to use. If None, the agent's own
+                                        conversation state is used
+            stats (Optional[StreamStats]): Statistics object to fill in. A new
+                                           one is created if omitted; either way
+                                           it is available as last_stream_stats
+            commit (bool): Whether to add the exchange to the conversation
+                           history. Pass False to record it later with
+                           commit_exchange, e.g. for speculative execution
+
+        Yields:
+            str: Chunks of the agent's response
+        """
+        state = self.get_conversation_state(session_id)
+        stats = stats if stats is not None else StreamStats()
+        self.last_stream_stats = stats
+        answer = self._answer_locally(query, state, commit)
+        if answer is not None:
+            stats.record_chunk(answer)
+            stats.finish()
+            yield answer
+            return
+        messages = self._build_messages(query, state)
+
+        model = self._get_tool_model()
+        request = list(messages)
+        parts = []
+        try:
+            for round_number in range(self.max_tool_rounds + 1):
+                message = None
+                for chunk in model.stream(request):
+                    message = chunk if message is None else message + chunk
+                    text = _content_text(chunk.content)
+                    stats.record_chunk(text)
+                    if text:
+                        parts.append(text)
+                        yield text
+                if not self._needs_tools(message, round_number):
+                    break
+                record_usage(type(self).__name__, message)
+                request.append(message)
+                request.extend(self._run_tools(message.tool_calls))
+        except Exception:
+            llm_errors.inc(component=type(self).__name__)
+            raise
+
+        stats.finish(getattr(message, "usage_metadata", None))
+        self._record_metrics(stats.duration, message, stats.time_to_first_token)
+        if commit:
+            self._update_history(messages[-1], "".join(parts), state)
+
+    async def astream_query(
+        self,
+        query,
+        session_id=None,
+        stats: Optional[StreamStats] = None,
+        commit=True,
+    ):
+        """
+        Asynchronously process a query, streaming the response.
+
+        This is the asyncio counterpart of stream_query, built on the model's
+        astream method.
+
+        Args:
+            query (str): The user's query
+            session_id (Optional[str]): Identifier of the session whose history
+                                        to use
+            stats (Optional[StreamStats]): Statistics object to fill in
+            commit (bool): Whether to add the exchange to the conversation history
+
+        Yields:
+            str: Chunks of the agent's response
+        """
+        state = self.get_conversation_state(session_id)
+        stats = stats if stats is not None else StreamStats()
+        self.last_stream_stats = stats
+        answer = await self._aanswer_locally(query, state, commit)
+        if answer is not None:
+            stats.record_chunk(answer)
+            stats.finish()
+            yield answer
+            return
+        messages = self._build_messages(query, state)
+
+        model = self._get_tool_model()
+        request = list(messages)
+        parts = []
+        try:
+            for round_number in range(self.max_tool_rounds + 1):
+                message = None
+                async for chunk in model.astream(request):
+                    message = chunk if message is None else message + chunk
+                    text = _content_text(chunk.content)
+                    stats.record_chunk(text)
+                    if text:
+                        parts.append(text)
+                        yield text
+                if not self._needs_tools(message, round_number):
+                    break
+                record_usage(type(self).__name__, message)
+                request.append(message)
+                request.extend(await asyncio.to_thread(self._run_tools, message.tool_calls))
+        except Exception:
+            llm_errors.inc(component=type(self).__name__)
+            raise
+
+        stats.finish(getattr(message, "usage_metadata", None))
+        self._record_metrics(stats.duration, message, stats.time_to_first_token)
+        if commit:
+            await self._aupdate_history(messages[-1], "".join(parts), state)
+
+    def reset_conversation(self, session_id=None):
         """
         Reset the conversation history.
 
         This method clears the conversation history, allowing a fresh start
         for a new conversation.
+
+        Args:
+            session_id (Optional[str]): Identifier of the session to reset. If
+                                        None, the agent's own conversation
+                                        state is reset
         """
-        self.conversation_state.reset()
+        if session_id is None:
+            self.conversation_state.reset()
+        elif self.session_store is not None:
+            self.session_store.reset(session_id, type(self).__name__)
 
     @classmethod
     def get_description(cls):
@@ -95,3 +684,17 @@ class BaseAgent:
             str: Description of the agent's capabilities
         """
         return "A generic agent"
+
+    @classmethod
+    def get_examples(cls):
+        """
+        Return example queries that this agent handles.
+
+        This method can be overridden by subclasses to provide representative
+        user utterances. Together with the description, they train the local
+        classifier that routes queries without calling the language model.
+
+        Returns:
+            list: Example queries (empty by default)
+        """
+        return []
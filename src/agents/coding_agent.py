@@ -27,6 +27,9 @@ class CodingAgent(BaseAgent):
     previous interactions when working on complex programming tasks.
     """
 
+    # Code listings need more room than the default answer length
+    model_overrides = {"max_tokens": 2048}
+
     def __init__(self, model):
         """
         Initialize the coding agent with a specialized system prompt.
@@ -55,3 +58,28 @@ Only respond to coding questions. If the query is not about coding, politely dec
             str: Description of the agent's programming capabilities
         """
         return "Handles programming questions, code generation, debugging, and software development"
+
+    @classmethod
+    def get_examples(cls):
+        """
+        Return example queries that this agent handles.
+
+        Returns:
+            list: Example queries used to train the local routing classifier
+        """
+        return [
+            "write a python function to reverse a string",
+            "write code to sort a list",
+            "debug this javascript error",
+            "how do I read a file in python",
+            "implement a binary search in java",
+            "explain this stack trace",
+            "refactor this class to use dependency injection",
+            "write a sql query to join two tables",
+            "what is the difference between a list and a tuple in python",
+            "fix the bug in my code",
+            "write a unit test for this function",
+            "why does my for loop run one time too many",
+            "fix the error on line 12 of my script",
+            "build a react form with a submit button",
+        ]
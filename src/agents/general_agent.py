@@ -52,3 +52,25 @@ Maintain context across the conversation and refer back to previous exchanges wh
             str: Description of the agent's general capabilities
         """
         return "Handles general knowledge questions, explanations, and conversational queries"
+
+    @classmethod
+    def get_examples(cls):
+        """
+        Return example queries that this agent handles.
+
+        Returns:
+            list: Example queries used to train the local routing classifier
+        """
+        return [
+            "what is the capital of france",
+            "tell me about the history of rome",
+            "hello, how are you",
+            "explain how photosynthesis works",
+            "who wrote pride and prejudice",
+            "recommend a good book to read",
+            "what is the weather like on mars",
+            "summarize the plot of hamlet",
+            "what happened in 1969",
+            "how many people live in japan",
+            "suggest a dinner recipe for 4 people",
+        ]
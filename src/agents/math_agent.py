@@ -5,12 +5,31 @@ This module implements a specialized agent for handling mathematical problems,
 calculations, equations, and numerical analysis. It inherits from the BaseAgent
 class and overrides the get_description method to provide a description of its
 capabilities.
+
+Calculations that the local math evaluator can parse are answered without
+calling the model. Other queries go to the model, which can call the calculate
+tool to have exact arithmetic and equation solving done locally.
 """
 
+from langchain_core.tools import tool
+
 from .base_agent import BaseAgent
+from ..config.model_config import MATH_CONFIG
+from ..core import math_evaluator
 from ..core.registry import register_agent
 
 
+@tool
+def calculate(expression: str) -> str:
+    """Evaluate a math expression or solve an equation exactly.
+
+    Use Python syntax, e.g. "37*91", "sqrt(144) + 2**10", "15/100*80" or
+    "3*x + 5 = 20". Supports + - * / // % **, abs, round, sqrt, cbrt, exp,
+    log, log10, sin, cos, tan, factorial, pi and e.
+    """
+    return math_evaluator.calculate(expression)
+
+
 @register_agent
 class MathAgent(BaseAgent):
     """
@@ -24,9 +43,13 @@ class MathAgent(BaseAgent):
     - Analyze numerical data
 
     The agent maintains context across multiple turns, allowing it to build on
-    previous interactions when solving complex problems.
+    previous interactions when solving complex problems. Calculations that
+    parse cleanly are answered locally and exactly; for the others the model
+    may call the calculate tool.
     """
 
+    tools = (calculate,)
+
     def __init__(self, model):
         """
         Initialize the math agent with a specialized system prompt.
@@ -40,6 +63,7 @@ When presented with a math problem:
 2. Once you have all required information, break down the problem step by step
 3. Show your work clearly
 4. Verify your answer
+5. Use the calculate tool for exact arithmetic and for solving equations instead of computing by hand
 
 For problems like "find sum of two numbers" or similar operations where values aren't provided:
 - First ask for the first number
@@ -51,6 +75,20 @@ Only respond to math questions. If the query is not about math, politely decline
 """
         super().__init__(model, system_prompt)
 
+    def answer_locally(self, query):
+        """
+        Answer calculations the local math evaluator can parse.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            Optional[str]: The exact result, or None to ask the model
+        """
+        if not MATH_CONFIG["local_evaluation"]:
+            return None
+        return math_evaluator.answer(query)
+
     @classmethod
     def get_description(cls):
         """
@@ -60,3 +98,29 @@ Only respond to math questions. If the query is not about math, politely decline
             str: Description of the agent's mathematical capabilities
         """
         return "Handles mathematical problems, calculations, equations, and numerical analysis"
+
+    @classmethod
+    def get_examples(cls):
+        """
+        Return example queries that this agent handles.
+
+        Returns:
+            list: Example queries used to train the local routing classifier
+        """
+        return [
+            "what is 2+2",
+            "calculate 15% of 80",
+            "what is 37*91",
+            "what is 6 times 7",
+            "what is 100 divided by 4 plus 9",
+            "is 91 a prime number",
+            "solve x^2 - 4 = 0",
+            "solve the equation 3x + 5 = 20",
+            "find the derivative of sin(x)",
+            "integrate x^2 from 0 to 1",
+            "what is the square root of 144",
+            "find the sum of two numbers",
+            "compute the average of 4, 8 and 15",
+            "what is the probability of rolling two sixes",
+            "simplify (x + 1)^2",
+        ]
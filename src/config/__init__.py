@@ -4,6 +4,36 @@ Configuration package for the MultiAgentRegistryKit framework.
 This package contains configuration settings and constants used throughout the application.
 """
 
-from src.config.model_config import MODEL_CONFIG, DEFAULT_REGION, DEFAULT_MODEL_ID
+from src.config.model_config import (
+    MODEL_CONFIG,
+    MODEL_ROLES,
+    DEFAULT_REGION,
+    DEFAULT_MODEL_ID,
+    ROUTING_CONFIG,
+    SESSION_CONFIG,
+    HISTORY_CONFIG,
+    CLIENT_POOL_CONFIG,
+    METRICS_CONFIG,
+    SERVER_CONFIG,
+    RESILIENCE_CONFIG,
+    RATE_LIMIT_CONFIG,
+    PROMPT_CACHE_CONFIG,
+    MATH_CONFIG,
+)
 
-__all__ = ["MODEL_CONFIG", "DEFAULT_REGION", "DEFAULT_MODEL_ID"]
+__all__ = [
+    "MODEL_CONFIG",
+    "MODEL_ROLES",
+    "DEFAULT_REGION",
+    "DEFAULT_MODEL_ID",
+    "ROUTING_CONFIG",
+    "SESSION_CONFIG",
+    "HISTORY_CONFIG",
+    "CLIENT_POOL_CONFIG",
+    "METRICS_CONFIG",
+    "SERVER_CONFIG",
+    "RESILIENCE_CONFIG",
+    "RATE_LIMIT_CONFIG",
+    "PROMPT_CACHE_CONFIG",
+    "MATH_CONFIG",
+]
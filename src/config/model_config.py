@@ -20,3 +20,197 @@ MODEL_CONFIG = {
     # Maximum number of tokens to generate in the response
     "max_tokens": 1024,
 }
+
+# Model settings per role, overriding MODEL_CONFIG and the model ID passed to
+# RouterAgent. Each role may set "model_id", "temperature", "max_tokens" and
+# "stop_sequences". Agents can override their settings further with the
+# model_overrides class attribute.
+MODEL_ROLES = {
+    # Single-query routing replies are one agent name, a few tokens long.
+    # Stopping at "." cuts off explanations after the name
+    "router": {"max_tokens": 10, "stop_sequences": ["."]},
+    # Packed routing replies hold one "<number>: <agent name>" line per query,
+    # so max_tokens must cover ROUTING_CONFIG["batch_size"] lines
+    "batch_router": {"max_tokens": 512},
+    # Answer generation by the agents
+    "agent": {},
+    # Summaries of histories truncated with the "summarize" policy. Set
+    # "model_id" to a cheaper model than the agents' to lower their cost
+    "summarizer": {"max_tokens": 512},
+}
+
+# Routing configuration parameters
+ROUTING_CONFIG = {
+    # Maximum number of routing decisions kept in the routing cache (0 disables caching)
+    "cache_max_size": 4096,
+    # Seconds a cached routing decision stays valid (None = no expiry)
+    "cache_ttl_seconds": 3600.0,
+    # Minimum confidence for the local classifier to route without calling the model
+    # (None disables the local fast path). Calibrated for precision on the held-out
+    # queries of benchmarks/bench_routing.py
+    "local_confidence_threshold": 0.75,
+    # Minimum follow-up score to keep the current agent without routing the query
+    # (None disables follow-up detection)
+    "follow_up_threshold": 0.6,
+    # Number of queries packed into a single routing prompt by route_batch
+    "batch_size": 20,
+    # Maximum number of routing calls route_batch keeps in flight
+    "batch_max_concurrency": 8,
+    # Number of retries for a failed routing call in route_batch
+    "batch_max_retries": 2,
+    # Initial delay in seconds before a retry (doubled on every attempt)
+    "batch_retry_backoff_seconds": 0.5,
+    # Start the current agent while its turn is being routed (see SpeculativeExecutor)
+    "speculative_execution": False,
+    # Maximum number of agents a query is sent to in fan-out mode (see FanOutExecutor)
+    "fan_out_top_k": 2,
+    # Minimum routing score of every fan-out agent but the best one
+    "fan_out_min_score": 0.3,
+    # Minimum local classifier confidence to send a fan-out query to a single agent
+    # without ranking by the model (None = always rank with the model)
+    "fan_out_local_confidence_threshold": 0.95,
+    # Seconds each fan-out agent may take before its answer is given up (None = no limit)
+    "fan_out_agent_timeout_seconds": 20.0,
+    # How fan-out answers are merged: "first_complete", "best_scored" or "synthesize"
+    "fan_out_merge_strategy": "best_scored",
+}
+
+# Session store configuration parameters
+SESSION_CONFIG = {
+    # Maximum number of sessions kept in memory (least recently used are evicted first)
+    "max_sessions": 10000,
+    # Approximate memory cap in bytes for all in-memory sessions (None = no cap)
+    "max_memory_bytes": 512 * 1024 * 1024,
+    # Seconds after which an idle session is evicted (None = never)
+    "idle_timeout_seconds": None,
+    # Number of most recently used sessions that keep the message list sent to the
+    # model ready; older sessions keep only their compact history (None = all)
+    "hot_sessions": 1000,
+    # Number of most recent turns loaded when a persisted session is resumed
+    "load_last_turns": 20,
+    # Number of buffered messages that triggers a write to a persistent history backend
+    "history_batch_size": 64,
+    # Maximum seconds a message stays buffered before it is written
+    "history_flush_interval_seconds": 1.0,
+}
+
+# Conversation history configuration parameters
+HISTORY_CONFIG = {
+    # Maximum number of estimated tokens kept in a conversation history (None = unbounded)
+    "token_budget": 100000,
+    # How to shrink a history that exceeds its budget:
+    # "sliding_window", "keep_first_last" or "summarize"
+    "truncation_policy": "sliding_window",
+    # Number of leading messages preserved by the "keep_first_last" policy
+    "keep_first_messages": 2,
+    # Fraction of the budget the "summarize" policy shrinks the history to,
+    # so that the summarization call is amortized over several turns
+    "summarize_target_ratio": 0.5,
+}
+
+# Bedrock client pool configuration parameters
+CLIENT_POOL_CONFIG = {
+    # Maximum number of HTTP connections kept open per Bedrock client
+    "max_pool_connections": 50,
+    # Enable TCP keep-alive on pooled connections
+    "tcp_keepalive": True,
+    # Seconds to wait when establishing a connection
+    "connect_timeout": 5,
+    # Seconds to wait for a response on an established connection
+    "read_timeout": 60,
+}
+
+# Metrics configuration parameters
+METRICS_CONFIG = {
+    # Record routing, agent and token metrics (when disabled, recording is a no-op)
+    "enabled": True,
+    # Upper bounds in seconds of the latency histogram buckets
+    "latency_buckets": (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    ),
+    # Port of the local /metrics HTTP endpoint started by main (None = no endpoint)
+    "http_port": None,
+    # Interface the /metrics endpoint binds to
+    "http_host": "127.0.0.1",
+}
+
+# Server mode configuration parameters
+SERVER_CONFIG = {
+    # Interface and port the server binds to
+    "host": "127.0.0.1",
+    "port": 8000,
+    # Maximum number of requests processed concurrently
+    "max_in_flight": 64,
+    # Maximum number of requests waiting for a slot (further requests get 429)
+    "max_queue": 256,
+    # Seconds a request may wait for a slot before it gets 503 (None = no limit)
+    "queue_timeout_seconds": 5.0,
+    # Maximum accepted request body size in bytes
+    "max_body_bytes": 1024 * 1024,
+}
+
+# Resilience configuration parameters for model calls
+RESILIENCE_CONFIG = {
+    # Seconds a model call may take including retries (None = no deadline)
+    "deadline_seconds": 30.0,
+    # Maximum retries of a single call after transient failures
+    "max_retries": 3,
+    # Upper bounds in seconds of the first and of any jittered backoff delay
+    "backoff_base_seconds": 0.2,
+    "backoff_max_seconds": 5.0,
+    # Retries earned per call, and the maximum number of banked retries
+    "retry_budget_ratio": 0.2,
+    "retry_budget_max_tokens": 10,
+    # Consecutive transient failures that open a model's circuit breaker
+    "failure_threshold": 5,
+    # Seconds an open breaker rejects calls before allowing a trial call
+    "recovery_timeout_seconds": 30.0,
+}
+
+# Client-side rate limits per (region, model_id). Off by default; to enable
+# them, set the limits to the account's Bedrock quotas for the model
+RATE_LIMIT_CONFIG = {
+    # Requests per minute (None = no request limit)
+    "requests_per_minute": None,
+    # Input plus output tokens per minute (None = no token limit)
+    "tokens_per_minute": None,
+    # Seconds of quota that may be used in a single burst
+    "burst_seconds": 5.0,
+}
+
+# Provider-side prompt prefix caching parameters
+PROMPT_CACHE_CONFIG = {
+    # Mark system prompts and conversation prefixes as cache breakpoints
+    "enabled": True,
+    # Fragments of the model IDs that support prompt caching with cache_control
+    # (models not listed, like the default Claude 3 Haiku, are sent unmarked)
+    "model_ids": (
+        "anthropic.claude-3-5-haiku",
+        "anthropic.claude-3-7-sonnet",
+        "anthropic.claude-haiku-4",
+        "anthropic.claude-sonnet-4",
+        "anthropic.claude-opus-4",
+    ),
+}
+
+# Local evaluation of calculations by MathAgent
+MATH_CONFIG = {
+    # Answer calculations that parse cleanly without calling the model
+    "local_evaluation": True,
+    # Use SymPy, if installed, for equations and symbolic commands
+    "use_sympy": True,
+    # Maximum length of an evaluated expression in characters
+    "max_expression_length": 256,
+    # Maximum size of an exact intermediate result in bits (about 1000 digits)
+    "max_bits": 3400,
+    # Largest argument of factorial
+    "max_factorial": 400,
+    # Highest degree of a polynomial equation solved with SymPy
+    "max_degree": 4,
+    # Highest estimated degree of a symbolic expression once expanded
+    "max_symbolic_degree": 64,
+    # Seconds a SymPy computation may take before the query is left to the model
+    "symbolic_timeout_seconds": 2.0,
+    # Number of SymPy computations that may run at once
+    "symbolic_workers": 2,
+}
@@ -7,13 +7,55 @@ This package contains the core components of the framework:
 - Router Agent: Main routing agent
 - LLM Model: Language model provider
 - Conversation State: Conversation history management
+- Message Record: Compact storage of history messages
+- Routing Cache: Cache for routing decisions
+- Local Classifier: Model-free fast path for routing
+- Routing Decision: Structured routing results and follow-up detection
+- Streaming: Timing statistics for streamed responses
+- Session Store: Per-session conversation state
+- History Backend: In-memory and SQLite storage for conversation histories
+- Client Pool: Shared Bedrock clients and model instances
+- Speculation: Running the current agent while a turn is being routed
+- Fan-Out: Running the top-ranked agents concurrently and merging their answers
+- Math Evaluator: Safe local evaluation of arithmetic and simple algebra
+- Metrics: Latency, token and routing metrics with OpenMetrics export
+- Admission: Bounded request concurrency with load shedding
+- Resilience: Deadlines, retries and circuit breaking for model calls
+- Rate Limiter: Client-side request and token quotas per model
+- Prompt Cache: Cache breakpoints for provider-side prompt caching
 """
 
 from src.core.registry import agent_registry as AgentRegistry, register_agent
 from src.core.discovery import AgentDiscovery
 from src.core.router_agent import RouterAgent
 from src.core.llm_model import LLMModelProvider, create_llm_model
+from src.core.client_pool import ClientPool, client_pool
+from src.core.speculation import SpeculationStats, SpeculativeExecutor
+from src.core.fan_out import FanOutExecutor, FanOutStats, MergeStrategy
+from src.core import math_evaluator
+from src.core.metrics import MetricsRegistry, metrics, start_metrics_server
+from src.core.admission import AdmissionController, Overloaded
+from src.core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResilientChatModel,
+    RetryBudget,
+)
+from src.core.rate_limiter import RateLimiter, TokenBucket
+from src.core.prompt_cache import add_cache_breakpoints, supports_prompt_caching
 from src.core.conversation_state import ConversationState
+from src.core.message_record import MessageRecord, Role
+from src.core.routing_cache import RoutingCache
+from src.core.local_classifier import LocalIntentClassifier
+from src.core.routing_decision import FollowUpDetector, RoutingDecision
+from src.core.streaming import StreamStats
+from src.core.session_store import SessionStore
+from src.core.history_backend import (
+    HistoryBackend,
+    InMemoryHistoryBackend,
+    SQLiteHistoryBackend,
+)
 
 __all__ = [
     "AgentRegistry",
@@ -23,4 +65,37 @@ __all__ = [
     "LLMModelProvider",
     "create_llm_model",
     "ConversationState",
+    "MessageRecord",
+    "Role",
+    "RoutingCache",
+    "LocalIntentClassifier",
+    "RoutingDecision",
+    "FollowUpDetector",
+    "StreamStats",
+    "SessionStore",
+    "HistoryBackend",
+    "InMemoryHistoryBackend",
+    "SQLiteHistoryBackend",
+    "ClientPool",
+    "client_pool",
+    "SpeculativeExecutor",
+    "SpeculationStats",
+    "math_evaluator",
+    "FanOutExecutor",
+    "FanOutStats",
+    "MergeStrategy",
+    "MetricsRegistry",
+    "metrics",
+    "start_metrics_server",
+    "AdmissionController",
+    "Overloaded",
+    "ResilientChatModel",
+    "CircuitBreaker",
+    "RetryBudget",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "RateLimiter",
+    "TokenBucket",
+    "add_cache_breakpoints",
+    "supports_prompt_caching",
 ]
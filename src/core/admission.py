@@ -0,0 +1,123 @@
+"""
+Admission - Bounded concurrency with a wait queue and load shedding.
+
+This module provides an admission controller for the server mode. It admits
+at most max_in_flight requests at a time. Further requests wait in a queue of
+at most max_queue requests for up to queue_timeout seconds. A request that
+finds the queue full, or times out while waiting, is rejected so the caller can
+shed load instead of letting latency grow without bound.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from src.config.model_config import SERVER_CONFIG
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request cannot be admitted.
+
+    Attributes:
+        reason (str): "queue_full" if the wait queue was full, or "timeout" if
+                      the request waited longer than the queue timeout
+        retry_after (float): Suggested seconds before retrying
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        """
+        Initialize the error.
+
+        Args:
+            reason (str): Why the request was rejected
+            retry_after (float): Suggested seconds before retrying
+        """
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits the number of requests processed concurrently on an event loop.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = SERVER_CONFIG["max_in_flight"],
+        max_queue: int = SERVER_CONFIG["max_queue"],
+        queue_timeout: Optional[float] = SERVER_CONFIG["queue_timeout_seconds"],
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_in_flight (int): Maximum number of requests processed at once
+            max_queue (int): Maximum number of requests waiting for admission
+            queue_timeout (Optional[float]): Maximum seconds a request waits,
+                                             or None to wait indefinitely
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+        }
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a processing slot for the duration of the context.
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self._stats["rejected_queue_full"] += 1
+                raise Overloaded("queue_full", self._retry_after())
+            self.waiting += 1
+            self._stats["queued"] += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._stats["rejected_timeout"] += 1
+                raise Overloaded("timeout", self._retry_after()) from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self._stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def _retry_after(self) -> float:
+        """
+        Suggest how long a rejected client should wait before retrying.
+
+        Returns:
+            float: Seconds, at least one
+        """
+        return max(1.0, self.queue_timeout or 1.0)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Dict[str, int]: Current in-flight and waiting requests and the
+                            numbers of admitted, queued and rejected requests
+        """
+        return {"in_flight": self.in_flight, "waiting": self.waiting, **self._stats}
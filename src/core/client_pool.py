@@ -0,0 +1,173 @@
+"""
+Client Pool - Process-wide sharing of Bedrock clients and model instances.
+
+This module provides a pool that creates at most one Bedrock runtime client per
+region and one language model instance per model configuration. Creating
+routers, agents or model providers then reuses existing clients and their HTTP
+connection pools instead of paying for client construction and credential
+resolution again. The pool also holds one rate limiter per (region, model_id),
+shared by every model configuration of that model.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from src.config.model_config import CLIENT_POOL_CONFIG, RATE_LIMIT_CONFIG
+from .rate_limiter import RateLimiter
+
+
+class ClientPool:
+    """
+    Thread-safe pool of Bedrock runtime clients and model instances.
+
+    Clients are keyed by region and share a single boto3 session, so
+    credentials are resolved once. Each client keeps up to max_pool_connections
+    keep-alive connections. Model instances are keyed by the caller, typically
+    on (region, model_id, temperature, max_tokens).
+    """
+
+    def __init__(
+        self,
+        max_pool_connections: int = CLIENT_POOL_CONFIG["max_pool_connections"],
+        tcp_keepalive: bool = CLIENT_POOL_CONFIG["tcp_keepalive"],
+        connect_timeout: float = CLIENT_POOL_CONFIG["connect_timeout"],
+        read_timeout: float = CLIENT_POOL_CONFIG["read_timeout"],
+    ):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_pool_connections (int): Maximum HTTP connections per client
+            tcp_keepalive (bool): Whether to enable TCP keep-alive
+            connect_timeout (float): Seconds to wait when connecting
+            read_timeout (float): Seconds to wait for a response
+        """
+        self.client_config = Config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=tcp_keepalive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self._session = None
+        self._clients: Dict[str, Any] = {}
+        self._models: Dict[Hashable, Any] = {}
+        self._rate_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "clients_created": 0,
+            "client_reuses": 0,
+            "models_created": 0,
+            "model_reuses": 0,
+        }
+
+    def get_client(self, region_name: str):
+        """
+        Get the Bedrock runtime client for a region, creating it if needed.
+
+        Args:
+            region_name (str): AWS region name
+
+        Returns:
+            boto3.client: Shared Bedrock runtime client
+        """
+        with self._lock:
+            client = self._clients.get(region_name)
+            if client is not None:
+                self._stats["client_reuses"] += 1
+                return client
+
+            # boto3 sessions are not thread-safe, so clients are created under the lock
+            if self._session is None:
+                self._session = boto3.session.Session()
+            client = self._session.client(
+                service_name="bedrock-runtime",
+                region_name=region_name,
+                config=self.client_config,
+            )
+            self._clients[region_name] = client
+            self._stats["clients_created"] += 1
+            return client
+
+    def get_model(self, key: Hashable, factory: Callable[[], Any]):
+        """
+        Get the model instance for a configuration key, creating it if needed.
+
+        Args:
+            key (Hashable): Identifies the model configuration
+            factory (Callable[[], Any]): Creates the model on a pool miss
+
+        Returns:
+            Any: Shared model instance
+        """
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._stats["model_reuses"] += 1
+                return model
+
+        # Build outside the lock: the factory may itself request a client
+        model = factory()
+        with self._lock:
+            existing = self._models.setdefault(key, model)
+            if existing is model:
+                self._stats["models_created"] += 1
+            else:
+                self._stats["model_reuses"] += 1
+            return existing
+
+    def get_rate_limiter(self, region_name: str, model_id: str) -> Optional[RateLimiter]:
+        """
+        Get the rate limiter of a model, creating it from RATE_LIMIT_CONFIG if needed.
+
+        Args:
+            region_name (str): AWS region name
+            model_id (str): Model ID
+
+        Returns:
+            Optional[RateLimiter]: Limiter shared by all configurations of the
+                                   model, or None if RATE_LIMIT_CONFIG sets no
+                                   limits
+        """
+        if (
+            RATE_LIMIT_CONFIG["requests_per_minute"] is None
+            and RATE_LIMIT_CONFIG["tokens_per_minute"] is None
+        ):
+            return None
+        with self._lock:
+            limiter = self._rate_limiters.get((region_name, model_id))
+            if limiter is None:
+                limiter = RateLimiter(name=model_id)
+                self._rate_limiters[(region_name, model_id)] = limiter
+            return limiter
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get pool usage statistics.
+
+        Returns:
+            Dict[str, int]: Numbers of clients and models created and reused
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["clients"] = len(self._clients)
+            stats["models"] = len(self._models)
+            stats["rate_limiters"] = len(self._rate_limiters)
+            return stats
+
+    def clear(self):
+        """
+        Drop all pooled clients, models and rate limiters.
+
+        Objects already handed out keep working; later requests create new ones.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._models.clear()
+            self._rate_limiters.clear()
+
+
+# Create the process-wide pool
+client_pool = ClientPool()
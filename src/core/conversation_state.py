@@ -2,11 +2,65 @@
 Conversation State - Manages conversation history for multi-turn interactions.
 
 This module provides a data class for storing and managing conversation history
-between users and agents. It supports adding messages and resetting the conversation.
+between users and agents. It supports adding messages and resetting the conversation,
+and keeps the history within a configurable token budget by truncating or
+summarizing older turns. The history is stored as compact message records,
+and the message list sent to the model is maintained alongside it while the
+conversation is active, so building a prompt does not convert and copy the
+history message by message every turn.
 """
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, List, Optional, Tuple
+
+from langchain_core.messages import SystemMessage
+
+from src.config.model_config import HISTORY_CONFIG
+from .history_backend import HistoryBackend
+from .message_record import MessageRecord, Role
+from .prompt_cache import with_cache_breakpoint
+
+# Approximate fixed memory cost of one stored message record, in bytes
+MESSAGE_OVERHEAD_BYTES = 96
+
+# Approximate fixed memory cost of one LangChain message in the message view
+MESSAGE_VIEW_OVERHEAD_BYTES = 832
+
+# Supported truncation policies
+SLIDING_WINDOW = "sliding_window"
+KEEP_FIRST_LAST = "keep_first_last"
+SUMMARIZE = "summarize"
+
+
+def _content_length(message) -> int:
+    """
+    Get the length of a message's text content.
+
+    Args:
+        message: The message
+
+    Returns:
+        int: Number of characters of text content
+    """
+    content = getattr(message, "content", "")
+    return len(content) if isinstance(content, str) else 0
+
+
+def estimate_tokens(message) -> int:
+    """
+    Estimate the number of tokens of a message.
+
+    This uses the common approximation of four characters per token plus a
+    small per-message overhead, which is close enough for budgeting and avoids
+    calling a tokenizer on every turn.
+
+    Args:
+        message: The message
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return _content_length(message) // 4 + 4
 
 
 @dataclass
@@ -16,32 +70,323 @@ class ConversationState:
 
     This class manages the conversation history for agents, providing
     methods to add messages and reset the conversation. It uses a simple
-    list to store the message history in chronological order.
+    list to store the message history in chronological order, as
+    MessageRecord objects: messages added as LangChain messages are converted
+    to records, which take a fraction of the memory.
+
+    The token count of every message is computed once when it is added and
+    kept in its record, so checking the token budget costs O(1) per
+    turn. When the budget is exceeded, the oldest exchanges are removed in
+    human/AI pairs according to the truncation policy:
+    - "sliding_window": drop the oldest exchanges
+    - "keep_first_last": keep the first keep_first_messages messages and drop
+      the oldest exchanges after them
+    - "summarize": drop the oldest exchanges and fold them into a running
+      summary produced by the summarizer (falls back to a sliding window if no
+      summarizer is set)
+
+    Alongside the history, the state can keep a message view: the prefix of
+    the message list sent to the model, made of the system message followed
+    by the history as LangChain messages. The view is built from the records
+    on the first call to messages_for, then grows by one append per added
+    message, and the system message is created only when the system prompt or
+    the summary changes, so messages_for costs a single list copy instead of
+    rebuilding the prompt. Idle conversations drop the view with
+    release_view, so only active ones pay for the LangChain messages. The
+    history must therefore only be changed through the methods of this class.
 
     Attributes:
-        message_history (List): List of messages in the conversation
+        message_history (List[MessageRecord]): List of messages in the conversation
+        token_budget (Optional[int]): Maximum estimated tokens kept in the
+                                      history and summary, or None for unbounded
+        truncation_policy (str): How to shrink a history over budget
+        keep_first_messages (int): Leading messages kept by "keep_first_last"
+        summarizer (Optional[Callable[[str, List], str]]): Called with the
+                                      previous summary and the dropped messages,
+                                      returns the new summary
+        token_counter (Callable): Estimates the token count of a message
+        summary (str): Summary of turns removed by the "summarize" policy
+        total_tokens (int): Estimated tokens of the history and summary
+        approx_bytes (int): Running estimate of the memory held by the history
+        on_resize (Optional[Callable[[int], None]]): Called with the change in
+                                                     approx_bytes whenever it changes
+        backend (Optional[HistoryBackend]): Storage that every added message
+                                            is written through to
+        storage_key (Optional[Tuple[str, str]]): Session ID and agent name
+                                                 identifying the history in the backend
     """
 
     message_history: List = field(default_factory=list)
+    token_budget: Optional[int] = HISTORY_CONFIG["token_budget"]
+    truncation_policy: str = HISTORY_CONFIG["truncation_policy"]
+    keep_first_messages: int = HISTORY_CONFIG["keep_first_messages"]
+    summarizer: Optional[Callable[[str, List], str]] = field(
+        default=None, repr=False, compare=False
+    )
+    token_counter: Callable = field(default=estimate_tokens, repr=False, compare=False)
+    summary: str = ""
+    total_tokens: int = field(default=0, init=False)
+    approx_bytes: int = field(default=0, init=False, repr=False)
+    on_resize: Optional[Callable[[int], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    backend: Optional[HistoryBackend] = field(default=None, repr=False, compare=False)
+    storage_key: Optional[Tuple[str, str]] = field(default=None, repr=False)
+    _summary_tokens: int = field(default=0, init=False, repr=False, compare=False)
+    _prefix: Optional[List] = field(default=None, init=False, repr=False, compare=False)
+    _system_key: Optional[Tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """
+        Account for messages passed to the constructor.
+        """
+        history, self.message_history = self.message_history, []
+        for message in history:
+            self.add_message(message)
+
+    def messages_for(self, system_prompt: str, query_message, cache_breakpoints=False):
+        """
+        Get the message list to send to the model for a new query.
+
+        The list holds the system message, the history and the query message.
+        It is a new list, so the caller may keep it while the history changes,
+        but the message objects are shared with the message view: adding
+        query_message to the history afterwards appends the same object to
+        the view. The view is built from the history records if it was
+        released.
+
+        Args:
+            system_prompt (str): The agent's system prompt. The running
+                                 summary, if any, is appended to it
+            query_message: The message with the new query
+            cache_breakpoints (bool): Whether to mark the system message and
+                                      the last history message as prompt
+                                      cache breakpoints
+
+        Returns:
+            List: The messages to send
+        """
+        if self._prefix is None:
+            self._prefix = [None]
+            self._prefix.extend(record.to_message() for record in self.message_history)
+            self._system_key = None
+            self._resize(len(self.message_history) * MESSAGE_VIEW_OVERHEAD_BYTES)
+
+        key = (system_prompt, self.summary, cache_breakpoints)
+        if self._system_key != key:
+            content = system_prompt
+            if self.summary:
+                content += f"\n\nSummary of the earlier conversation:\n{self.summary}"
+            system_message = SystemMessage(content=content)
+            if cache_breakpoints:
+                system_message = with_cache_breakpoint(system_message)
+            self._prefix[0] = system_message
+            self._system_key = key
+
+        messages = self._prefix + [query_message]
+        if cache_breakpoints and len(messages) > 2:
+            messages[-2] = with_cache_breakpoint(messages[-2])
+        return messages
 
     def add_message(self, message):
         """
         Add a message to the conversation history.
 
         This method appends a new message to the conversation history.
-        Messages can be of any type, but are typically LangChain message
-        objects (HumanMessage, AIMessage, etc.).
+        Messages are LangChain message objects (HumanMessage, AIMessage,
+        etc.) or MessageRecord objects, and are stored as records. If the
+        history then exceeds the token budget, it is truncated according to
+        the truncation policy.
 
         Args:
             message: The message to add to the history
         """
-        self.message_history.append(message)
+        if self.backend is not None:
+            record = message
+            if not isinstance(message, MessageRecord):
+                record = MessageRecord.from_message(message)
+            self.backend.append(*self.storage_key, record)
+        self._append(message)
+
+    def _append(self, message):
+        """
+        Add a message to the in-memory history and enforce the token budget.
+
+        Args:
+            message: The LangChain message or record to add to the history
+        """
+        tokens = self.token_counter(message)
+        if isinstance(message, MessageRecord):
+            record = MessageRecord(message.role, message.content, tokens)
+            message = None
+        else:
+            record = MessageRecord.from_message(message, tokens)
+        self.message_history.append(record)
+        self.total_tokens += tokens
+        size = MESSAGE_OVERHEAD_BYTES + _content_length(record)
+        if self._prefix is not None:
+            # Keep the caller's message so it is the object sent to the model
+            self._prefix.append(message if message is not None else record.to_message())
+            size += MESSAGE_VIEW_OVERHEAD_BYTES
+        self._resize(size)
+
+        if self.token_budget is not None and self.total_tokens > self.token_budget:
+            self._truncate()
+
+    def attach(
+        self,
+        backend: HistoryBackend,
+        session_id: str,
+        agent_name: str,
+        last_k_turns: Optional[int] = None,
+    ):
+        """
+        Attach a storage backend and load the most recent persisted turns.
+
+        Only the last last_k_turns exchanges are loaded into memory; older
+        messages stay in the backend. Messages added afterwards are written
+        through to the backend.
+
+        Args:
+            backend (HistoryBackend): The storage backend
+            session_id (str): Identifier of the session
+            agent_name (str): Name of the agent owning the history
+            last_k_turns (Optional[int]): Number of exchanges to load, or None
+                                          to load the whole history
+        """
+        self.backend = None
+        last_k = None if last_k_turns is None else 2 * last_k_turns
+        records = backend.load(session_id, agent_name, last_k)
+        # Start at a user message so the history keeps alternating roles
+        while records and records[0].role is not Role.HUMAN:
+            records = records[1:]
+        for record in records:
+            self._append(record)
+        self.backend = backend
+        self.storage_key = (session_id, agent_name)
+
+    def _resize(self, delta: int):
+        """
+        Update the memory estimate and notify the on_resize callback.
+
+        Args:
+            delta (int): Change in approximate size in bytes
+        """
+        if not delta:
+            return
+        self.approx_bytes += delta
+        if self.on_resize is not None:
+            self.on_resize(delta)
+
+    def _truncation_end(self, start: int, target: int) -> Tuple[int, int]:
+        """
+        Find the exchanges to remove for the history to fit a token target.
+
+        Messages are removed in human/AI pairs so the history keeps alternating
+        roles, and the most recent exchange is always kept.
+
+        Args:
+            start (int): Index of the first message that may be removed
+            target (int): Token count to shrink the history to
+
+        Returns:
+            Tuple[int, int]: End index (exclusive) of the messages to remove,
+                             and their tokens
+        """
+        end = start
+        removed_tokens = 0
+        while (
+            self.total_tokens - removed_tokens > target
+            and len(self.message_history) - (end + 2) >= 2
+        ):
+            removed_tokens += self.message_history[end].tokens
+            removed_tokens += self.message_history[end + 1].tokens
+            end += 2
+        return end, removed_tokens
+
+    def _truncate(self):
+        """
+        Remove the oldest exchanges until the history fits the token budget.
+
+        With the "summarize" policy, the removed exchanges are folded into the
+        summary before they are deleted. If the summarizer fails, the history
+        is truncated as with the "sliding_window" policy instead, down to the
+        budget only, and the previous summary is kept.
+        """
+        start = self.keep_first_messages if self.truncation_policy == KEEP_FIRST_LAST else 0
+        summarize = self.truncation_policy == SUMMARIZE and self.summarizer is not None
+        target = self.token_budget
+        if summarize:
+            # Shrink further so the summarization call is amortized over several turns
+            target = int(self.token_budget * HISTORY_CONFIG["summarize_target_ratio"])
+
+        end, removed_tokens = self._truncation_end(start, target)
+        if end == start:
+            return
+
+        summary = None
+        if summarize:
+            try:
+                summary = self.summarizer(self.summary, self.message_history[start:end])
+            except Exception as e:
+                print(f"Error summarizing conversation history: {e}")
+                end, removed_tokens = self._truncation_end(start, self.token_budget)
+                if end == start:
+                    return
+
+        removed = self.message_history[start:end]
+        del self.message_history[start:end]
+        size = sum(MESSAGE_OVERHEAD_BYTES + _content_length(m) for m in removed)
+        if self._prefix is not None:
+            del self._prefix[1 + start : 1 + end]
+            size += len(removed) * MESSAGE_VIEW_OVERHEAD_BYTES
+        self.total_tokens -= removed_tokens
+        self._resize(-size)
+
+        if summary is not None:
+            self._set_summary(summary)
+
+    def _set_summary(self, summary: str):
+        """
+        Replace the running summary and update the token count.
+
+        Args:
+            summary (str): The new summary
+        """
+        summary_tokens = len(summary) // 4
+        self.total_tokens += summary_tokens - self._summary_tokens
+        self._resize(len(summary) - len(self.summary))
+        self._summary_tokens = summary_tokens
+        self.summary = summary
+
+    def release_view(self):
+        """
+        Drop the message view to free the memory of its LangChain messages.
+
+        The history is kept. The view is rebuilt from the history records on
+        the next call to messages_for.
+        """
+        prefix, self._prefix = self._prefix, None
+        if prefix is not None:
+            self._system_key = None
+            self._resize(-(len(prefix) - 1) * MESSAGE_VIEW_OVERHEAD_BYTES)
 
     def reset(self):
         """
         Reset the conversation history.
 
         This method clears the conversation history by replacing the
-        message_history list with an empty list.
+        message_history list with an empty list and discards the summary.
+        Persisted messages are deleted from the backend, if one is attached.
         """
+        if self.backend is not None:
+            self.backend.clear(*self.storage_key)
         self.message_history = []
+        self._prefix = None
+        self._system_key = None
+        self.summary = ""
+        self._summary_tokens = 0
+        self.total_tokens = 0
+        self._resize(-self.approx_bytes)
@@ -1,66 +1,225 @@
 """
 Agent Discovery - Automatic discovery and loading of agent modules.
 
-This module provides functionality to dynamically discover and import agent modules
-from the agents package. It handles the automatic registration of agents with the
-registry when their modules are imported.
+This module provides functionality to discover agents without importing every
+agent module at startup. Agents are registered from lightweight metadata found in:
+- importlib.metadata entry points in the "multi_agent_registry_kit.agents" group,
+  which lets third-party packages contribute agents
+- a manifest file generated from the agents package
+
+The real module of such an agent is imported only when the agent is first
+instantiated. Agent modules missing from the manifest (or every module, if there
+is no manifest) are still imported so that their @register_agent decorators run.
 """
 
+import argparse
 import importlib
+import json
 import os
 import pkgutil
-from typing import List, Optional, Set
+from importlib.metadata import entry_points
+from typing import Dict, List, Optional, Set
+
+from .registry import agent_registry as AgentRegistry, LazyAgentClass
+
+# Entry point group through which installed packages contribute agents
+ENTRY_POINT_GROUP = "multi_agent_registry_kit.agents"
+
+# File name of the manifest inside the agents package
+MANIFEST_FILENAME = "agents_manifest.json"
 
 
 class AgentDiscovery:
     """
-    Class responsible for discovering and importing agent modules.
+    Class responsible for discovering agents.
 
-    This class scans the agents package directory, imports all agent modules
-    (except those explicitly excluded), and triggers their registration with
-    the agent registry through the import process.
+    This class registers agents described by entry points and by the manifest
+    of the agents package without importing them, then imports the agent
+    modules the manifest does not cover (except those explicitly excluded),
+    which triggers their registration with the agent registry.
     """
 
-    def __init__(self, excluded_modules: Optional[List[str]] = None):
+    def __init__(
+        self,
+        excluded_modules: Optional[List[str]] = None,
+        package: str = "src.agents",
+        manifest_path: Optional[str] = None,
+        use_entry_points: bool = True,
+    ):
         """
         Initialize the agent discovery class.
 
         Args:
             excluded_modules: List of module names to exclude from discovery.
                              Default excludes 'base_agent' as it's not a concrete agent.
+            package: Dotted name of the package to scan for agent modules
+            manifest_path: Path of the agent manifest. Defaults to
+                          agents_manifest.json inside the package
+            use_entry_points: Whether to load agents contributed through
+                             entry points of installed packages
         """
         self.excluded_modules = excluded_modules or ["base_agent"]
+        self.package = package
+        self.manifest_path = manifest_path
+        self.use_entry_points = use_entry_points
         self.discovered_modules: Set[str] = set()
 
+    def _package_dir(self) -> str:
+        """
+        Get the directory of the agents package.
+
+        Importing the package itself is cheap: its __init__ loads agent
+        modules only on attribute access.
+
+        Returns:
+            str: Directory containing the agent modules
+        """
+        agents = importlib.import_module(self.package)
+        return os.path.dirname(agents.__file__)
+
+    def _get_manifest_path(self) -> str:
+        """
+        Get the path of the manifest file.
+
+        Returns:
+            str: The configured manifest path or the package default
+        """
+        return self.manifest_path or os.path.join(self._package_dir(), MANIFEST_FILENAME)
+
     def discover_agents(self) -> Set[str]:
         """
-        Import all agent modules to trigger registration with the registry.
+        Register all available agents with the registry.
 
-        This method scans the agents package directory and imports all modules
-        except those in the excluded_modules list. The import process triggers
-        the @register_agent decorator, which registers the agent classes with
-        the registry.
+        This method:
+        1. Registers agents described by entry points
+        2. Registers agents listed in the manifest without importing them
+        3. Imports the remaining modules of the agents package (except those
+           in the excluded_modules list), whose @register_agent decorators
+           register the agent classes
 
         Returns:
-            Set[str]: Set of module names that were successfully imported
+            Set[str]: Set of module names that were discovered
         """
-        # Get the directory of the agents package
-        from .. import agents
+        if self.use_entry_points:
+            self._load_entry_points()
 
-        package_dir = os.path.dirname(agents.__file__)
+        manifest_modules = self._load_manifest()
+        self.discovered_modules.update(manifest_modules)
 
-        # Import all modules in the package to trigger registration
-        for _, module_name, _ in pkgutil.iter_modules([package_dir]):
+        # Import modules the manifest does not describe to trigger registration
+        for _, module_name, _ in pkgutil.iter_modules([self._package_dir()]):
             # Skip excluded modules
-            if module_name not in self.excluded_modules:
-                try:
-                    importlib.import_module(f"src.agents.{module_name}")
-                    self.discovered_modules.add(module_name)
-                except ImportError as e:
-                    print(f"Error importing agent module {module_name}: {e}")
+            if module_name in self.excluded_modules or module_name in manifest_modules:
+                continue
+            try:
+                importlib.import_module(f"{self.package}.{module_name}")
+                self.discovered_modules.add(module_name)
+            except ImportError as e:
+                print(f"Error importing agent module {module_name}: {e}")
 
         return self.discovered_modules
 
+    def _load_entry_points(self):
+        """
+        Register agents contributed through entry points.
+
+        An entry point may refer to an agent class, which is registered
+        directly, or to a list of agent metadata dictionaries (or a callable
+        returning one), which are registered without importing the agents.
+        """
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                target = entry_point.load()
+                if isinstance(target, type):
+                    if AgentRegistry.get_agent(target.__name__) is None:
+                        AgentRegistry.register_agent(target)
+                    continue
+                for entry in target() if callable(target) else target:
+                    self._register_entry(entry)
+            except Exception as e:
+                print(f"Error loading agent entry point {entry_point.name}: {e}")
+
+    def _load_manifest(self) -> Set[str]:
+        """
+        Register the agents listed in the manifest without importing them.
+
+        Returns:
+            Set[str]: Names of the package modules the manifest describes
+        """
+        path = self._get_manifest_path()
+        if not os.path.exists(path):
+            return set()
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)["agents"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading agent manifest {path}: {e}")
+            return set()
+
+        modules = set()
+        for entry in entries:
+            self._register_entry(entry)
+            module_path = entry["import_path"].partition(":")[0]
+            package, _, module_name = module_path.rpartition(".")
+            if package == self.package:
+                modules.add(module_name)
+        return modules
+
+    @staticmethod
+    def _register_entry(entry: Dict):
+        """
+        Register an agent from a metadata dictionary.
+
+        Args:
+            entry (Dict): Metadata with name, description, import_path and
+                         optionally examples
+        """
+        AgentRegistry.register_lazy(
+            entry["name"],
+            entry["description"],
+            entry["import_path"],
+            entry.get("examples"),
+        )
+
+    def generate_manifest(self, path: Optional[str] = None) -> List[Dict]:
+        """
+        Import every agent module and write the manifest of the package.
+
+        This is meant to run at build or deployment time. The manifest records
+        the name, description, import path and examples of every agent defined
+        in the package.
+
+        Args:
+            path: Where to write the manifest. Defaults to the manifest path
+
+        Returns:
+            List[Dict]: The manifest entries
+        """
+        for _, module_name, _ in pkgutil.iter_modules([self._package_dir()]):
+            if module_name not in self.excluded_modules:
+                importlib.import_module(f"{self.package}.{module_name}")
+
+        entries = []
+        for name, agent_class in sorted(AgentRegistry.get_all_agents().items()):
+            if isinstance(agent_class, LazyAgentClass):
+                agent_class = agent_class.load()
+            if agent_class.__module__.rpartition(".")[0] != self.package:
+                continue
+            entries.append(
+                {
+                    "name": name,
+                    "description": agent_class.get_description(),
+                    "import_path": f"{agent_class.__module__}:{agent_class.__name__}",
+                    "examples": list(agent_class.get_examples()),
+                }
+            )
+
+        with open(path or self._get_manifest_path(), "w", encoding="utf-8") as f:
+            json.dump({"agents": entries}, f, indent=2)
+            f.write("\n")
+        return entries
+
     def get_discovered_modules(self) -> Set[str]:
         """
         Get the set of module names that were successfully discovered.
@@ -69,3 +228,13 @@ class AgentDiscovery:
             Set[str]: Set of discovered module names
         """
         return self.discovered_modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the agent manifest.")
+    parser.add_argument("--package", default="src.agents")
+    parser.add_argument("--output", help="Manifest path (defaults to the package)")
+    args = parser.parse_args()
+
+    written = AgentDiscovery(package=args.package).generate_manifest(args.output)
+    print(f"Wrote {len(written)} agents to the manifest")
@@ -0,0 +1,385 @@
+"""
+Fan-Out - Send a query to several agents concurrently and merge their answers.
+
+Some queries span the specialties of several agents, such as "write Python to
+compute this integral". In fan-out mode the router ranks up to k agents with
+scores, the selected agents answer concurrently on the event loop, and a merge
+strategy turns their answers into one response:
+- "first_complete": the first successful answer, the other agents are cancelled
+- "best_scored": the successful answer of the agent with the best routing score
+- "synthesize": a model call combining all successful answers into one
+
+Every agent has its own timeout, so the slowest agent cannot dominate the
+latency of a turn: an agent that does not answer in time is given up and the
+merge proceeds with the others. Only the merged exchange is added to the
+conversation history, under the agent whose answer was used.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.config.model_config import ROUTING_CONFIG
+from .metrics import llm_errors, metrics, record_usage
+from .resilience import DeadlineExceeded
+from .routing_decision import RoutingDecision
+
+# Outcomes of an agent run by fan-out
+OUTCOME_OK = "ok"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+# Instructions of the model call of the "synthesize" merge strategy
+SYNTHESIS_PROMPT = """You combine the answers of several specialized assistants into one answer.
+Use the correct and relevant parts of each answer, resolve contradictions in favor of the
+assistant best suited to that part of the question, and do not mention the assistants.
+Respond with the combined answer only."""
+
+fan_out_results = metrics.counter(
+    "fan_out_agent_results", "Outcomes of agents run by fan-out", ["agent", "outcome"]
+)
+
+
+@dataclass
+class AgentResult:
+    """
+    Data class to store the answer of one agent run by fan-out.
+
+    Attributes:
+        agent_name (str): Name of the agent
+        score (float): Routing score of the agent
+        response (Optional[str]): The agent's response, None if it failed
+        error (Optional[BaseException]): The error of a failed agent
+        outcome (str): "ok", "timeout", "error" or "cancelled"
+        duration (float): Seconds the agent ran
+    """
+
+    agent_name: str
+    score: float
+    response: Optional[str] = None
+    error: Optional[BaseException] = None
+    outcome: str = OUTCOME_OK
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """
+        Check whether the agent answered.
+
+        Returns:
+            bool: True if the agent returned a response
+        """
+        return self.outcome == OUTCOME_OK
+
+
+class MergeStrategy(ABC):
+    """
+    Base class of the strategies that merge fan-out answers.
+
+    A strategy either waits for every agent to answer or time out, or, with
+    wait_for_all set to False, is applied as soon as the first agent answers
+    and the remaining agents are cancelled.
+    """
+
+    # Whether the merge waits for every agent
+    wait_for_all = True
+
+    @abstractmethod
+    async def merge(self, query: str, results: List[AgentResult]) -> AgentResult:
+        """
+        Merge the successful answers into one.
+
+        Args:
+            query (str): The user's query
+            results (List[AgentResult]): At least one successful answer, in
+                                         ranking order if wait_for_all is set,
+                                         otherwise in completion order
+
+        Returns:
+            AgentResult: The answer to return, attributed to one agent
+        """
+
+
+class FirstComplete(MergeStrategy):
+    """
+    Use the first successful answer and cancel the other agents.
+    """
+
+    wait_for_all = False
+
+    async def merge(self, query: str, results: List[AgentResult]) -> AgentResult:
+        return results[0]
+
+
+class BestScored(MergeStrategy):
+    """
+    Use the successful answer of the agent with the best routing score.
+    """
+
+    async def merge(self, query: str, results: List[AgentResult]) -> AgentResult:
+        return max(results, key=lambda result: result.score)
+
+
+class Synthesize(MergeStrategy):
+    """
+    Combine all successful answers into one with a model call.
+
+    The combined answer is attributed to the best scored agent. A single
+    answer is used as is, and if the model call fails the best scored answer
+    is used instead, so synthesis never fails a turn that has an answer.
+    """
+
+    def __init__(self, model):
+        """
+        Initialize the strategy.
+
+        Args:
+            model: The language model that combines the answers
+        """
+        self.model = model
+
+    async def merge(self, query: str, results: List[AgentResult]) -> AgentResult:
+        best = max(results, key=lambda result: result.score)
+        if len(results) == 1:
+            return best
+
+        answers = "\n\n".join(
+            f"Answer of {result.agent_name}:\n{result.response}" for result in results
+        )
+        messages = [
+            SystemMessage(content=SYNTHESIS_PROMPT),
+            HumanMessage(content=f"Question:\n{query}\n\n{answers}"),
+        ]
+        try:
+            response = await self.model.ainvoke(messages)
+        except Exception as e:
+            llm_errors.inc(component="synthesizer")
+            print(f"Error synthesizing fan-out answers: {e}")
+            return best
+        record_usage("synthesizer", response)
+        return AgentResult(best.agent_name, best.score, response.content)
+
+
+def create_merge_strategy(name: str, model=None) -> MergeStrategy:
+    """
+    Create a merge strategy by name.
+
+    Args:
+        name (str): "first_complete", "best_scored" or "synthesize"
+        model: The language model used by "synthesize"
+
+    Returns:
+        MergeStrategy: The strategy
+    """
+    if name == "first_complete":
+        return FirstComplete()
+    if name == "best_scored":
+        return BestScored()
+    if name == "synthesize":
+        return Synthesize(model)
+    raise ValueError(f"Unknown merge strategy: {name!r}")
+
+
+@dataclass
+class FanOutStats:
+    """
+    Data class to store the outcome of fan-out turns.
+
+    Attributes:
+        turns (int): Turns processed
+        single_agent (int): Turns the router sent to a single agent
+        agents_run (int): Agents started over all turns
+        timeouts (int): Agents given up after their timeout
+        errors (int): Agents that failed
+        cancelled (int): Agents cancelled because an earlier answer was used
+    """
+
+    turns: int = 0
+    single_agent: int = 0
+    agents_run: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    cancelled: int = 0
+
+    def record(self, result: AgentResult):
+        """
+        Record the outcome of one agent.
+
+        Args:
+            result (AgentResult): The agent's result
+        """
+        self.agents_run += 1
+        if result.outcome == OUTCOME_TIMEOUT:
+            self.timeouts += 1
+        elif result.outcome == OUTCOME_ERROR:
+            self.errors += 1
+        elif result.outcome == OUTCOME_CANCELLED:
+            self.cancelled += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Get the statistics as a dictionary.
+
+        Returns:
+            Dict[str, float]: All counters and the average number of agents per turn
+        """
+        return {
+            "turns": self.turns,
+            "single_agent": self.single_agent,
+            "agents_run": self.agents_run,
+            "avg_agents": self.agents_run / self.turns if self.turns else 0.0,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+        }
+
+
+class FanOutExecutor:
+    """
+    Routes a query to the top-k agents, runs them concurrently and merges the answers.
+    """
+
+    def __init__(
+        self,
+        router,
+        k: int = ROUTING_CONFIG["fan_out_top_k"],
+        min_score: float = ROUTING_CONFIG["fan_out_min_score"],
+        local_threshold: Optional[float] = ROUTING_CONFIG["fan_out_local_confidence_threshold"],
+        agent_timeout: Optional[float] = ROUTING_CONFIG["fan_out_agent_timeout_seconds"],
+        merge_strategy: Union[str, MergeStrategy] = ROUTING_CONFIG["fan_out_merge_strategy"],
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            router (RouterAgent): The router that ranks and creates agents
+            k (int): Maximum number of agents per query
+            min_score (float): Minimum routing score of every agent but the best
+            local_threshold (Optional[float]): Minimum local classifier
+                                               confidence to run a single agent
+                                               without ranking by the model, or
+                                               None to always rank with the model
+            agent_timeout (Optional[float]): Seconds each agent may take, or
+                                             None for no limit
+            merge_strategy (Union[str, MergeStrategy]): The strategy or the
+                                             name of a built-in strategy. The
+                                             "synthesize" strategy uses the
+                                             router's agent model
+        """
+        self.router = router
+        self.k = k
+        self.min_score = min_score
+        self.local_threshold = local_threshold
+        self.agent_timeout = agent_timeout
+        if isinstance(merge_strategy, str):
+            merge_strategy = create_merge_strategy(merge_strategy, router.model)
+        self.merge_strategy = merge_strategy
+        self.stats = FanOutStats()
+
+    async def _run_agent(
+        self, decision: RoutingDecision, query: str, session_id: Optional[str]
+    ) -> AgentResult:
+        """
+        Run one agent without committing its exchange.
+
+        Args:
+            decision (RoutingDecision): The agent's routing decision
+            query (str): The user's query
+            session_id (Optional[str]): Identifier of the session
+
+        Returns:
+            AgentResult: The answer, or the error or timeout of the agent
+        """
+        agent = self.router.get_agent(decision.agent_name)
+        result = AgentResult(decision.agent_name, decision.confidence)
+        started = time.perf_counter()
+        try:
+            result.response = await asyncio.wait_for(
+                agent.aprocess_query(query, session_id, commit=False), self.agent_timeout
+            )
+        except asyncio.TimeoutError as e:
+            result.outcome = OUTCOME_TIMEOUT
+            result.error = e if isinstance(e, DeadlineExceeded) else DeadlineExceeded(
+                f"{decision.agent_name} did not answer within {self.agent_timeout}s"
+            )
+        except asyncio.CancelledError:
+            result.outcome = OUTCOME_CANCELLED
+            raise
+        except Exception as e:
+            result.outcome = OUTCOME_ERROR
+            result.error = e
+        finally:
+            result.duration = time.perf_counter() - started
+            self.stats.record(result)
+            fan_out_results.inc(agent=result.agent_name, outcome=result.outcome)
+        return result
+
+    async def aroute_and_process(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Route a query to the top-k agents and return the merged response.
+
+        Args:
+            query (str): The user's query
+            session_id (Optional[str]): Identifier of the session
+
+        Returns:
+            Tuple[str, str]: The agent the response is attributed to, and the
+                             merged response
+
+        Raises:
+            Exception: The error of the best ranked agent if no agent answered;
+                       DeadlineExceeded if it timed out
+        """
+        decisions = await self.router.arank(
+            query, self.k, self.min_score, self.local_threshold
+        )
+        self.stats.turns += 1
+        if len(decisions) == 1:
+            self.stats.single_agent += 1
+
+        tasks = [
+            asyncio.ensure_future(self._run_agent(decision, query, session_id))
+            for decision in decisions
+        ]
+        results = []
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                results.append(result)
+                if result.ok and not self.merge_strategy.wait_for_all:
+                    break
+        finally:
+            # Agents whose answers are no longer needed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self.merge_strategy.wait_for_all:
+            # Completion order is arbitrary; merge in ranking order instead
+            order = [decision.agent_name for decision in decisions]
+            results.sort(key=lambda result: order.index(result.agent_name))
+        answered = [result for result in results if result.ok]
+        if not answered:
+            raise max(results, key=lambda result: result.score).error
+
+        merged = await self.merge_strategy.merge(query, answered)
+        await self.router.get_agent(merged.agent_name).acommit_exchange(
+            query, merged.response, session_id
+        )
+        return merged.agent_name, merged.response
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get fan-out statistics.
+
+        Returns:
+            Dict[str, float]: Turns, agents run, timeouts, errors and cancellations
+        """
+        return self.stats.as_dict()
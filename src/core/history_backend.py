@@ -0,0 +1,258 @@
+"""
+History Backend - Storage backends for conversation histories.
+
+This module defines the interface used by ConversationState to persist messages
+and provides two implementations: an in-memory backend and a SQLite backend.
+The SQLite backend uses write-ahead logging, batches writes into a single
+transaction and loads only the most recent turns of a conversation, so idle
+sessions can live on disk and be resumed cheaply by any process.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from src.config.model_config import SESSION_CONFIG
+from .message_record import MessageRecord, Role
+
+
+class HistoryBackend(ABC):
+    """
+    Interface for conversation history storage.
+
+    Histories are identified by a session ID and an agent name, and messages
+    are stored and loaded as MessageRecord objects. Backends are
+    append-only from the point of view of ConversationState: truncating the
+    in-memory history does not remove persisted messages, only clear() does.
+    """
+
+    @abstractmethod
+    def append(self, session_id: str, agent_name: str, record: MessageRecord):
+        """
+        Persist a message.
+
+        Args:
+            session_id (str): Identifier of the session
+            agent_name (str): Name of the agent owning the history
+            record (MessageRecord): The message to persist
+        """
+
+    @abstractmethod
+    def load(
+        self, session_id: str, agent_name: str, last_k: Optional[int] = None
+    ) -> List[MessageRecord]:
+        """
+        Load the most recent messages of a history.
+
+        Args:
+            session_id (str): Identifier of the session
+            agent_name (str): Name of the agent owning the history
+            last_k (Optional[int]): Maximum number of messages to load, or
+                                    None to load the whole history
+
+        Returns:
+            List[MessageRecord]: The messages in chronological order
+        """
+
+    @abstractmethod
+    def clear(self, session_id: str, agent_name: Optional[str] = None):
+        """
+        Delete persisted messages.
+
+        Args:
+            session_id (str): Identifier of the session
+            agent_name (Optional[str]): Agent whose history to delete. If None,
+                                        the histories of all agents are deleted
+        """
+
+    def flush(self):
+        """
+        Write any buffered messages to storage.
+        """
+
+    def close(self):
+        """
+        Flush buffered messages and release resources.
+        """
+        self.flush()
+
+
+class InMemoryHistoryBackend(HistoryBackend):
+    """
+    History backend that keeps all messages in process memory.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty in-memory backend.
+        """
+        self._histories: Dict[Tuple[str, str], List[MessageRecord]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, agent_name: str, record: MessageRecord):
+        """
+        Store a message in memory.
+        """
+        with self._lock:
+            self._histories.setdefault((session_id, agent_name), []).append(record)
+
+    def load(
+        self, session_id: str, agent_name: str, last_k: Optional[int] = None
+    ) -> List[MessageRecord]:
+        """
+        Return a copy of the most recent messages of a history.
+        """
+        if last_k == 0:
+            return []
+        with self._lock:
+            history = self._histories.get((session_id, agent_name), [])
+            return history[-last_k:] if last_k is not None else list(history)
+
+    def clear(self, session_id: str, agent_name: Optional[str] = None):
+        """
+        Delete histories from memory.
+        """
+        with self._lock:
+            for key in list(self._histories):
+                if key[0] == session_id and (agent_name is None or key[1] == agent_name):
+                    del self._histories[key]
+
+
+class SQLiteHistoryBackend(HistoryBackend):
+    """
+    History backend storing messages in a SQLite database.
+
+    The database runs in WAL mode so readers do not block the writer. Appended
+    messages are buffered and written in a single transaction once batch_size
+    messages are pending or flush_interval seconds have passed since the last
+    write; pending messages are flushed before every read, on close() and at
+    interpreter exit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = SESSION_CONFIG["history_batch_size"],
+        flush_interval: float = SESSION_CONFIG["history_flush_interval_seconds"],
+    ):
+        """
+        Open (and if necessary create) a SQLite history database.
+
+        Args:
+            path (str): Path of the database file
+            batch_size (int): Number of buffered messages that triggers a write
+            flush_interval (float): Maximum seconds a message stays buffered
+                                    while further messages are appended
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                agent_name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL
+            )"""
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS messages_by_history "
+            "ON messages (session_id, agent_name, id)"
+        )
+        self._connection.commit()
+        atexit.register(self.close)
+
+    def append(self, session_id: str, agent_name: str, record: MessageRecord):
+        """
+        Buffer a message, writing the buffer if it is full or old enough.
+        """
+        with self._lock:
+            self._pending.append((session_id, agent_name, record.type, record.content))
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def load(
+        self, session_id: str, agent_name: str, last_k: Optional[int] = None
+    ) -> List[MessageRecord]:
+        """
+        Read the most recent messages of a history after flushing the buffer.
+        """
+        if last_k == 0:
+            return []
+        with self._lock:
+            self._flush_locked()
+            rows = self._connection.execute(
+                "SELECT role, content FROM messages "
+                "WHERE session_id = ? AND agent_name = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (session_id, agent_name, -1 if last_k is None else last_k),
+            ).fetchall()
+        rows.reverse()
+        return [MessageRecord(Role(role), content) for role, content in rows]
+
+    def clear(self, session_id: str, agent_name: Optional[str] = None):
+        """
+        Delete histories from the database after flushing the buffer.
+        """
+        with self._lock:
+            self._flush_locked()
+            if agent_name is None:
+                self._connection.execute(
+                    "DELETE FROM messages WHERE session_id = ?", (session_id,)
+                )
+            else:
+                self._connection.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND agent_name = ?",
+                    (session_id, agent_name),
+                )
+            self._connection.commit()
+
+    def flush(self):
+        """
+        Write buffered messages to the database.
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """
+        Write buffered messages in a single transaction.
+
+        Must be called with the lock held.
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO messages (session_id, agent_name, role, content) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self):
+        """
+        Write buffered messages and close the database connection.
+        """
+        with self._lock:
+            if self._connection is None:
+                return
+            self._flush_locked()
+            self._connection.close()
+            self._connection = None
+        atexit.unregister(self.close)
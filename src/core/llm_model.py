@@ -4,13 +4,25 @@ LLM Model Provider - Factory for language model instances.
 This module provides a factory class for creating and configuring language models
 for use with agents. It abstracts the details of model creation and configuration,
 allowing the rest of the application to work with language models without knowing
-the specifics of their implementation.
+the specifics of their implementation. Clients and models are shared process-wide
+through the client pool.
 """
 
-import boto3
+import time
+from typing import Optional, Sequence
+
 from langchain_aws import ChatBedrock
 
-from src.config.model_config import DEFAULT_REGION, DEFAULT_MODEL_ID, MODEL_CONFIG
+from src.config.model_config import (
+    DEFAULT_REGION,
+    DEFAULT_MODEL_ID,
+    MODEL_CONFIG,
+    MODEL_ROLES,
+)
+from .client_pool import client_pool
+from .metrics import model_create_latency
+from .prompt_cache import supports_prompt_caching
+from .resilience import ResilientChatModel
 
 
 class LLMModelProvider:
@@ -28,6 +40,9 @@ class LLMModelProvider:
         model_id: str = DEFAULT_MODEL_ID,
         temperature: float = MODEL_CONFIG["temperature"],
         max_tokens: int = MODEL_CONFIG["max_tokens"],
+        pool=None,
+        stop_sequences: Optional[Sequence[str]] = None,
+        prompt_caching: Optional[bool] = None,
     ):
         """
         Initialize the model provider with configuration parameters.
@@ -38,28 +53,68 @@ class LLMModelProvider:
             temperature (float): Temperature setting for the model (0.0-1.0)
                                 Lower values make output more deterministic
             max_tokens (int): Maximum tokens to generate in the response
+            pool (Optional[ClientPool]): Pool to share clients and models
+                                        through. Defaults to the process-wide pool
+            stop_sequences (Optional[Sequence[str]]): Strings that end the
+                                        response when generated
+            prompt_caching (Optional[bool]): Whether to add prompt cache
+                                        breakpoints for the model. None
+                                        decides from PROMPT_CACHE_CONFIG
         """
         self.region_name = region_name
         self.model_id = model_id
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.pool = pool if pool is not None else client_pool
+        self.stop_sequences = tuple(stop_sequences or ())
+        if prompt_caching is None:
+            prompt_caching = supports_prompt_caching(model_id)
+        self.prompt_caching = prompt_caching
         self._client = None
 
+    @classmethod
+    def for_role(
+        cls,
+        role: str,
+        region_name: str = DEFAULT_REGION,
+        model_id: str = DEFAULT_MODEL_ID,
+        pool=None,
+        **overrides,
+    ):
+        """
+        Create a provider configured for a role of MODEL_ROLES.
+
+        Settings are taken from MODEL_CONFIG, then from the role's entry in
+        MODEL_ROLES, then from the overrides, so each layer only needs the
+        settings it changes.
+
+        Args:
+            role (str): Key of MODEL_ROLES, e.g. "router" or "agent"
+            region_name (str): AWS region name for Bedrock
+            model_id (str): Model ID used unless the role or overrides set one
+            pool (Optional[ClientPool]): Pool to share clients and models through
+            **overrides: Settings taking precedence over the role's settings
+
+        Returns:
+            LLMModelProvider: The configured provider
+        """
+        settings = {"model_id": model_id, **MODEL_CONFIG, **MODEL_ROLES[role], **overrides}
+        return cls(region_name=region_name, pool=pool, **settings)
+
     @property
     def client(self):
         """
         Lazily initialize and return the Bedrock client.
 
         This property implements lazy initialization of the Bedrock client,
-        creating it only when needed and reusing it for subsequent calls.
+        fetching it from the client pool only when needed, so all providers
+        for the same region share one client and its connection pool.
 
         Returns:
             boto3.client: Configured Bedrock runtime client
         """
         if self._client is None:
-            self._client = boto3.client(
-                service_name="bedrock-runtime", region_name=self.region_name
-            )
+            self._client = self.pool.get_client(self.region_name)
         return self._client
 
     def create_model(self):
@@ -68,19 +123,49 @@ class LLMModelProvider:
 
         This method creates a LangChain ChatBedrock model with the specified
         configuration parameters. The model can be used by agents to generate
-        responses to user queries.
+        responses to user queries. Models are stateless, so one instance is
+        shared for every (region, model_id, temperature, max_tokens,
+        stop_sequences, prompt_caching) combination.
+
+        The model is wrapped in a ResilientChatModel, so every call has a
+        deadline and retries transient failures, and all users of the shared
+        model share one retry budget and one circuit breaker. Every call also
+        waits for quota from the rate limiter of (region, model_id), which
+        keeps the process under the Bedrock request and token quotas.
 
         Returns:
-            ChatBedrock: Configured LangChain ChatBedrock model
+            ResilientChatModel: Configured LangChain ChatBedrock model with
+                                deadlines, retries and a circuit breaker
         """
-        return ChatBedrock(
-            client=self.client,
-            model_id=self.model_id,
-            model_kwargs={
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-            },
+        started = time.perf_counter()
+        key = (
+            self.region_name,
+            self.model_id,
+            self.temperature,
+            self.max_tokens,
+            self.stop_sequences,
+            self.prompt_caching,
+        )
+        model = self.pool.get_model(
+            key,
+            lambda: ResilientChatModel(
+                ChatBedrock(
+                    client=self.client,
+                    model_id=self.model_id,
+                    model_kwargs={
+                        "temperature": self.temperature,
+                        "max_tokens": self.max_tokens,
+                    },
+                    stop_sequences=list(self.stop_sequences) or None,
+                ),
+                name=self.model_id,
+                rate_limiter=self.pool.get_rate_limiter(self.region_name, self.model_id),
+                max_tokens=self.max_tokens,
+                prompt_caching=self.prompt_caching,
+            ),
         )
+        model_create_latency.observe(time.perf_counter() - started)
+        return model
 
 
 # For backward compatibility and standalone usage
@@ -103,7 +188,7 @@ def create_llm_model(
         max_tokens (int): Maximum tokens to generate in the response
 
     Returns:
-        ChatBedrock: Configured LangChain ChatBedrock model
+        ResilientChatModel: Configured LangChain ChatBedrock model
     """
     provider = LLMModelProvider(
         region_name=region_name,
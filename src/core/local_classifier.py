@@ -0,0 +1,255 @@
+"""
+Local Intent Classifier - Zero-LLM fast path for query routing.
+
+This module implements a lightweight text classifier that routes queries
+without calling the language model. Each agent is represented by the centroid
+of hashed n-gram TF-IDF vectors built from its description and optional
+example utterances; a query is assigned to the agent whose centroid it is most
+similar to. The classifier reports a confidence score so that the router can
+fall back to the language model for ambiguous queries.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Words and individual arithmetic symbols; numbers are folded into one token
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9_+#]*|\d+(?:\.\d+)?|[+\-*/^=%<>()]")
+_NUMBER_RE = re.compile(r"\d")
+
+# Operators whose operands are kept as numbers; other numbers ("for 4 people",
+# "in 2020", "line 42") appear in queries for every agent and are dropped
+_ARITHMETIC_OPERATORS = frozenset("+-*/^%")
+
+# Common words that carry no routing signal
+_STOPWORDS = frozenset(
+    """a an and are as at be by can could do does for from how i in is it me my
+    of on or please the this to what which with would you your""".split()
+)
+
+# Queries must share at least this much with an agent to be classified at all
+DEFAULT_MIN_SIMILARITY = 0.05
+
+# Similarity at which a match counts as fully supported by the evidence
+DEFAULT_FULL_CONFIDENCE_SIMILARITY = 0.2
+
+
+def _feature(text: str, n_features: int) -> int:
+    """
+    Hash a feature string into a fixed-size feature space.
+
+    Args:
+        text (str): The feature string
+        n_features (int): Size of the hashed feature space
+
+    Returns:
+        int: The feature index
+    """
+    return zlib.crc32(text.encode("utf-8")) % n_features
+
+
+class LocalIntentClassifier:
+    """
+    Hashed n-gram TF-IDF centroid classifier for agent selection.
+
+    Features are word unigrams, word bigrams and character 4-grams, hashed into
+    a fixed-size space and stored as sparse dictionaries, so the classifier has
+    no dependencies beyond the standard library. Training takes each agent's
+    get_description() text and get_examples() utterances as documents.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2**20,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        full_confidence_similarity: float = DEFAULT_FULL_CONFIDENCE_SIMILARITY,
+    ):
+        """
+        Initialize an untrained classifier.
+
+        Args:
+            n_features (int): Size of the hashed feature space
+            min_similarity (float): Minimum cosine similarity to the best agent
+                                   for a query to receive a non-zero confidence
+            full_confidence_similarity (float): Similarity above which the
+                                               confidence is no longer scaled down
+        """
+        self.n_features = n_features
+        self.min_similarity = min_similarity
+        self.full_confidence_similarity = full_confidence_similarity
+        self._idf: Dict[int, float] = {}
+        self._default_idf = 1.0
+        self._centroids: Dict[str, Dict[int, float]] = {}
+        # Term counts of each agent's documents, keyed by name, with the class
+        # they were computed from so refits only process changed agents
+        self._documents: Dict[str, Tuple[type, List[Counter]]] = {}
+
+    def _tokenize(self, text: str) -> List[str]:
+        """
+        Split text into lowercase tokens with stopwords removed.
+
+        Numbers next to an arithmetic operator are folded into a single
+        "<num>" token; other numbers carry no routing signal and are dropped.
+
+        Args:
+            text (str): The text to tokenize
+
+        Returns:
+            List[str]: The tokens
+        """
+        words = [
+            token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS
+        ]
+        tokens = []
+        for i, token in enumerate(words):
+            if _NUMBER_RE.match(token):
+                neighbors = words[max(i - 1, 0) : i] + words[i + 1 : i + 2]
+                if not any(word in _ARITHMETIC_OPERATORS for word in neighbors):
+                    continue
+                token = "<num>"
+            tokens.append(token)
+        return tokens
+
+    def _term_counts(self, text: str) -> Counter:
+        """
+        Count the hashed features of a piece of text.
+
+        Args:
+            text (str): The text to featurize
+
+        Returns:
+            Counter: Mapping of feature index to occurrence count
+        """
+        tokens = self._tokenize(text)
+        counts = Counter()
+        for i, token in enumerate(tokens):
+            counts[_feature("w:" + token, self.n_features)] += 1
+            if i:
+                counts[_feature(f"b:{tokens[i - 1]} {token}", self.n_features)] += 1
+            padded = f"<{token}>"
+            for j in range(len(padded) - 3):
+                counts[_feature("c:" + padded[j : j + 4], self.n_features)] += 0.25
+        return counts
+
+    def _vectorize(self, counts: Counter) -> Dict[int, float]:
+        """
+        Convert feature counts into an L2-normalized TF-IDF vector.
+
+        Args:
+            counts (Counter): Feature counts from _term_counts
+
+        Returns:
+            Dict[int, float]: Sparse unit vector
+        """
+        vector = {
+            index: math.log1p(count) * self._idf.get(index, self._default_idf)
+            for index, count in counts.items()
+            if count > 0
+        }
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if not norm:
+            return {}
+        return {index: value / norm for index, value in vector.items()}
+
+    def fit(self, agent_classes: Dict[str, type]) -> "LocalIntentClassifier":
+        """
+        Train the classifier from agent descriptions and example utterances.
+
+        Term counts are reused for agents whose class is unchanged since the
+        previous fit, so refitting after a registry change only tokenizes the
+        added or replaced agents.
+
+        Args:
+            agent_classes (Dict[str, type]): Mapping of agent names to agent classes
+
+        Returns:
+            LocalIntentClassifier: The trained classifier
+        """
+        cache = {}
+        documents: List[Tuple[str, Counter]] = []
+        for name, agent_class in agent_classes.items():
+            cached = self._documents.get(name)
+            if cached is None or cached[0] is not agent_class:
+                texts: Iterable[str] = [agent_class.get_description()]
+                get_examples = getattr(agent_class, "get_examples", None)
+                if get_examples is not None:
+                    texts = [*texts, *get_examples()]
+                cached = (agent_class, [self._term_counts(text) for text in texts])
+            cache[name] = cached
+            documents.extend((name, counts) for counts in cached[1])
+        self._documents = cache
+
+        # Inverse document frequency over all descriptions and examples
+        document_frequency = Counter()
+        for _, counts in documents:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self._default_idf = math.log(1.0 + total) + 1.0
+        self._idf = {
+            index: math.log((1.0 + total) / (1.0 + df)) + 1.0
+            for index, df in document_frequency.items()
+        }
+
+        # Each agent is represented by the normalized mean of its documents
+        sums: Dict[str, Counter] = {}
+        for name, counts in documents:
+            sums.setdefault(name, Counter()).update(self._vectorize(counts))
+        self._centroids = {}
+        for name, summed in sums.items():
+            norm = math.sqrt(sum(value * value for value in summed.values()))
+            if norm:
+                self._centroids[name] = {
+                    index: value / norm for index, value in summed.items()
+                }
+        return self
+
+    def score(self, query: str) -> List[Tuple[str, float]]:
+        """
+        Compute the similarity of a query to every agent.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            List[Tuple[str, float]]: Agent names and cosine similarities,
+                                     sorted from most to least similar
+        """
+        vector = self._vectorize(self._term_counts(query))
+        scores = []
+        for name, centroid in self._centroids.items():
+            similarity = sum(
+                value * centroid.get(index, 0.0) for index, value in vector.items()
+            )
+            scores.append((name, similarity))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+
+    def classify(self, query: str) -> Tuple[Optional[str], float]:
+        """
+        Select the most likely agent for a query.
+
+        The confidence is the relative margin between the best and the second
+        best agent, scaled down when the best similarity itself is weak. It
+        approaches 1.0 when a single agent clearly matches and 0.0 when the top
+        candidates are tied or nothing matches.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            Tuple[Optional[str], float]: The best agent name (None if the
+                                         classifier is untrained) and the confidence
+        """
+        scores = self.score(query)
+        if not scores:
+            return None, 0.0
+
+        best_name, best = scores[0]
+        if best < self.min_similarity:
+            return best_name, 0.0
+        runner_up = scores[1][1] if len(scores) > 1 else 0.0
+        margin = (best - max(runner_up, 0.0)) / best
+        support = min(1.0, best / self.full_confidence_similarity)
+        return best_name, margin * support
@@ -0,0 +1,861 @@
+"""
+Math Evaluator - Safe local evaluation of arithmetic and simple algebra.
+
+This module answers calculations such as "what is 37*91", "calculate 15% of
+80" or "solve 3x + 5 = 20" without calling a language model. A query is
+normalized into an expression, parsed with Python's ast module and evaluated
+by walking a small whitelist of node types, operators, functions and
+constants, so no code is ever executed. Integers and fractions are computed
+exactly, and limits on the expression length and the size of intermediate
+results keep hostile input from using much time or memory.
+
+Linear equations in one variable are solved exactly without dependencies.
+When SymPy is installed, the same whitelisted syntax tree is converted into
+SymPy objects to solve other equations and to simplify, expand, factor,
+differentiate and integrate expressions. The duration of SymPy computations
+cannot be bounded by checking the input, so besides limiting the exponents of
+symbolic expressions they run on a few worker threads under a timeout. Queries
+that do not parse cleanly, or whose computation times out, are left to the
+language model.
+"""
+
+import ast
+import math
+import operator
+import re
+import threading
+from fractions import Fraction
+from typing import Callable, Dict, Optional
+
+from src.config.model_config import MATH_CONFIG
+
+try:
+    import sympy
+except ImportError:
+    sympy = None
+
+
+def _divide(left, right):
+    """
+    Divide, exactly if both operands are exact.
+
+    Args:
+        left: The dividend
+        right: The divisor
+
+    Returns:
+        The quotient, a Fraction for int and Fraction operands
+    """
+    if isinstance(left, (int, Fraction)) and isinstance(right, (int, Fraction)):
+        return Fraction(left) / Fraction(right)
+    return left / right
+
+
+# Binary and unary operators allowed in expressions
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# Phrases that introduce a calculation, removed from the start of a query
+_PREFIX_RE = re.compile(
+    r"^(?:(?:please|can you|could you|what is|what's|whats|how much is|calculate|"
+    r"compute|evaluate|find|tell me|give me|the value of|the result of|the)\s+)+"
+)
+
+# Words and symbols replaced by operators, in order
+_REPLACEMENTS = [
+    (re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent)\s+of\s+"), r"\1/100*"),
+    (re.compile(r"\b(square|cube) root of\s+([\d.]+|\([^()]*\))"), r"\1root(\2)"),
+    (re.compile(r"([\d.]+|\([^()]*\))\s+squared\b"), r"\1**2"),
+    (re.compile(r"([\d.]+|\([^()]*\))\s+cubed\b"), r"\1**3"),
+    (re.compile(r"\bto the power of\b"), "**"),
+    (re.compile(r"\bmultiplied by\b|\btimes\b|×"), "*"),
+    (re.compile(r"\bdivided by\b|÷"), "/"),
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b|−"), "-"),
+    (re.compile(r"\bmod(?:ulo)?\b"), "%"),
+    (re.compile(r"(?<=\d)\s*x\s*(?=\d)"), "*"),
+    (re.compile(r"\^"), "**"),
+    # Implicit multiplication: "3x", "2(x + 1)", "(a)(b)", "(x + 1)2"
+    (re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s*(?=[a-z(])"), r"\1*"),
+    (re.compile(r"\)\s*(?=[\w(])"), ")*"),
+]
+
+# Characters an expression may consist of after normalization
+_EXPRESSION_RE = re.compile(r"^[\w.+\-*/%(), =]+$")
+
+# Commands that need SymPy
+_SYMBOLIC_RE = re.compile(
+    r"^(?P<command>simplify|expand|factor|factorise|factorize|differentiate|"
+    r"derivative of|integrate|integral of)\s+(?P<expression>.+?)"
+    r"(?:\s+(?:with respect to|wrt|d)\s*(?P<variable>[a-z]))?"
+    r"(?:\s+from\s+(?P<lower>\S+)\s+to\s+(?P<upper>\S+))?$"
+)
+_SOLVE_RE = re.compile(
+    r"^solve(?:\s+for\s+(?P<first>[a-z]))?\s+(?:the equation\s+)?(?P<equation>.+?)"
+    r"(?:\s+for\s+(?P<last>[a-z]))?$"
+)
+
+
+def _root(value, degree: int):
+    """
+    Take a root, exactly for perfect powers of integers and fractions.
+
+    Args:
+        value: The radicand
+        degree (int): 2 for a square root, 3 for a cube root
+
+    Returns:
+        The root, as an int or Fraction when exact, otherwise a float
+    """
+    if isinstance(value, (int, Fraction)) and value >= 0:
+        value = Fraction(value)
+        roots = []
+        for part in (value.numerator, value.denominator):
+            root = math.isqrt(part) if degree == 2 else round(part ** (1 / 3))
+            if root**degree != part:
+                break
+            roots.append(root)
+        else:
+            return Fraction(*roots)
+    if degree == 3 and value < 0:
+        return -float(-value) ** (1 / 3)
+    return math.sqrt(value) if degree == 2 else float(value) ** (1 / 3)
+
+
+def _factorial(value) -> int:
+    """
+    Compute a factorial, limited to arguments with results of bounded size.
+
+    Args:
+        value: A non-negative integer
+
+    Returns:
+        int: The factorial
+    """
+    if value != int(value) or not 0 <= value <= MATH_CONFIG["max_factorial"]:
+        raise ValueError("factorial argument out of range")
+    return math.factorial(int(value))
+
+
+def _round(value, ndigits=None):
+    """
+    Round a number, limited to a number of digits of bounded size.
+
+    Args:
+        value: The number
+        ndigits: Number of decimal places, or None to round to an integer
+
+    Returns:
+        The rounded number
+    """
+    if ndigits is not None and abs(ndigits) > MATH_CONFIG["max_bits"] * math.log10(2):
+        raise ValueError("too many digits")
+    return round(value) if ndigits is None else round(value, ndigits)
+
+
+def _logarithm(value, base=None) -> float:
+    """
+    Compute a natural logarithm, or a logarithm to a base.
+
+    Args:
+        value: The argument
+        base: The base, or None for the natural logarithm
+
+    Returns:
+        float: The logarithm
+    """
+    return math.log(value) if base is None else math.log(value, base)
+
+
+# Functions allowed in expressions, for numeric evaluation
+_FUNCTIONS: Dict[str, Callable] = {
+    "sqrt": lambda value: _root(value, 2),
+    "squareroot": lambda value: _root(value, 2),
+    "cuberoot": lambda value: _root(value, 3),
+    "cbrt": lambda value: _root(value, 3),
+    "abs": abs,
+    "round": _round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "exp": math.exp,
+    "log": _logarithm,
+    "ln": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "factorial": _factorial,
+    "gcd": math.gcd,
+    "lcm": math.lcm,
+    "min": min,
+    "max": max,
+}
+
+# Constants allowed in expressions
+_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Limits the SymPy computations running at once. A computation cannot be
+# interrupted: after a timeout it keeps its slot until it finishes, and while
+# every slot is taken symbolic queries are left to the model
+_symbolic_slots = threading.BoundedSemaphore(MATH_CONFIG["symbolic_workers"])
+
+
+class _Evaluator:
+    """
+    Evaluates a whitelisted Python syntax tree.
+
+    Numbers, names and function calls are mapped through overridable methods,
+    so the same walk produces exact numbers or SymPy objects.
+    """
+
+    def __init__(self, variables: Optional[Dict[str, object]] = None):
+        """
+        Initialize the evaluator.
+
+        Args:
+            variables (Optional[Dict[str, object]]): Values of variables
+        """
+        self.variables = variables or {}
+
+    def evaluate(self, node):
+        """
+        Evaluate a node of the syntax tree.
+
+        Args:
+            node (ast.AST): The node
+
+        Returns:
+            The value of the node
+
+        Raises:
+            ValueError: If the node is not allowed or a result is too large
+        """
+        if isinstance(node, ast.Expression):
+            return self.evaluate(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return self.number(node.value)
+        if isinstance(node, ast.Name):
+            return self.name(node.id)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            left = self.evaluate(node.left)
+            right = self.evaluate(node.right)
+            if isinstance(node.op, ast.Pow):
+                self._check_power(left, right)
+            return self._check_size(_BINARY_OPERATORS[type(node.op)](left, right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return _UNARY_OPERATORS[type(node.op)](self.evaluate(node.operand))
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and not node.keywords
+        ):
+            arguments = [self.evaluate(argument) for argument in node.args]
+            return self._check_size(self.call(node.func.id, arguments))
+        raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+    def number(self, value):
+        """
+        Convert a literal, keeping integers and decimals exact.
+
+        Args:
+            value: The int or float literal
+
+        Returns:
+            int or Fraction: The exact value
+        """
+        return value if isinstance(value, int) else Fraction(repr(value))
+
+    def name(self, name: str):
+        """
+        Look up a variable or a constant.
+
+        Args:
+            name (str): The name
+
+        Returns:
+            The value
+        """
+        if name in self.variables:
+            return self.variables[name]
+        if name in _CONSTANTS:
+            return _CONSTANTS[name]
+        raise ValueError(f"unknown name: {name}")
+
+    def call(self, name: str, arguments):
+        """
+        Call a whitelisted function.
+
+        Args:
+            name (str): The function name
+            arguments (list): The evaluated arguments
+
+        Returns:
+            The result
+        """
+        if name not in _FUNCTIONS:
+            raise ValueError(f"unknown function: {name}")
+        return _FUNCTIONS[name](*arguments)
+
+    @staticmethod
+    def _check_power(base, exponent):
+        """
+        Reject powers whose result would be too large to compute quickly.
+
+        Exact powers grow both the numerator and the denominator, so fractions
+        are bounded by the larger of the two, whatever their magnitude.
+
+        Args:
+            base: The base
+            exponent: The exponent
+        """
+        if isinstance(base, (int, Fraction)):
+            base = Fraction(base)
+            magnitude = max(abs(base.numerator), base.denominator)
+        else:
+            try:
+                magnitude = abs(float(base))
+            except (TypeError, ValueError, OverflowError):
+                # Symbolic operands
+                return
+        try:
+            exponent = abs(float(exponent))
+        except (TypeError, ValueError):
+            # Symbolic operands
+            return
+        except OverflowError:
+            exponent = math.inf
+        if magnitude > 1 and exponent * math.log2(magnitude) > MATH_CONFIG["max_bits"]:
+            raise ValueError("result too large")
+
+    @staticmethod
+    def _check_size(value):
+        """
+        Reject exact results with too many digits.
+
+        Args:
+            value: The result of an operation
+
+        Returns:
+            The unchanged result
+        """
+        if isinstance(value, complex):
+            raise ValueError("complex result")
+        if isinstance(value, Fraction):
+            bits = max(value.numerator.bit_length(), value.denominator.bit_length())
+        elif isinstance(value, int):
+            bits = value.bit_length()
+        else:
+            return value
+        if bits > MATH_CONFIG["max_bits"]:
+            raise ValueError("result too large")
+        return value
+
+
+def _degree_bound(value) -> int:
+    """
+    Estimate an upper bound of the degree of a SymPy expression once expanded.
+
+    Function applications count as their arguments, at least degree 1, and
+    symbolic exponents as 1.
+
+    Args:
+        value: The SymPy expression
+
+    Returns:
+        int: The degree bound
+    """
+    if value.is_number:
+        return 0
+    if value.is_Symbol:
+        return 1
+    if value.is_Pow:
+        exponent = value.exp
+        factor = math.ceil(abs(exponent)) if exponent.is_number else 1
+        return _degree_bound(value.base) * factor
+    degrees = [_degree_bound(argument) for argument in value.args]
+    if value.is_Mul:
+        return sum(degrees)
+    if value.is_Add:
+        return max(degrees)
+    return max([1, *degrees])
+
+
+class _SymbolicEvaluator(_Evaluator):
+    """
+    Builds a SymPy expression from a whitelisted syntax tree.
+    """
+
+    @staticmethod
+    def _check_power(base, exponent):
+        """
+        Reject numeric powers whose result would be too large to compute quickly.
+
+        Args:
+            base: The base
+            exponent: The exponent
+        """
+        if base.is_number and exponent.is_number:
+            if base.is_Rational:
+                base = Fraction(int(base.p), int(base.q))
+            _Evaluator._check_power(base, exponent)
+
+    @staticmethod
+    def _check_size(value):
+        """
+        Reject exact rationals with too many digits and expressions whose
+        expansion would be a polynomial of too high degree.
+
+        Args:
+            value: The SymPy result of an operation
+
+        Returns:
+            The unchanged result
+        """
+        if isinstance(value, sympy.Rational):
+            _Evaluator._check_size(Fraction(int(value.p), int(value.q)))
+        elif _degree_bound(value) > MATH_CONFIG["max_symbolic_degree"]:
+            raise ValueError("expression too large")
+        return value
+
+    def number(self, value):
+        if isinstance(value, int):
+            return sympy.Integer(value)
+        return sympy.Rational(repr(value))
+
+    def name(self, name: str):
+        if name == "pi":
+            return sympy.pi
+        if name == "e":
+            return sympy.E
+        if name == "tau":
+            return 2 * sympy.pi
+        return sympy.Symbol(name)
+
+    def call(self, name: str, arguments):
+        functions = {
+            "sqrt": sympy.sqrt,
+            "squareroot": sympy.sqrt,
+            "cuberoot": sympy.cbrt,
+            "cbrt": sympy.cbrt,
+            "abs": sympy.Abs,
+            "floor": sympy.floor,
+            "ceil": sympy.ceiling,
+            "exp": sympy.exp,
+            "log": sympy.log,
+            "ln": sympy.log,
+            "sin": sympy.sin,
+            "cos": sympy.cos,
+            "tan": sympy.tan,
+            "asin": sympy.asin,
+            "acos": sympy.acos,
+            "atan": sympy.atan,
+            "factorial": sympy.factorial,
+        }
+        if name not in functions:
+            raise ValueError(f"unknown function: {name}")
+        return functions[name](*arguments)
+
+
+def _run_symbolic(function: Callable, *args):
+    """
+    Run a SymPy computation on a worker thread, giving up after the timeout.
+
+    Workers are daemon threads, so a computation that is given up does not
+    keep the process from exiting.
+
+    Args:
+        function (Callable): The computation
+        *args: Arguments of the computation
+
+    Returns:
+        The result of the computation, or None if it timed out or too many
+        computations are running
+
+    Raises:
+        Exception: The error of the computation
+    """
+    if not _symbolic_slots.acquire(blocking=False):
+        return None
+    outcome = {}
+    done = threading.Event()
+
+    def run():
+        try:
+            outcome["result"] = function(*args)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            _symbolic_slots.release()
+            done.set()
+
+    threading.Thread(target=run, name="sympy", daemon=True).start()
+    if not done.wait(MATH_CONFIG["symbolic_timeout_seconds"]):
+        return None
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _clean(query: str) -> str:
+    """
+    Lower-case a query and remove the phrase introducing the calculation.
+
+    Args:
+        query (str): The query
+
+    Returns:
+        str: The remaining text, e.g. "37 times 91" for "What is 37 times 91?"
+    """
+    return _PREFIX_RE.sub("", query.strip().lower().rstrip("?!. "))
+
+
+def normalize(text: str) -> str:
+    """
+    Turn a calculation written in words into expression syntax.
+
+    Args:
+        text (str): The query or expression
+
+    Returns:
+        str: The lower-cased expression, e.g. "15/100*80" for "15% of 80"
+    """
+    text = _clean(text)
+    for pattern, replacement in _REPLACEMENTS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def parse(expression: str) -> ast.Expression:
+    """
+    Parse a normalized expression, accepting only known names.
+
+    Args:
+        expression (str): The normalized expression
+
+    Returns:
+        ast.Expression: The syntax tree
+
+    Raises:
+        ValueError: If the expression is too long, contains other characters
+                    or cannot be parsed
+    """
+    if len(expression) > MATH_CONFIG["max_expression_length"]:
+        raise ValueError("expression too long")
+    if not _EXPRESSION_RE.match(expression):
+        raise ValueError("unsupported characters")
+    try:
+        return ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"cannot parse {expression!r}") from e
+
+
+def _variables(tree: ast.AST) -> set:
+    """
+    Get the names in a syntax tree that are neither functions nor constants.
+
+    Args:
+        tree (ast.AST): The syntax tree
+
+    Returns:
+        set: The variable names
+    """
+    functions = {
+        node.func.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+    }
+    return {
+        node.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name)
+        and node.id not in functions
+        and node.id not in _CONSTANTS
+    }
+
+
+def format_number(value) -> str:
+    """
+    Format a result for display.
+
+    Integers and terminating decimals are shown exactly, other fractions as
+    a fraction with a decimal approximation, and floats with 12 significant
+    digits.
+
+    Args:
+        value: The result
+
+    Returns:
+        str: The formatted result
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, Fraction)):
+        return str(value)
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        denominator = value.denominator
+        for factor in (2, 5):
+            while denominator % factor == 0:
+                denominator //= factor
+        decimal = f"{float(value):.12g}"
+        if denominator == 1 and len(decimal) < 15:
+            return decimal
+        return f"{value.numerator}/{value.denominator} (≈ {decimal})"
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return str(value)
+        if abs(value) < 1e-12:
+            return "0"
+        return f"{value:.12g}"
+    return str(value)
+
+
+def _display(expression: str) -> str:
+    """
+    Format a normalized expression for display.
+
+    Args:
+        expression (str): The normalized expression
+
+    Returns:
+        str: The expression with "^" for powers
+    """
+    return expression.replace("**", "^").replace("squareroot", "sqrt").replace(
+        "cuberoot", "cbrt"
+    )
+
+
+def evaluate(expression: str, variables: Optional[Dict[str, object]] = None):
+    """
+    Evaluate an arithmetic expression.
+
+    Args:
+        expression (str): The expression, in words or expression syntax
+        variables (Optional[Dict[str, object]]): Values of variables
+
+    Returns:
+        The exact (int or Fraction) or approximate (float) value
+
+    Raises:
+        ValueError: If the expression is not a supported calculation
+        ArithmeticError: If the calculation fails, e.g. on division by zero
+    """
+    return _Evaluator(variables).evaluate(parse(normalize(expression)))
+
+
+def _solve_linear(lhs: ast.AST, rhs: ast.AST, variable: str):
+    """
+    Solve a linear equation in one variable exactly.
+
+    Args:
+        lhs (ast.AST): Left-hand side
+        rhs (ast.AST): Right-hand side
+        variable (str): The variable
+
+    Returns:
+        Optional[Fraction]: The solution, or None if the equation is not
+                            linear with a unique solution
+    """
+
+    def residual(value):
+        evaluator = _Evaluator({variable: Fraction(value)})
+        return evaluator.evaluate(lhs) - evaluator.evaluate(rhs)
+
+    try:
+        at_zero, at_one, at_two = residual(0), residual(1), residual(2)
+    except (ArithmeticError, TypeError):
+        return None
+    slope = at_one - at_zero
+    if not isinstance(slope, Fraction) or slope == 0 or at_two - at_zero != 2 * slope:
+        return None
+    return -at_zero / slope
+
+
+def solve(equation: str, variable: Optional[str] = None) -> Optional[str]:
+    """
+    Solve an equation, locally for linear ones and with SymPy otherwise.
+
+    Args:
+        equation (str): The equation, e.g. "3x + 5 = 20"
+        variable (Optional[str]): The variable to solve for. Defaults to the
+                                  only variable of the equation
+
+    Returns:
+        Optional[str]: The solutions, e.g. "x = 5", or None if the equation
+                       cannot be solved locally, e.g. because SymPy timed out
+    """
+    expression = normalize(equation)
+    sides = expression.split("=")
+    if len(sides) != 2:
+        return None
+    lhs, rhs = (parse(side.strip()).body for side in sides)
+    names = _variables(lhs) | _variables(rhs)
+    if variable is None:
+        if len(names) != 1:
+            return None
+        variable = names.pop()
+    elif variable not in names:
+        return None
+
+    if len(names) <= 1:
+        solution = _solve_linear(lhs, rhs, variable)
+        if solution is not None:
+            return f"{variable} = {format_number(solution)}"
+
+    if sympy is None or not MATH_CONFIG["use_sympy"]:
+        return None
+    return _run_symbolic(_solve_symbolic, lhs, rhs, variable)
+
+
+def _solve_symbolic(lhs: ast.AST, rhs: ast.AST, variable: str) -> Optional[str]:
+    """
+    Solve an equation with SymPy.
+
+    Args:
+        lhs (ast.AST): Left-hand side
+        rhs (ast.AST): Right-hand side
+        variable (str): The variable
+
+    Returns:
+        Optional[str]: The solutions, or None for polynomials of too high degree
+    """
+    evaluator = _SymbolicEvaluator()
+    symbol = sympy.Symbol(variable)
+    difference = evaluator.evaluate(lhs) - evaluator.evaluate(rhs)
+    if (
+        difference.is_polynomial(symbol)
+        and sympy.degree(difference, symbol) > MATH_CONFIG["max_degree"]
+    ):
+        # Solving high-degree polynomials symbolically can take very long
+        return None
+    solutions = sympy.solve(difference, symbol)
+    if not solutions:
+        return "no solution"
+    return " or ".join(f"{variable} = {_display(sympy.sstr(value))}" for value in solutions)
+
+
+def _symbolic(command: str, expression: str, variable, lower, upper) -> Optional[str]:
+    """
+    Run a SymPy command on an expression.
+
+    Args:
+        command (str): simplify, expand, factor, derivative or integral
+        expression (str): The normalized expression
+        variable (Optional[str]): Variable of differentiation or integration
+        lower (Optional[str]): Lower bound of a definite integral
+        upper (Optional[str]): Upper bound of a definite integral
+
+    Returns:
+        Optional[str]: The result, or None without SymPy or if the
+                       computation timed out
+    """
+    if sympy is None or not MATH_CONFIG["use_sympy"]:
+        return None
+    return _run_symbolic(_run_command, command, expression, variable, lower, upper)
+
+
+def _run_command(command: str, expression: str, variable, lower, upper) -> Optional[str]:
+    """
+    Compute the result of a symbolic command with SymPy.
+
+    Args:
+        command (str): simplify, expand, factor, derivative or integral
+        expression (str): The normalized expression
+        variable (Optional[str]): Variable of differentiation or integration
+        lower (Optional[str]): Lower bound of a definite integral
+        upper (Optional[str]): Upper bound of a definite integral
+
+    Returns:
+        Optional[str]: The result, or None if the variable is ambiguous
+    """
+    tree = parse(expression)
+    evaluator = _SymbolicEvaluator()
+    value = evaluator.evaluate(tree)
+    if command.startswith("simplify"):
+        return _display(sympy.sstr(sympy.simplify(value)))
+    if command.startswith("expand"):
+        return _display(sympy.sstr(sympy.expand(value)))
+    if command.startswith("factor"):
+        return _display(sympy.sstr(sympy.factor(value)))
+
+    names = _variables(tree)
+    if variable is None:
+        if len(names) != 1:
+            return None
+        variable = next(iter(names))
+    symbol = sympy.Symbol(variable)
+    if command.startswith(("differentiate", "derivative")):
+        return _display(sympy.sstr(sympy.diff(value, symbol)))
+    if lower is not None:
+        bounds = [evaluator.evaluate(parse(normalize(bound))) for bound in (lower, upper)]
+        return _display(sympy.sstr(sympy.integrate(value, (symbol, *bounds))))
+    return _display(sympy.sstr(sympy.integrate(value, symbol))) + " + C"
+
+
+def answer(query: str) -> Optional[str]:
+    """
+    Answer a calculation query locally.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        Optional[str]: The answer, e.g. "37*91 = 3367", or None if the query
+                       is not a calculation that can be answered locally
+    """
+    text = _clean(query)
+    try:
+        match = _SOLVE_RE.match(text)
+        if match:
+            return solve(match.group("equation"), match.group("first") or match.group("last"))
+
+        match = _SYMBOLIC_RE.match(text)
+        if match:
+            expression = normalize(match.group("expression"))
+            result = _symbolic(
+                match.group("command"),
+                expression,
+                match.group("variable"),
+                match.group("lower"),
+                match.group("upper"),
+            )
+            return None if result is None else f"{_display(expression)} → {result}"
+
+        tree = parse(normalize(text))
+        if isinstance(tree.body, ast.Constant):
+            # A bare number is not a calculation
+            return None
+        return f"{_display(text)} = {format_number(_Evaluator().evaluate(tree))}"
+    except (ValueError, ArithmeticError, TypeError, RecursionError):
+        return None
+
+
+def calculate(expression: str) -> str:
+    """
+    Evaluate an expression or solve an equation for a tool call.
+
+    Args:
+        expression (str): The expression, e.g. "37*91", or an equation to
+                          solve, e.g. "3*x + 5 = 20"
+
+    Returns:
+        str: The result, or an error message the model can act on
+    """
+    try:
+        if "=" in expression:
+            result = solve(expression)
+            return result if result is not None else "Error: cannot solve this equation locally"
+        return format_number(evaluate(expression))
+    except (ValueError, ArithmeticError, TypeError, RecursionError) as e:
+        return f"Error: {e}"
@@ -0,0 +1,111 @@
+"""
+Message Record - Compact storage of conversation history messages.
+
+LangChain message objects are pydantic models with a per-instance dictionary,
+metadata fields and validation on construction, which costs several hundred
+bytes per message before the content itself. Conversation histories hold many
+messages for many resident sessions, so they store MessageRecord objects
+instead: a slotted object holding a role, the content and the token count.
+Records are converted to LangChain messages only at the model boundary, when
+the message list sent to the model is built.
+"""
+
+from enum import Enum
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+
+class Role(str, Enum):
+    """
+    Role of a message, valued by its LangChain message type.
+    """
+
+    HUMAN = "human"
+    AI = "ai"
+    SYSTEM = "system"
+
+
+# Message classes by role
+_MESSAGE_CLASSES = {
+    Role.HUMAN: HumanMessage,
+    Role.AI: AIMessage,
+    Role.SYSTEM: SystemMessage,
+}
+
+
+class MessageRecord:
+    """
+    Compact, slotted record of one history message.
+
+    The role is a shared enum member and the content is kept as is, usually a
+    string, so a record costs a few dozen bytes in addition to its content.
+    Records expose type and content like LangChain messages, so code that only
+    reads those attributes (summarizers, token counters, history backends)
+    accepts both.
+
+    Attributes:
+        role (Role): Role of the message
+        content: Text content of the message
+        tokens (Optional[int]): Estimated token count, if known
+    """
+
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: Role, content, tokens: Optional[int] = None):
+        """
+        Initialize a record.
+
+        Args:
+            role (Role): Role of the message
+            content: Text content of the message
+            tokens (Optional[int]): Estimated token count, if known
+        """
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+    @classmethod
+    def from_message(cls, message, tokens: Optional[int] = None) -> "MessageRecord":
+        """
+        Create a record from a LangChain message.
+
+        Only the type and content of the message are kept.
+
+        Args:
+            message (BaseMessage): The message to convert
+            tokens (Optional[int]): Estimated token count, if known
+
+        Returns:
+            MessageRecord: The record
+        """
+        return cls(Role(message.type), message.content, tokens)
+
+    @property
+    def type(self) -> str:
+        """
+        Get the LangChain message type of the record.
+
+        Returns:
+            str: "human", "ai" or "system"
+        """
+        return self.role.value
+
+    def to_message(self):
+        """
+        Convert the record into a LangChain message for the model.
+
+        Returns:
+            BaseMessage: A new message with the record's role and content
+        """
+        return _MESSAGE_CLASSES[self.role](content=self.content)
+
+    def __eq__(self, other):
+        if not isinstance(other, MessageRecord):
+            return NotImplemented
+        return self.role is other.role and self.content == other.content
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"MessageRecord(role={self.role.value!r}, content={self.content!r})"
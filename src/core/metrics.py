@@ -0,0 +1,506 @@
+"""
+Metrics - In-process instrumentation of the routing and agent hot paths.
+
+This module provides counters and histograms collected in a process-wide
+registry, rendering in the OpenMetrics text format understood by Prometheus,
+and an optional local HTTP endpoint serving /metrics. The metrics recorded by
+the framework itself are defined at the bottom of this module:
+- routing latency per decision source and routing decisions per agent
+- fallbacks to the default agent
+- agent latency and time-to-first-token per agent
+- input and output tokens taken from response usage metadata
+- model call errors and model creation time
+
+When the registry is disabled, recording a value returns after a single
+attribute check.
+"""
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.config.model_config import METRICS_CONFIG
+
+# Content type of the OpenMetrics text exposition format
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value for the exposition format.
+
+    Args:
+        value (float): The value
+
+    Returns:
+        str: The value, with integral values written without a fraction
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Format a label set for the exposition format.
+
+    Args:
+        names (Sequence[str]): Label names
+        values (Sequence[str]): Label values in the same order
+
+    Returns:
+        str: The label set in braces, or an empty string without labels
+    """
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """
+    Base class of labelled metrics.
+    """
+
+    type_name = "unknown"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ):
+        """
+        Initialize a metric.
+
+        Args:
+            registry (MetricsRegistry): The registry the metric belongs to
+            name (str): Metric family name
+            documentation (str): Help text
+            labelnames (Sequence[str]): Names of the labels of every sample
+        """
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Build the key of a label set.
+
+        Args:
+            labels (Dict[str, str]): Label values by name
+
+        Returns:
+            Tuple[str, ...]: Label values in the order of labelnames
+        """
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        """
+        Render the metric family in the exposition format.
+
+        Returns:
+            List[str]: Lines of the metric family
+        """
+        lines = [
+            f"# TYPE {self.name} {self.type_name}",
+            f"# HELP {self.name} {self.documentation}",
+        ]
+        return lines + self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """
+        Render the samples of the metric family.
+
+        Returns:
+            List[str]: One line per sample
+        """
+
+    @abstractmethod
+    def snapshot(self) -> Dict:
+        """
+        Get the current values by label values.
+
+        Returns:
+            Dict: The values of every label set
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Discard all recorded values.
+        """
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count per label set.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize a counter with no samples.
+        """
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the count of a label set.
+
+        Args:
+            amount (float): Non-negative amount to add
+            **labels: Value of every label of the metric
+        """
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """
+        Get the count of a label set.
+
+        Args:
+            **labels: Value of every label of the metric
+
+        Returns:
+            float: The count (0 if never increased)
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} "
+            f"{_format_value(value)}"
+            for key, value in items
+        ]
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        """
+        Get all counts.
+
+        Returns:
+            Dict[Tuple[str, ...], float]: Count by label values
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        """
+        Discard all counts.
+        """
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets per label set.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = (), **kwargs):
+        """
+        Initialize a histogram with no observations.
+
+        Args:
+            buckets (Sequence[float]): Upper bounds of the buckets; a +Inf
+                                       bucket is always added
+        """
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (the last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value
+            **labels: Value of every label of the metric
+        """
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            )
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        """
+        Get the count, sum and mean of every label set.
+
+        Returns:
+            Dict[Tuple[str, ...], Dict[str, float]]: Summary by label values
+        """
+        with self._lock:
+            return {
+                key: {"count": sum(counts), "sum": total, "mean": total / sum(counts)}
+                for key, (counts, total) in self._values.items()
+            }
+
+    def clear(self):
+        """
+        Discard all observations.
+        """
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together.
+
+    Metrics are created once through counter() and histogram(), which return
+    the existing metric when called again with the same name.
+    """
+
+    def __init__(self, enabled: bool = METRICS_CONFIG["enabled"]):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled (bool): Whether metrics record values
+        """
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        """
+        Get a registered metric or register a new one.
+
+        Raises:
+            ValueError: If the name is registered with a different metric type
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(self, name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.type_name}"
+                )
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """
+        Get or create a counter.
+
+        Args:
+            name (str): Metric family name, without the "_total" suffix
+            documentation (str): Help text
+            labelnames (Sequence[str]): Names of the labels of every sample
+
+        Returns:
+            Counter: The counter
+        """
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_CONFIG["latency_buckets"],
+    ) -> Histogram:
+        """
+        Get or create a histogram.
+
+        Args:
+            name (str): Metric family name
+            documentation (str): Help text
+            labelnames (Sequence[str]): Names of the labels of every sample
+            buckets (Sequence[float]): Upper bounds of the buckets
+
+        Returns:
+            Histogram: The histogram
+        """
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self) -> str:
+        """
+        Render all metrics in the OpenMetrics text format.
+
+        Returns:
+            str: The exposition, terminated by "# EOF"
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Get the current values of all metrics.
+
+        Returns:
+            Dict[str, Dict]: Counts of every counter and count, sum and mean of
+                             every histogram, by metric name and label values
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def clear(self):
+        """
+        Discard all recorded values, keeping the metrics registered.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+def record_usage(component: str, message):
+    """
+    Record the token usage reported in a model response.
+
+    Prompt cache usage is recorded separately: "cache_read" counts input
+    tokens served from the prompt cache and "cache_write" counts input tokens
+    written to it. With ChatBedrock, "input" counts only uncached input tokens.
+
+    Args:
+        component (str): Name of the agent or "router"
+        message: Response message; its usage_metadata is read if present
+    """
+    if not metrics.enabled:
+        return
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    llm_tokens.inc(usage.get("input_tokens", 0), component=component, kind="input")
+    llm_tokens.inc(usage.get("output_tokens", 0), component=component, kind="output")
+    details = usage.get("input_token_details") or {}
+    if details.get("cache_read"):
+        llm_tokens.inc(details["cache_read"], component=component, kind="cache_read")
+    if details.get("cache_creation"):
+        llm_tokens.inc(details["cache_creation"], component=component, kind="cache_write")
+
+
+def start_metrics_server(
+    port: int = METRICS_CONFIG["http_port"],
+    host: str = METRICS_CONFIG["http_host"],
+    registry: Optional[MetricsRegistry] = None,
+) -> ThreadingHTTPServer:
+    """
+    Serve the metrics at http://host:port/metrics from a daemon thread.
+
+    Args:
+        port (int): Port to listen on (0 picks a free port)
+        host (str): Interface to bind, local only by default
+        registry (Optional[MetricsRegistry]): Registry to serve. Defaults to
+                                              the process-wide registry
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it
+    """
+    registry = registry if registry is not None else metrics
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes are too frequent to log
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Create the process-wide registry and the framework's metrics
+metrics = MetricsRegistry()
+
+routing_latency = metrics.histogram(
+    "routing_latency_seconds", "Time to select an agent for a query", ["source"]
+)
+routing_decisions = metrics.counter(
+    "routing_decisions", "Queries routed to each agent", ["agent", "source"]
+)
+routing_fallbacks = metrics.counter(
+    "routing_fallbacks", "Queries sent to the default agent as a fallback", ["reason"]
+)
+agent_latency = metrics.histogram(
+    "agent_latency_seconds", "Time for an agent to produce a full response", ["agent"]
+)
+time_to_first_token = metrics.histogram(
+    "time_to_first_token_seconds", "Time until the first streamed chunk", ["agent"]
+)
+llm_tokens = metrics.counter(
+    "llm_tokens", "Tokens reported by model responses", ["component", "kind"]
+)
+llm_errors = metrics.counter("llm_errors", "Failed model calls", ["component"])
+agent_local_answers = metrics.counter(
+    "agent_local_answers", "Queries answered without a model call", ["agent"]
+)
+agent_tool_calls = metrics.counter(
+    "agent_tool_calls", "Tool calls requested by the model", ["agent", "tool"]
+)
+model_create_latency = metrics.histogram(
+    "model_create_seconds", "Time to create or fetch a pooled language model"
+)
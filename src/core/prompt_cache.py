@@ -0,0 +1,99 @@
+"""
+Prompt Cache - Cache breakpoints for provider-side prompt prefix caching.
+
+Anthropic models on Bedrock can cache a prompt prefix that ends at a content
+block marked with cache_control. Later requests starting with the same prefix
+read it from the cache, which is cheaper and faster than processing it again.
+This module marks the stable parts of the message lists built by agents and
+the router: the system prompt, and the conversation history that precedes
+the new query.
+
+Not every model supports prompt caching, so models carry a prompt_caching
+flag, set by LLMModelProvider from PROMPT_CACHE_CONFIG. Message lists for
+models without the flag are sent unchanged.
+"""
+
+from typing import List
+
+from src.config.model_config import PROMPT_CACHE_CONFIG
+
+# Marker of the last content block of a cached prefix
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def supports_prompt_caching(model_id: str) -> bool:
+    """
+    Check whether prompt caching should be used for a model.
+
+    Args:
+        model_id (str): Bedrock model ID
+
+    Returns:
+        bool: True if caching is enabled and the model ID matches one of the
+              configured model ID fragments
+    """
+    if not PROMPT_CACHE_CONFIG["enabled"]:
+        return False
+    return any(fragment in model_id for fragment in PROMPT_CACHE_CONFIG["model_ids"])
+
+
+def uses_prompt_caching(model) -> bool:
+    """
+    Check whether a model has been flagged for prompt caching.
+
+    Args:
+        model: The language model
+
+    Returns:
+        bool: The model's prompt_caching flag, False if it has none
+    """
+    return getattr(model, "prompt_caching", False) is True
+
+
+def with_cache_breakpoint(message):
+    """
+    Get a copy of a message whose last content block ends a cached prefix.
+
+    The message itself is not modified, so messages stored in conversation
+    histories never accumulate markers.
+
+    Args:
+        message (BaseMessage): The message ending the prefix
+
+    Returns:
+        BaseMessage: The copy, with its content as a list of content blocks
+    """
+    content = message.content
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [
+            {"type": "text", "text": block} if isinstance(block, str) else dict(block)
+            for block in content
+        ]
+    if not blocks:
+        return message
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+    return message.model_copy(update={"content": blocks})
+
+
+def add_cache_breakpoints(messages: List, prefix_length: int) -> List:
+    """
+    Mark the system prompt and the end of the stable prefix as cache breakpoints.
+
+    Args:
+        messages (List[BaseMessage]): The message list to send, starting with
+                                      the system prompt
+        prefix_length (int): Number of leading messages that repeat on the
+                             next call, typically all but the new query
+
+    Returns:
+        List[BaseMessage]: A new list with the breakpoint messages replaced by
+                           marked copies
+    """
+    messages = list(messages)
+    if messages and messages[0].type == "system":
+        messages[0] = with_cache_breakpoint(messages[0])
+    if 1 < prefix_length <= len(messages):
+        messages[prefix_length - 1] = with_cache_breakpoint(messages[prefix_length - 1])
+    return messages
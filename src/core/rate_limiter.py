@@ -0,0 +1,283 @@
+"""
+Rate Limiter - Client-side token buckets for model request and token quotas.
+
+Bedrock enforces requests-per-minute and tokens-per-minute quotas per model.
+This module provides a limiter that keeps a process under both quotas by
+making callers wait for capacity before a request is sent, instead of sending
+bursts that are throttled and retried. One limiter is shared by all models
+created for the same (region, model_id) through the client pool.
+
+Token usage is estimated up front from the prompt size and max_tokens, and
+the unused part of the estimate is returned once the actual usage is known.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.config.model_config import RATE_LIMIT_CONFIG
+from .metrics import metrics
+
+# Rough number of characters per token of English text
+CHARS_PER_TOKEN = 4
+
+rate_limit_wait = metrics.histogram(
+    "rate_limit_wait_seconds", "Time model calls waited for quota", ["model"]
+)
+
+
+def estimate_tokens(messages: Iterable, max_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a model call will count against the quota.
+
+    Args:
+        messages (Iterable): The messages sent to the model
+        max_tokens (int): Maximum tokens the model may generate
+
+    Returns:
+        int: Estimated prompt tokens plus max_tokens
+    """
+    if isinstance(messages, str):
+        messages = [messages]
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // CHARS_PER_TOKEN + 1 + max_tokens
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate.
+
+    The bucket starts full. Requests larger than the capacity are capped to
+    it, so they wait for a full bucket instead of waiting forever. The level
+    may be reduced below zero by charge, which makes later requests wait
+    until the debt is refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum number of tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """
+        Add the tokens accrued since the last update.
+
+        Args:
+            now (float): The current monotonic time
+        """
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Get the seconds until the bucket holds an amount of tokens.
+
+        Args:
+            amount (float): Number of tokens needed
+            now (float): The current monotonic time
+
+        Returns:
+            float: Zero if the tokens are available now
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing / self.rate)
+
+    def charge(self, amount: float):
+        """
+        Take tokens from the bucket without checking the level.
+
+        Args:
+            amount (float): Number of tokens to take. Negative amounts return
+                            tokens, up to the capacity
+        """
+        self._level = min(self.capacity, self._level - min(amount, self.capacity))
+
+
+class RateLimiter:
+    """
+    Limits model calls to a request rate and a token rate.
+
+    Both buckets are checked and charged together under one lock, so a call
+    either takes a request and its tokens or takes nothing.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = RATE_LIMIT_CONFIG["requests_per_minute"],
+        tokens_per_minute: Optional[float] = RATE_LIMIT_CONFIG["tokens_per_minute"],
+        burst_seconds: float = RATE_LIMIT_CONFIG["burst_seconds"],
+        name: str = "model",
+    ):
+        """
+        Initialize the limiter with full buckets.
+
+        Args:
+            requests_per_minute (Optional[float]): Request quota, or None for
+                                                   no request limit
+            tokens_per_minute (Optional[float]): Token quota, or None for no
+                                                 token limit
+            burst_seconds (float): Seconds of quota that may be used at once
+            name (str): Name of the model in metrics
+        """
+        self.name = name
+        self._buckets: Dict[str, TokenBucket] = {}
+        for kind, per_minute in (
+            ("requests", requests_per_minute),
+            ("tokens", tokens_per_minute),
+        ):
+            if per_minute is not None:
+                rate = per_minute / 60.0
+                self._buckets[kind] = TokenBucket(rate, max(1.0, rate * burst_seconds))
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited": 0, "timeouts": 0, "wait_seconds": 0.0}
+
+    def _reserve(self, tokens: int) -> Tuple[bool, float]:
+        """
+        Take a request and tokens if both are available.
+
+        Args:
+            tokens (int): Estimated tokens of the request
+
+        Returns:
+            Tuple[bool, float]: Whether the capacity was taken, and otherwise
+                                the seconds until it may be available
+        """
+        amounts = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                (
+                    bucket.wait_time(amounts[kind], now)
+                    for kind, bucket in self._buckets.items()
+                ),
+                default=0.0,
+            )
+            if wait > 0:
+                return False, wait
+            for kind, bucket in self._buckets.items():
+                bucket.charge(amounts[kind])
+            self._stats["acquired"] += 1
+            return True, 0.0
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """
+        Take a request and tokens without waiting.
+
+        Args:
+            tokens (int): Estimated tokens of the request
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        return self._reserve(tokens)[0]
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a request and tokens are available and take them.
+
+        Args:
+            tokens (int): Estimated tokens of the request
+            timeout (Optional[float]): Maximum seconds to wait, or None to
+                                       wait as long as needed
+
+        Returns:
+            bool: True if the capacity was taken, False on timeout
+        """
+        started = time.monotonic()
+        acquired, wait = self._reserve(tokens)
+        while not acquired:
+            if timeout is not None and time.monotonic() + wait > started + timeout:
+                return self._record_timeout()
+            time.sleep(wait)
+            acquired, wait = self._reserve(tokens)
+        return self._record_wait(started)
+
+    async def aacquire(self, tokens: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Asynchronously wait until a request and tokens are available and take them.
+
+        Waiting sleeps on the event loop, so other tasks keep running.
+
+        Args:
+            tokens (int): Estimated tokens of the request
+            timeout (Optional[float]): Maximum seconds to wait, or None to
+                                       wait as long as needed
+
+        Returns:
+            bool: True if the capacity was taken, False on timeout
+        """
+        started = time.monotonic()
+        acquired, wait = self._reserve(tokens)
+        while not acquired:
+            if timeout is not None and time.monotonic() + wait > started + timeout:
+                return self._record_timeout()
+            await asyncio.sleep(wait)
+            acquired, wait = self._reserve(tokens)
+        return self._record_wait(started)
+
+    def _record_wait(self, started: float) -> bool:
+        """
+        Record the time a successful acquisition waited.
+
+        Args:
+            started (float): Monotonic time the acquisition started
+
+        Returns:
+            bool: Always True
+        """
+        waited = time.monotonic() - started
+        if waited >= 0.001:
+            with self._lock:
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += waited
+        rate_limit_wait.observe(waited, model=self.name)
+        return True
+
+    def _record_timeout(self) -> bool:
+        """
+        Record an acquisition that gave up.
+
+        Returns:
+            bool: Always False
+        """
+        with self._lock:
+            self._stats["timeouts"] += 1
+        return False
+
+    def settle(self, estimated: int, actual: int):
+        """
+        Correct the token bucket once the actual usage of a call is known.
+
+        Args:
+            estimated (int): Tokens taken when the call was admitted
+            actual (int): Tokens the call actually used
+        """
+        bucket = self._buckets.get("tokens")
+        if bucket is not None and actual != estimated:
+            with self._lock:
+                bucket._refill(time.monotonic())
+                bucket.charge(actual - estimated)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get limiter statistics.
+
+        Returns:
+            Dict[str, float]: Numbers of acquisitions, acquisitions that had to
+                              wait and timeouts, and the total seconds waited
+        """
+        with self._lock:
+            return dict(self._stats)
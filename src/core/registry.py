@@ -4,15 +4,103 @@ Agent Registry - A central registry for agent classes using the Singleton patter
 This module implements the Registry pattern for agent management, allowing dynamic
 registration and discovery of agent implementations. It provides a decorator for
 easy agent registration and methods to retrieve registered agents.
+
+Agents can also be registered lazily from lightweight metadata (name, description
+and import path). Their module is imported only when the agent is first
+instantiated, at which point the decorator replaces the placeholder with the
+real class.
 """
 
-from typing import Dict, Optional, Any
+import importlib
+import sys
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 # Forward declaration of BaseAgent type to avoid circular imports
 # Using Any to prevent circular import issues with BaseAgent
 BaseAgentType = Any
 
 
+class LazyAgentClass:
+    """
+    Placeholder for an agent class whose module has not been imported yet.
+
+    The placeholder exposes the same class-level metadata as a real agent class
+    (get_description and get_examples), so routing prompts and classifiers can
+    be built without importing the agent. Calling it imports the agent's module
+    and instantiates the real class.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        import_path: str,
+        examples: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the placeholder.
+
+        Args:
+            name (str): Name of the agent class
+            description (str): Description of what the agent handles
+            import_path (str): Location of the class as "package.module:ClassName"
+            examples (Optional[List[str]]): Example queries the agent handles
+        """
+        self.__name__ = name
+        self.description = description
+        self.import_path = import_path
+        self.examples = list(examples or [])
+        self.loaded_class = None
+        self._lock = threading.Lock()
+
+    def get_description(self) -> str:
+        """
+        Return the description of what this agent handles.
+
+        Returns:
+            str: Description from the agent's metadata
+        """
+        return self.description
+
+    def get_examples(self) -> List[str]:
+        """
+        Return example queries that this agent handles.
+
+        Returns:
+            List[str]: Examples from the agent's metadata
+        """
+        return self.examples
+
+    def load(self):
+        """
+        Import the agent's module and return the real agent class.
+
+        Returns:
+            type: The agent class
+        """
+        if self.loaded_class is None:
+            with self._lock:
+                if self.loaded_class is None:
+                    module_name, _, class_name = self.import_path.partition(":")
+                    module = importlib.import_module(module_name)
+                    self.loaded_class = getattr(module, class_name or self.__name__)
+        return self.loaded_class
+
+    def __call__(self, *args, **kwargs):
+        """
+        Instantiate the real agent class, importing it first if necessary.
+
+        Returns:
+            BaseAgent: The agent instance
+        """
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyAgentClass {self.__name__} from {self.import_path}>"
+
+
 class AgentRegistry:
     """
     Registry for agent classes with automatic discovery.
@@ -20,6 +108,12 @@ class AgentRegistry:
     This class implements the Singleton pattern to ensure only one registry
     exists throughout the application. It stores agent classes by name and
     provides methods to register and retrieve them.
+
+    The registry is safe to use from multiple threads. Writers replace the
+    internal mapping with an updated copy under a lock (copy-on-write), so
+    readers get an immutable snapshot without locking or copying. Every change
+    increments the registry version and is reported to subscribers, and agent
+    modules can be registered, unregistered and reloaded at runtime.
     """
 
     # Singleton instance
@@ -34,9 +128,37 @@ class AgentRegistry:
         """
         if cls._instance is None:
             cls._instance = super(AgentRegistry, cls).__new__(cls)
-            cls._instance._agents = {}
+            cls._instance._agents = MappingProxyType({})
+            cls._instance._version = 0
+            cls._instance._lock = threading.RLock()
+            cls._instance._subscribers = []
         return cls._instance
 
+    def _update(self, mutate: Callable[[Dict[str, BaseAgentType]], bool]):
+        """
+        Apply a change to a copy of the registry and publish it.
+
+        Args:
+            mutate (Callable): Modifies the given dictionary in place and
+                              returns whether the change should bump the version
+        """
+        with self._lock:
+            agents = dict(self._agents)
+            if not mutate(agents):
+                self._agents = MappingProxyType(agents)
+                return
+            self._version += 1
+            self._agents = MappingProxyType(agents)
+            version = self._version
+            subscribers = list(self._subscribers)
+
+        # Notify outside the lock so callbacks may use the registry
+        for callback in subscribers:
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Error in agent registry subscriber {callback!r}: {e}")
+
     def register_agent(self, agent_class=None):
         """
         Register an agent class with the registry.
@@ -53,8 +175,20 @@ class AgentRegistry:
         """
 
         def decorator(agent_cls):
-            # Register the agent using its class name as the key
-            self._agents[agent_cls.__name__] = agent_cls
+            def mutate(agents):
+                # Register the agent using its class name as the key
+                name = agent_cls.__name__
+                existing = agents.get(name)
+                agents[name] = agent_cls
+                # Replacing a placeholder with the class it describes changes nothing
+                # that depends on agent metadata, so the version is left untouched
+                return not (
+                    isinstance(existing, LazyAgentClass)
+                    and existing.import_path.partition(":")[0] == agent_cls.__module__
+                    and existing.get_description() == agent_cls.get_description()
+                )
+
+            self._update(mutate)
             return agent_cls
 
         # Handle both @register_agent and @register_agent() forms
@@ -62,10 +196,163 @@ class AgentRegistry:
             return decorator(agent_class)
         return decorator
 
+    def register_lazy(
+        self,
+        name: str,
+        description: str,
+        import_path: str,
+        examples: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Register an agent from metadata without importing its module.
+
+        An agent that is already registered (as a class or a placeholder) is
+        left unchanged.
+
+        Args:
+            name (str): Name of the agent class
+            description (str): Description of what the agent handles
+            import_path (str): Location of the class as "package.module:ClassName"
+            examples (Optional[List[str]]): Example queries the agent handles
+
+        Returns:
+            bool: True if the agent was registered, False if it already existed
+        """
+        registered = False
+
+        def mutate(agents):
+            nonlocal registered
+            if name in agents:
+                return False
+            agents[name] = LazyAgentClass(name, description, import_path, examples)
+            registered = True
+            return True
+
+        self._update(mutate)
+        return registered
+
+    def unregister_agent(self, name: str) -> bool:
+        """
+        Remove an agent from the registry.
+
+        Args:
+            name (str): Name of the agent to remove
+
+        Returns:
+            bool: True if the agent was removed, False if it was not registered
+        """
+        return self._remove(lambda agent_name, agent_class: agent_name == name) > 0
+
+    def _remove(self, predicate: Callable[[str, BaseAgentType], bool]) -> int:
+        """
+        Remove every agent matching a predicate in a single update.
+
+        Args:
+            predicate (Callable): Called with each agent name and class
+
+        Returns:
+            int: Number of agents removed
+        """
+        removed = 0
+
+        def mutate(agents):
+            nonlocal removed
+            for agent_name, agent_class in list(agents.items()):
+                if predicate(agent_name, agent_class):
+                    del agents[agent_name]
+                    removed += 1
+            return removed > 0
+
+        self._update(mutate)
+        return removed
+
+    def reload_agent_module(self, module_name: str) -> List[str]:
+        """
+        Reload an agent module and re-register the agents it defines.
+
+        Agents defined by the module are unregistered first, so agents removed
+        from the source disappear from the registry. A module that has not been
+        imported yet is simply imported.
+
+        Args:
+            module_name (str): Dotted name of the module, e.g. "src.agents.math_agent"
+
+        Returns:
+            List[str]: Names of the agents the module registered
+        """
+
+        def defined_in_module(agent_name, agent_class):
+            if isinstance(agent_class, LazyAgentClass):
+                return agent_class.import_path.partition(":")[0] == module_name
+            return agent_class.__module__ == module_name
+
+        self._remove(defined_in_module)
+        module = sys.modules.get(module_name)
+        if module is None:
+            importlib.import_module(module_name)
+        else:
+            importlib.reload(module)
+        return [
+            agent_name
+            for agent_name, agent_class in self._agents.items()
+            if defined_in_module(agent_name, agent_class)
+        ]
+
+    def subscribe(self, callback: Callable[[int], None]):
+        """
+        Register a callback invoked with the new version after every change.
+
+        Callbacks run synchronously in the thread that changed the registry.
+
+        Args:
+            callback (Callable[[int], None]): The callback
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[int], None]):
+        """
+        Remove a previously subscribed callback.
+
+        Args:
+            callback (Callable[[int], None]): The callback
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    @property
+    def version(self) -> int:
+        """
+        Get the registry version.
+
+        The version increases every time the set of agents changes, so callers
+        can cheaply detect that derived data (such as a routing prompt) is stale.
+
+        Returns:
+            int: The current registry version
+        """
+        return self._version
+
+    def snapshot(self) -> Tuple[int, Mapping[str, BaseAgentType]]:
+        """
+        Get a consistent view of the registry.
+
+        Returns:
+            Tuple[int, Mapping[str, BaseAgentType]]: The version and a read-only
+                                                     mapping of agent names to
+                                                     agent classes at that version
+        """
+        with self._lock:
+            return self._version, self._agents
+
     def get_agent(self, name: str) -> Optional[BaseAgentType]:
         """
         Get an agent class by name.
 
+        For agents registered from metadata, this returns a LazyAgentClass
+        placeholder; call its load() method to obtain the real class.
+
         Args:
             name: The name of the agent class to retrieve
 
@@ -74,14 +361,17 @@ class AgentRegistry:
         """
         return self._agents.get(name)
 
-    def get_all_agents(self) -> Dict[str, BaseAgentType]:
+    def get_all_agents(self) -> Mapping[str, BaseAgentType]:
         """
         Get all registered agent classes.
 
+        The returned mapping is a read-only snapshot: later changes to the
+        registry do not affect it, and it is returned without copying.
+
         Returns:
-            Dict[str, BaseAgentType]: Dictionary mapping agent names to agent classes
+            Mapping[str, BaseAgentType]: Mapping of agent names to agent classes
         """
-        return self._agents.copy()  # Return a copy to prevent modification
+        return self._agents
 
 
 # Create a singleton instance
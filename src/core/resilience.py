@@ -0,0 +1,678 @@
+"""
+Resilience - Deadlines, retries and circuit breaking for model calls.
+
+This module provides a wrapper around a LangChain chat model that:
+- bounds every call by a deadline covering all of its attempts
+- retries transient failures such as Bedrock throttling with jittered
+  exponential backoff, limited by a retry budget shared by all calls to the
+  model so that retries cannot multiply the load during an outage
+- stops calling the model while a circuit breaker is open, failing fast
+  with CircuitOpenError instead
+- optionally waits for request and token quota from a RateLimiter before
+  every attempt
+
+LLMModelProvider wraps every model it creates, so all agents and routers using
+the same model share one retry budget and one circuit breaker, and all models
+of the same (region, model_id) share one rate limiter.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from src.config.model_config import CLIENT_POOL_CONFIG, RESILIENCE_CONFIG
+from .metrics import metrics
+from .rate_limiter import RateLimiter, estimate_tokens
+
+# Error codes of transient Bedrock and HTTP failures worth retrying
+RETRYABLE_ERROR_CODES = (
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "InternalServerException",
+    "RequestTimeout",
+)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+llm_retries = metrics.counter("llm_retries", "Retried model calls", ["model"])
+circuit_rejections = metrics.counter(
+    "circuit_rejections", "Model calls rejected by an open circuit breaker", ["model"]
+)
+
+# Runs synchronous calls so they can be abandoned when their deadline passes.
+# Sized like the connection pool of a Bedrock client, so the workers are not
+# fewer than the calls the client can make concurrently
+_deadline_executor = ThreadPoolExecutor(
+    max_workers=CLIENT_POOL_CONFIG["max_pool_connections"],
+    thread_name_prefix="model-deadline",
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a model whose circuit breaker is open.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a model call does not complete before its deadline.
+    """
+
+
+class _WorkerUnavailable(DeadlineExceeded):
+    """
+    Raised when no deadline worker is free before the deadline of a call.
+
+    The model was not called, so this is not a sign of an outage.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether a model call failure is transient.
+
+    Bedrock errors are recognized by their error code, which appears in the
+    botocore exception and in the message of errors wrapped by LangChain.
+
+    Args:
+        error (BaseException): The failure
+
+    Returns:
+        bool: True for throttling, timeouts, connection failures and server errors
+    """
+    if isinstance(error, (DeadlineExceeded, TimeoutError, ConnectionError)):
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code", "")
+        if code in RETRYABLE_ERROR_CODES:
+            return True
+    message = f"{type(error).__name__}: {error}"
+    return any(code in message for code in RETRYABLE_ERROR_CODES)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker counting consecutive transient failures.
+
+    After failure_threshold consecutive failures the breaker opens and rejects
+    calls for recovery_timeout seconds. It then lets a single trial call
+    through (half-open): success closes the breaker, failure opens it again.
+    A trial call that ends any other way, such as a non-transient error or a
+    cancellation, releases the trial so the next call becomes the trial.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = RESILIENCE_CONFIG["failure_threshold"],
+        recovery_timeout: float = RESILIENCE_CONFIG["recovery_timeout_seconds"],
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker
+            recovery_timeout (float): Seconds the breaker stays open before a
+                                      trial call is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Get the current state, moving from open to half-open when due.
+
+        Returns:
+            str: "closed", "open" or "half_open"
+        """
+        with self._lock:
+            if (
+                self._state == OPEN
+                and time.monotonic() - self._opened_at >= self.recovery_timeout
+            ):
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may proceed, reserving the trial call if half-open.
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Record a successful call, closing the breaker.
+        """
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        End a call that neither succeeded nor failed transiently.
+
+        The breaker keeps its state, but a reserved trial call is released so
+        a later call can be the trial.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Record a transient failure, opening the breaker if the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of calls.
+
+    Every call deposits ratio tokens and every retry withdraws one, so
+    retries stay below roughly ratio times the call rate. The budget starts
+    with (and never holds more than) max_tokens tokens, which allows short
+    bursts of retries.
+    """
+
+    def __init__(
+        self,
+        ratio: float = RESILIENCE_CONFIG["retry_budget_ratio"],
+        max_tokens: float = RESILIENCE_CONFIG["retry_budget_max_tokens"],
+    ):
+        """
+        Initialize a full budget.
+
+        Args:
+            ratio (float): Retries earned per call
+            max_tokens (float): Maximum number of banked retries
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """
+        Credit the budget for a call.
+        """
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """
+        Take one retry from the budget if available.
+
+        Returns:
+            bool: True if the retry may proceed
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class ResilientChatModel:
+    """
+    Chat model wrapper adding deadlines, retries and a circuit breaker.
+
+    The wrapper provides invoke, ainvoke, stream and astream; other attributes
+    are delegated to the wrapped model. Streams are retried only until their
+    first chunk arrives, and the deadline bounds the time to the first chunk,
+    because a partially consumed stream cannot be replayed.
+    """
+
+    def __init__(
+        self,
+        model,
+        name: str = "model",
+        deadline: Optional[float] = RESILIENCE_CONFIG["deadline_seconds"],
+        max_retries: int = RESILIENCE_CONFIG["max_retries"],
+        backoff_base: float = RESILIENCE_CONFIG["backoff_base_seconds"],
+        backoff_max: float = RESILIENCE_CONFIG["backoff_max_seconds"],
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_tokens: int = 0,
+        prompt_caching: bool = False,
+    ):
+        """
+        Wrap a chat model.
+
+        Args:
+            model: The LangChain chat model to wrap
+            name (str): Name of the model in metrics and errors
+            deadline (Optional[float]): Seconds a call may take including
+                                        retries, or None for no deadline
+            max_retries (int): Maximum retries of a single call
+            backoff_base (float): Upper bound of the first backoff delay
+            backoff_max (float): Upper bound of any backoff delay
+            breaker (Optional[CircuitBreaker]): Breaker for the model. Defaults
+                                                to a new CircuitBreaker
+            retry_budget (Optional[RetryBudget]): Budget for the model. Defaults
+                                                  to a new RetryBudget
+            rate_limiter (Optional[RateLimiter]): Limiter to take quota from
+                                                  before every attempt, or None
+            max_tokens (int): Maximum tokens the model generates, used to
+                              estimate the tokens of a call
+            prompt_caching (bool): Whether the model supports prompt caching,
+                                   so callers add cache breakpoints
+        """
+        self.model = model
+        self.name = name
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retry_budget = retry_budget if retry_budget is not None else RetryBudget()
+        self.rate_limiter = rate_limiter
+        self.max_tokens = max_tokens
+        self.prompt_caching = prompt_caching
+
+    def __getattr__(self, name):
+        # Only called for attributes the wrapper does not define
+        return getattr(self.model, name)
+
+    def bind_tools(self, tools, **kwargs) -> "ResilientChatModel":
+        """
+        Get a wrapper of the model with tools bound to every call.
+
+        The new wrapper shares the circuit breaker, retry budget and rate
+        limiter of this one, since both call the same model.
+
+        Args:
+            tools (Sequence): The tools, as accepted by the wrapped model
+            **kwargs: Further arguments of the wrapped model's bind_tools
+
+        Returns:
+            ResilientChatModel: The wrapper of the tool-bound model
+        """
+        return ResilientChatModel(
+            self.model.bind_tools(tools, **kwargs),
+            name=self.name,
+            deadline=self.deadline,
+            max_retries=self.max_retries,
+            backoff_base=self.backoff_base,
+            backoff_max=self.backoff_max,
+            breaker=self.breaker,
+            retry_budget=self.retry_budget,
+            rate_limiter=self.rate_limiter,
+            max_tokens=self.max_tokens,
+            prompt_caching=self.prompt_caching,
+        )
+
+    def _expires_at(self) -> Optional[float]:
+        """
+        Get the monotonic time at which a call starting now must end.
+
+        Returns:
+            Optional[float]: The expiry time, or None without a deadline
+        """
+        return None if self.deadline is None else time.monotonic() + self.deadline
+
+    @staticmethod
+    def _remaining(expires_at: Optional[float]) -> Optional[float]:
+        """
+        Get the time left before the deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if expires_at is None:
+            return None
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Model call deadline exceeded")
+        return remaining
+
+    def _run_with_deadline(self, expires_at, function, *args, **kwargs):
+        """
+        Run a blocking function on a deadline worker, waiting until the deadline.
+
+        Time spent waiting for a free worker counts against the deadline. A
+        call that gets no worker before the deadline is dropped from the queue
+        without calling the model, and the breaker does not count it as a
+        failure.
+
+        Args:
+            expires_at (Optional[float]): Deadline of the call
+            function (Callable): The function to run
+            *args, **kwargs: Arguments of the function
+
+        Returns:
+            The result of the function
+
+        Raises:
+            DeadlineExceeded: If the function does not return before the deadline
+        """
+        started = threading.Event()
+
+        def run():
+            started.set()
+            return function(*args, **kwargs)
+
+        future = _deadline_executor.submit(run)
+        if expires_at is not None:
+            try:
+                waited = started.wait(timeout=self._remaining(expires_at))
+            except DeadlineExceeded:
+                waited = False
+            # A call that started in the meantime can no longer be cancelled
+            if not waited and future.cancel():
+                raise _WorkerUnavailable(
+                    "Model call deadline exceeded waiting for a worker"
+                )
+        try:
+            return future.result(timeout=self._remaining(expires_at))
+        except FutureTimeoutError:
+            raise DeadlineExceeded("Model call deadline exceeded") from None
+
+    def _reserve(self, messages, expires_at) -> int:
+        """
+        Wait for rate limiter quota for an attempt.
+
+        Args:
+            messages: Input of the call
+            expires_at (Optional[float]): Deadline of the call
+
+        Returns:
+            int: Estimated tokens taken from the limiter
+
+        Raises:
+            DeadlineExceeded: If quota is not available before the deadline
+        """
+        if self.rate_limiter is None:
+            return 0
+        tokens = estimate_tokens(messages, self.max_tokens)
+        if not self.rate_limiter.acquire(tokens, self._remaining(expires_at)):
+            raise DeadlineExceeded("Model call deadline exceeded waiting for quota")
+        return tokens
+
+    async def _areserve(self, messages, expires_at) -> int:
+        """
+        Asynchronously wait for rate limiter quota for an attempt.
+
+        Args:
+            messages: Input of the call
+            expires_at (Optional[float]): Deadline of the call
+
+        Returns:
+            int: Estimated tokens taken from the limiter
+        """
+        if self.rate_limiter is None:
+            return 0
+        tokens = estimate_tokens(messages, self.max_tokens)
+        if not await self.rate_limiter.aacquire(tokens, self._remaining(expires_at)):
+            raise DeadlineExceeded("Model call deadline exceeded waiting for quota")
+        return tokens
+
+    def _settle(self, tokens: int, usage: Optional[dict]):
+        """
+        Return the unused part of a token estimate to the rate limiter.
+
+        Args:
+            tokens (int): Estimated tokens taken for the call
+            usage (Optional[dict]): Usage metadata of the response, if reported
+        """
+        if self.rate_limiter is not None and usage:
+            self.rate_limiter.settle(tokens, usage.get("total_tokens", tokens))
+
+    def _admit(self):
+        """
+        Start an attempt if the circuit breaker allows it.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+        """
+        if not self.breaker.allow():
+            circuit_rejections.inc(model=self.name)
+            raise CircuitOpenError(f"Circuit breaker of {self.name} is open")
+
+    def _backoff(self, error, attempt, expires_at) -> float:
+        """
+        Decide whether a failed attempt is retried and how long to wait.
+
+        Args:
+            error (Exception): The failure of the attempt
+            attempt (int): Number of the failed attempt, starting at 0
+            expires_at (Optional[float]): Deadline of the call
+
+        Returns:
+            float: Seconds to wait before the retry
+
+        Raises:
+            Exception: The failure, if it is not retried
+        """
+        if not is_retryable(error) or isinstance(error, _WorkerUnavailable):
+            # Not a sign of an outage, e.g. an invalid request or a busy pool
+            self.breaker.release()
+            raise error
+        self.breaker.record_failure()
+        if attempt >= self.max_retries or not self.retry_budget.try_withdraw():
+            raise error
+        # Full jitter spreads out retries of clients failing at the same time
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if expires_at is not None and time.monotonic() + delay >= expires_at:
+            raise error
+        llm_retries.inc(model=self.name)
+        return delay
+
+    def invoke(self, messages, *args, **kwargs):
+        """
+        Call the model with retries, a deadline and the circuit breaker.
+
+        Synchronous calls run on a worker thread so the caller can stop
+        waiting at the deadline; an abandoned call is bounded by the client's
+        read timeout. Waiting for a free worker counts against the deadline.
+
+        Args:
+            messages: Input of the wrapped model's invoke
+            *args, **kwargs: Further arguments of the wrapped model's invoke
+
+        Returns:
+            BaseMessage: The model response
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            DeadlineExceeded: If the deadline passed
+        """
+        self.retry_budget.deposit()
+        expires_at = self._expires_at()
+        attempt = 0
+        while True:
+            # Check the breaker first so rejected calls take no quota
+            self._admit()
+            try:
+                tokens = self._reserve(messages, expires_at)
+            except BaseException:
+                self.breaker.release()
+                raise
+            try:
+                response = self._run_with_deadline(
+                    expires_at, self.model.invoke, messages, *args, **kwargs
+                )
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt, expires_at))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted: do not hold a half-open trial
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self._settle(tokens, getattr(response, "usage_metadata", None))
+            return response
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        """
+        Asynchronously call the model with retries, a deadline and the breaker.
+
+        Args:
+            messages: Input of the wrapped model's ainvoke
+            *args, **kwargs: Further arguments of the wrapped model's ainvoke
+
+        Returns:
+            BaseMessage: The model response
+        """
+        self.retry_budget.deposit()
+        expires_at = self._expires_at()
+        attempt = 0
+        while True:
+            # Check the breaker first so rejected calls take no quota
+            self._admit()
+            try:
+                tokens = await self._areserve(messages, expires_at)
+            except BaseException:
+                self.breaker.release()
+                raise
+            try:
+                try:
+                    response = await asyncio.wait_for(
+                        self.model.ainvoke(messages, *args, **kwargs),
+                        self._remaining(expires_at),
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded("Model call deadline exceeded") from None
+            except Exception as e:
+                await asyncio.sleep(self._backoff(e, attempt, expires_at))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted: do not hold a half-open trial
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self._settle(tokens, getattr(response, "usage_metadata", None))
+            return response
+
+    def stream(self, messages, *args, **kwargs):
+        """
+        Stream the model response, retrying until the first chunk arrives.
+
+        Args:
+            messages: Input of the wrapped model's stream
+            *args, **kwargs: Further arguments of the wrapped model's stream
+
+        Yields:
+            BaseMessageChunk: Chunks of the model response
+        """
+        self.retry_budget.deposit()
+        expires_at = self._expires_at()
+        attempt = 0
+        end = object()
+        while True:
+            # Check the breaker first so rejected calls take no quota
+            self._admit()
+            try:
+                tokens = self._reserve(messages, expires_at)
+            except BaseException:
+                self.breaker.release()
+                raise
+            try:
+                chunks = iter(self.model.stream(messages, *args, **kwargs))
+                first = self._run_with_deadline(expires_at, next, chunks, end)
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt, expires_at))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted: do not hold a half-open trial
+                self.breaker.release()
+                raise
+            break
+
+        self.breaker.record_success()
+        if first is end:
+            return
+        usage = getattr(first, "usage_metadata", None)
+        yield first
+        for chunk in chunks:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self._settle(tokens, usage)
+
+    async def astream(self, messages, *args, **kwargs):
+        """
+        Asynchronously stream the model response, retrying until the first
+        chunk arrives.
+
+        Args:
+            messages: Input of the wrapped model's astream
+            *args, **kwargs: Further arguments of the wrapped model's astream
+
+        Yields:
+            BaseMessageChunk: Chunks of the model response
+        """
+        self.retry_budget.deposit()
+        expires_at = self._expires_at()
+        attempt = 0
+        end = object()
+        while True:
+            # Check the breaker first so rejected calls take no quota
+            self._admit()
+            try:
+                tokens = await self._areserve(messages, expires_at)
+            except BaseException:
+                self.breaker.release()
+                raise
+            chunks = self.model.astream(messages, *args, **kwargs).__aiter__()
+            try:
+                try:
+                    first = await asyncio.wait_for(
+                        anext(chunks, end), self._remaining(expires_at)
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded("Model call deadline exceeded") from None
+            except Exception as e:
+                await asyncio.sleep(self._backoff(e, attempt, expires_at))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted: do not hold a half-open trial
+                self.breaker.release()
+                raise
+            break
+
+        self.breaker.record_success()
+        if first is end:
+            return
+        usage = getattr(first, "usage_metadata", None)
+        yield first
+        async for chunk in chunks:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self._settle(tokens, usage)
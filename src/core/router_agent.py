@@ -6,12 +6,63 @@ agents based on the query content. It uses a language model to analyze the query
 and select the most appropriate agent to handle it.
 """
 
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from .registry import agent_registry as AgentRegistry
 from .discovery import AgentDiscovery
 from .llm_model import LLMModelProvider
-from src.config.model_config import DEFAULT_REGION, DEFAULT_MODEL_ID
+from .routing_cache import RoutingCache, hash_prompt
+from .local_classifier import LocalIntentClassifier
+from .prompt_cache import add_cache_breakpoints, uses_prompt_caching
+from .metrics import (
+    llm_errors,
+    record_usage,
+    routing_decisions,
+    routing_fallbacks,
+    routing_latency,
+)
+from .resilience import CircuitOpenError, DeadlineExceeded
+from .routing_decision import (
+    FollowUpDetector,
+    RoutingDecision,
+    SOURCE_CACHE,
+    SOURCE_FALLBACK,
+    SOURCE_FOLLOW_UP,
+    SOURCE_LOCAL,
+    SOURCE_MODEL,
+)
+from .session_store import SessionStore
+from src.config.model_config import DEFAULT_REGION, DEFAULT_MODEL_ID, ROUTING_CONFIG
+
+# Agent used when no specialized agent is suitable
+DEFAULT_AGENT_NAME = "GeneralAgent"
+
+# Instructions appended to the routing prompt when several queries are packed together
+BATCH_ROUTING_INSTRUCTIONS = """
+You will receive several numbered queries. Route each query independently.
+Respond with one line per query in the form '<number>: <agent name>' and nothing else.
+"""
+
+# Instructions appended to the routing prompt when several agents may be selected
+RANKING_INSTRUCTIONS = """
+The query may need more than one agent. List up to {k} agents that should handle it,
+most suitable first, one per line in the form '<agent name>: <score>' where the score
+between 0 and 1 says how well the agent fits the query. Respond with nothing else.
+"""
+
+# Model failures after which the router falls back to the default agent
+_UNAVAILABLE_ERRORS = (CircuitOpenError, DeadlineExceeded)
+
+# A single line of a packed routing reply, e.g. "3: MathAgent"
+_BATCH_LINE_RE = re.compile(r"^\W*(\d+)\s*[:.)\-]\s*(\w+)")
+
+# A single line of a ranking reply, e.g. "MathAgent: 0.8"
+_RANKED_LINE_RE = re.compile(r"^\W*(?:\d+[.)]\W*)?(\w+)[*`'\"]*\s*[:=\-]\s*(\d*\.?\d+)")
 
 
 class RouterAgent:
@@ -23,35 +74,246 @@ class RouterAgent:
     the query intent and maintains a registry of available agents.
     """
 
-    def __init__(self, region_name=DEFAULT_REGION, model_id=DEFAULT_MODEL_ID):
+    def __init__(
+        self,
+        region_name=DEFAULT_REGION,
+        model_id=DEFAULT_MODEL_ID,
+        routing_cache=None,
+        local_classifier=None,
+        local_confidence_threshold=ROUTING_CONFIG["local_confidence_threshold"],
+        session_store=None,
+        agent_discovery=None,
+        model=None,
+        follow_up_detector=None,
+        follow_up_threshold=ROUTING_CONFIG["follow_up_threshold"],
+        routing_model=None,
+        batch_routing_model=None,
+    ):
         """
-        Initialize the router agent with specialized agents.
+        Initialize the router agent.
 
         This constructor:
-        1. Creates an LLM model for routing decisions
-        2. Discovers all available agents
-        3. Initializes instances of all registered agents
-        4. Generates a routing prompt based on agent descriptions
+        1. Creates the LLM models for routing decisions and for the agents,
+           configured per role from MODEL_ROLES
+        2. Sets up agent discovery, the routing decision cache and the local classifier
+
+        Startup does no per-agent work. Agents are discovered and the routing
+        prompt is generated from class metadata when routing is first needed,
+        and each agent is instantiated on its first get_agent call.
 
         Args:
             region_name (str): AWS region name for Bedrock
             model_id (str): Model ID to use for the language model
+            routing_cache: Cache for routing decisions. Defaults to a new
+                          RoutingCache configured from ROUTING_CONFIG
+            local_classifier: Classifier consulted before the language model.
+                             Defaults to a new LocalIntentClassifier
+            local_confidence_threshold (Optional[float]): Minimum classifier
+                             confidence to skip the language model. None
+                             disables the local fast path
+            session_store: Store of per-session conversation states shared by
+                          all agents. Defaults to a new SessionStore configured
+                          from SESSION_CONFIG
+            agent_discovery: Discovery used to find agents. Defaults to a new
+                            AgentDiscovery of the built-in agents package
+            model: Pre-built language model to use instead of creating one
+                  from region_name and model_id. It is used for every role
+                  and agent unless a routing model is passed as well
+            follow_up_detector: Scorer for follow-up turns. Defaults to a new
+                               FollowUpDetector
+            follow_up_threshold (Optional[float]): Minimum follow-up score to
+                             keep the current agent without routing. None
+                             disables follow-up detection
+            routing_model: Pre-built model for single-query routing. Defaults
+                          to model if given, otherwise to the "router" role
+            batch_routing_model: Pre-built model for packed batch routing.
+                                Defaults to model if given, otherwise to the
+                                "batch_router" role
         """
-        # Create LLM model using the LLMModelProvider class
-        model_provider = LLMModelProvider(region_name=region_name, model_id=model_id)
-        self.model = model_provider.create_model()
+        # Create the models of each role through the shared client pool.
+        # Agent classes may override the agent settings (see get_agent)
+        self.region_name = region_name
+        self.model_id = model_id
+        self._role_models = model is None
+        if model is None:
+            model = self._create_role_model("agent")
+        self.model = model
+        if routing_model is None:
+            routing_model = self._create_role_model("router") if self._role_models else model
+        self.routing_model = routing_model
+        if batch_routing_model is None:
+            batch_routing_model = (
+                self._create_role_model("batch_router") if self._role_models else model
+            )
+        self.batch_routing_model = batch_routing_model
+        # Created when the first agent is, see summary_model
+        self._summary_model = None
+
+        # Agents are discovered on first use
+        self.agent_discovery = (
+            agent_discovery if agent_discovery is not None else AgentDiscovery()
+        )
+        self._discovered = False
 
-        # Discover all agents using the AgentDiscovery class
-        self.agent_discovery = AgentDiscovery()
-        self.agent_discovery.discover_agents()
+        # Conversation histories of all sessions, shared by all agents
+        self.session_store = session_store if session_store is not None else SessionStore()
 
-        # Initialize all registered agents
+        # Agent classes known to the router and the agents instantiated so far
+        self.agent_classes = {}
         self.agent_instances = {}
-        for name, agent_class in AgentRegistry.get_all_agents().items():
-            self.agent_instances[name] = agent_class(self.model)
+        self._agents_lock = threading.Lock()
+        self._registry_version = None
+        self._prompt_lines = {}
+
+        # Cache routing decisions for repeated queries
+        self.routing_cache = routing_cache if routing_cache is not None else RoutingCache()
+
+        # Classify clear-cut queries locally before calling the model
+        self.local_classifier = (
+            local_classifier if local_classifier is not None else LocalIntentClassifier()
+        )
+        self.local_confidence_threshold = local_confidence_threshold
+
+        # Keep the current agent for obvious follow-ups without routing at all
+        self.follow_up_detector = (
+            follow_up_detector if follow_up_detector is not None else FollowUpDetector()
+        )
+        self.follow_up_threshold = follow_up_threshold
+        self.routing_stats = {
+            "queries": 0,
+            "follow_up": 0,
+            "cache": 0,
+            "local": 0,
+            "model": 0,
+            "fallback": 0,
+        }
+        # Routing runs concurrently in route_batch workers and server requests
+        self._stats_lock = threading.Lock()
+
+    def _create_role_model(self, role, **overrides):
+        """
+        Create (or fetch from the client pool) the model of a role.
+
+        Args:
+            role (str): Key of MODEL_ROLES
+            **overrides: Settings taking precedence over the role's settings
 
-        # Generate routing prompt
-        self.routing_prompt = self._generate_routing_prompt()
+        Returns:
+            The language model
+        """
+        return LLMModelProvider.for_role(
+            role, self.region_name, self.model_id, **overrides
+        ).create_model()
+
+    def _model_for(self, agent_class):
+        """
+        Get the model an agent class runs on.
+
+        Agent classes may declare a model_overrides dict with settings of the
+        "agent" role to change, e.g. {"max_tokens": 4096}. Overrides are
+        ignored when the router was given a pre-built model.
+
+        Args:
+            agent_class: The registered agent class or lazy placeholder
+
+        Returns:
+            The language model for the agent
+        """
+        if not self._role_models:
+            return self.model
+        # The overrides live on the real class, so lazy placeholders are loaded
+        loaded = agent_class.load() if hasattr(agent_class, "load") else agent_class
+        overrides = getattr(loaded, "model_overrides", None)
+        if not overrides:
+            return self.model
+        return self._create_role_model("agent", **overrides)
+
+    @property
+    def summary_model(self):
+        """
+        Get the model that summarizes the histories of the router's agents.
+
+        Returns:
+            The "summarizer" role model, or the agent model if the router
+            was given a pre-built model
+        """
+        if self._summary_model is None:
+            self._summary_model = (
+                self._create_role_model("summarizer") if self._role_models else self.model
+            )
+        return self._summary_model
+
+    @property
+    def routing_prompt(self):
+        """
+        Get the routing prompt, generating it on first use.
+
+        Returns:
+            str: The routing prompt for the currently registered agents
+        """
+        self._refresh_routing_prompt()
+        return self._routing_prompt
+
+    @property
+    def routing_prompt_hash(self):
+        """
+        Get the hash of the routing prompt.
+
+        Returns:
+            str: Hash identifying the current routing prompt
+        """
+        self._refresh_routing_prompt()
+        return self._routing_prompt_hash
+
+    def _refresh_routing_prompt(self):
+        """
+        Rebuild the routing prompt if the agent registry has changed.
+
+        On first use this method runs agent discovery. When the registry
+        version differs from the one the current prompt was built from, it
+        takes a snapshot of the registered agent classes, regenerates the
+        routing prompt from their metadata and invalidates the routing cache.
+        Prompt lines, classifier features and agent instances of agents whose
+        class is unchanged are reused. No agent is instantiated here.
+        """
+        if self._discovered and self._registry_version == AgentRegistry.version:
+            return
+
+        with self._agents_lock:
+            if not self._discovered:
+                self.agent_discovery.discover_agents()
+                self._discovered = True
+            if self._registry_version == AgentRegistry.version:
+                return
+
+            version, self.agent_classes = AgentRegistry.snapshot()
+            # Drop instances whose class was replaced or removed
+            self.agent_instances = {
+                name: agent
+                for name, agent in self.agent_instances.items()
+                if type(agent) in self._resolved_classes(name)
+            }
+
+            self._routing_prompt = self._generate_routing_prompt()
+            self._routing_prompt_hash = hash_prompt(self._routing_prompt)
+            self.routing_cache.clear()
+            if self.local_confidence_threshold is not None:
+                self.local_classifier.fit(self.agent_classes)
+            self._registry_version = version
+
+    def _resolved_classes(self, name):
+        """
+        Get the classes an existing instance of an agent may have.
+
+        Args:
+            name (str): The agent name
+
+        Returns:
+            tuple: The registered class, and for a lazily registered agent the
+                   class it has loaded
+        """
+        agent_class = self.agent_classes.get(name)
+        return (agent_class, getattr(agent_class, "loaded_class", None))
 
     def _generate_routing_prompt(self):
         """
@@ -68,9 +330,16 @@ class RouterAgent:
 Based on the query content, determine which of the following agents should handle it:
 
 """
-        # Add each agent's description to the prompt
-        for name, agent_class in AgentRegistry.get_all_agents().items():
-            prompt += f"- {name}: {agent_class.get_description()}\n"
+        # Add each agent's description to the prompt, reusing the lines of
+        # agents whose class is unchanged since the previous rebuild
+        lines = {}
+        for name, agent_class in self.agent_classes.items():
+            cached = self._prompt_lines.get(name)
+            if cached is None or cached[0] is not agent_class:
+                cached = (agent_class, f"- {name}: {agent_class.get_description()}\n")
+            lines[name] = cached
+            prompt += cached[1]
+        self._prompt_lines = lines
 
         prompt += """
 Respond with ONLY the name of the appropriate agent. If none of the specialized agents are suitable,
@@ -78,12 +347,291 @@ respond with 'GeneralAgent'.
 """
         return prompt
 
+    def _build_routing_messages(self, query):
+        """
+        Build the message list sent to the routing model for a query.
+
+        The routing prompt is the same for every query, so it is marked as a
+        cache breakpoint for models that support prompt caching.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            list: The routing prompt followed by the query
+        """
+        messages = [
+            SystemMessage(content=self.routing_prompt),
+            HumanMessage(content=query),
+        ]
+        if uses_prompt_caching(self.routing_model):
+            messages = add_cache_breakpoints(messages, 1)
+        return messages
+
+    def _route_locally(self, query):
+        """
+        Try to route the query without calling the language model.
+
+        The routing prompt is refreshed first so that a registry change
+        invalidates previously cached decisions. The routing cache is consulted
+        next, followed by the local classifier if its confidence reaches the
+        configured threshold.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            Optional[RoutingDecision]: The decision, or None if the language
+                                       model has to decide
+        """
+        self._refresh_routing_prompt()
+        self._count("queries")
+
+        agent_name = self.routing_cache.get(query, self.routing_prompt_hash)
+        if agent_name is not None:
+            self._count("cache")
+            return RoutingDecision(agent_name, 1.0, source=SOURCE_CACHE)
+
+        if self.local_confidence_threshold is not None:
+            agent_name, confidence = self.local_classifier.classify(query)
+            if agent_name is not None and confidence >= self.local_confidence_threshold:
+                self._count("local")
+                return RoutingDecision(agent_name, confidence, source=SOURCE_LOCAL)
+
+        self._count("model")
+        return None
+
+    def _count(self, *tiers):
+        """
+        Increment routing statistics.
+
+        Args:
+            *tiers (str): Keys of routing_stats to increment
+        """
+        with self._stats_lock:
+            for tier in tiers:
+                self.routing_stats[tier] += 1
+
+    def _store_route(self, query, agent_name):
+        """
+        Cache a routing decision if it names a known agent.
+
+        Args:
+            query (str): The user's query
+            agent_name (str): The agent name returned by the routing model
+        """
+        if agent_name in self.agent_classes:
+            self.routing_cache.put(query, self.routing_prompt_hash, agent_name)
+
+    def _parse_route(self, query, content):
+        """
+        Match the routing model's reply against the registered agent names.
+
+        The reply is expected to be exactly one agent name. A reply that
+        mentions a single agent name among other text is accepted with lower
+        confidence; anything else selects the default agent with zero confidence.
+
+        Args:
+            query (str): The user's query
+            content (str): The reply of the routing model
+
+        Returns:
+            RoutingDecision: The decision of the model
+        """
+        reply = content.strip().strip(".'\"`")
+        if reply in self.agent_classes:
+            self._store_route(query, reply)
+            return RoutingDecision(reply, 1.0, source=SOURCE_MODEL)
+
+        mentioned = [
+            name
+            for name in self.agent_classes
+            if re.search(rf"\b{re.escape(name)}\b", content)
+        ]
+        if len(mentioned) == 1:
+            return RoutingDecision(mentioned[0], 0.7, source=SOURCE_MODEL)
+        routing_fallbacks.inc(reason="unparsed_reply")
+        return RoutingDecision(DEFAULT_AGENT_NAME, 0.0, source=SOURCE_MODEL)
+
+    def _fallback(self, error):
+        """
+        Select the default agent because the routing model is unavailable.
+
+        Args:
+            error (Exception): The CircuitOpenError or DeadlineExceeded raised
+                               by the model
+
+        Returns:
+            RoutingDecision: A zero-confidence decision for the default agent
+        """
+        reason = "circuit_open" if isinstance(error, CircuitOpenError) else "deadline"
+        routing_fallbacks.inc(reason=reason)
+        self._count("fallback")
+        return RoutingDecision(DEFAULT_AGENT_NAME, 0.0, source=SOURCE_FALLBACK)
+
+    def _invoke_route(self, query):
+        """
+        Ask the language model which agent should handle the query.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            RoutingDecision: The decision of the model
+        """
+        messages = self._build_routing_messages(query)
+
+        try:
+            response = self.routing_model.invoke(messages)
+        except Exception:
+            llm_errors.inc(component="router")
+            raise
+        record_usage("router", response)
+        return self._parse_route(query, response.content)
+
+    async def _ainvoke_route(self, query):
+        """
+        Asynchronously ask the language model which agent should handle the query.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            RoutingDecision: The decision of the model
+        """
+        messages = self._build_routing_messages(query)
+
+        try:
+            response = await self.routing_model.ainvoke(messages)
+        except Exception:
+            llm_errors.inc(component="router")
+            raise
+        record_usage("router", response)
+        return self._parse_route(query, response.content)
+
+    def detect_follow_up(self, query, current_agent_name):
+        """
+        Check whether a query continues the conversation with the current agent.
+
+        This is a purely local check: the follow-up detector scores cues such as
+        an opening "and" or "what about", words referring back to the previous
+        turn and the query length. A query that stands on its own and that the
+        local classifier confidently assigns to a different agent is not
+        treated as a follow-up.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous turn
+
+        Returns:
+            Optional[RoutingDecision]: A decision to continue with the current
+                                       agent, or None if the query has to be routed
+        """
+        if current_agent_name is None or self.follow_up_threshold is None:
+            return None
+        self._refresh_routing_prompt()
+        if current_agent_name not in self.agent_classes:
+            return None
+
+        score = self.follow_up_detector.score(query)
+        if score < self.follow_up_threshold:
+            return None
+
+        # An explicit change of topic overrides the follow-up cues, but only
+        # for queries that can be understood without the previous turn
+        if self.local_confidence_threshold is not None and self.follow_up_detector.stands_alone(
+            query
+        ):
+            agent_name, confidence = self.local_classifier.classify(query)
+            if (
+                agent_name not in (None, current_agent_name)
+                and confidence >= self.local_confidence_threshold
+            ):
+                return None
+
+        self._count("queries", "follow_up")
+        return RoutingDecision(
+            current_agent_name, score, continue_current=True, source=SOURCE_FOLLOW_UP
+        )
+
+    def decide(self, query, current_agent_name=None):
+        """
+        Determine which agent should handle the query, with a confidence score.
+
+        The cheapest source that can decide is used: follow-up detection for
+        the current agent, then the routing cache, the local classifier and
+        finally the language model. While the model's circuit breaker is open,
+        or when the model misses its deadline, the default agent is selected
+        so routing latency stays bounded.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous turn
+
+        Returns:
+            RoutingDecision: The selected agent, the confidence, whether it is
+                             the current agent and the source of the decision
+        """
+        started = time.perf_counter()
+        decision = self.detect_follow_up(query, current_agent_name) or self._route_locally(
+            query
+        )
+        if decision is None:
+            try:
+                decision = self._invoke_route(query)
+            except _UNAVAILABLE_ERRORS as e:
+                decision = self._fallback(e)
+        decision.continue_current = decision.agent_name == current_agent_name
+        self._record_decision(decision, time.perf_counter() - started)
+        return decision
+
+    async def adecide(self, query, current_agent_name=None):
+        """
+        Asynchronously determine which agent should handle the query.
+
+        This is the asyncio counterpart of decide, built on the model's
+        ainvoke method.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous turn
+
+        Returns:
+            RoutingDecision: The routing decision
+        """
+        started = time.perf_counter()
+        decision = self.detect_follow_up(query, current_agent_name) or self._route_locally(
+            query
+        )
+        if decision is None:
+            try:
+                decision = await self._ainvoke_route(query)
+            except _UNAVAILABLE_ERRORS as e:
+                decision = self._fallback(e)
+        decision.continue_current = decision.agent_name == current_agent_name
+        self._record_decision(decision, time.perf_counter() - started)
+        return decision
+
+    @staticmethod
+    def _record_decision(decision, duration):
+        """
+        Record the latency and outcome of a routing decision in the metrics.
+
+        Args:
+            decision (RoutingDecision): The routing decision
+            duration (float): Seconds it took to reach the decision
+        """
+        routing_latency.observe(duration, source=decision.source)
+        routing_decisions.inc(agent=decision.agent_name, source=decision.source)
+
     def route_query(self, query):
         """
         Determine which agent should handle the query.
 
         This method uses the language model to analyze the query content and
-        determine which specialized agent is best suited to handle it.
+        determine which specialized agent is best suited to handle it. Decisions
+        are served from the routing cache when the same (normalized) query was
+        routed before, and from the local classifier when it is confident.
 
         Args:
             query (str): The user's query
@@ -91,20 +639,385 @@ respond with 'GeneralAgent'.
         Returns:
             str: The name of the selected agent
         """
+        return self.decide(query).agent_name
+
+    async def aroute_query(self, query):
+        """
+        Asynchronously determine which agent should handle the query.
+
+        This is the asyncio counterpart of route_query, built on the model's
+        ainvoke method.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            str: The name of the selected agent
+        """
+        return (await self.adecide(query)).agent_name
+
+    def _build_ranking_messages(self, query, k):
+        """
+        Build the message list sent to the model to rank agents for a query.
+
+        Ranking replies span several lines, so they are requested from the
+        batch routing model, which is not limited to a single short line.
+
+        Args:
+            query (str): The user's query
+            k (int): Maximum number of agents to list
+
+        Returns:
+            list: The routing prompt with the ranking instructions, followed
+                  by the query
+        """
         messages = [
-            SystemMessage(content=self.routing_prompt),
+            SystemMessage(content=self.routing_prompt + RANKING_INSTRUCTIONS.format(k=k)),
             HumanMessage(content=query),
         ]
+        if uses_prompt_caching(self.batch_routing_model):
+            messages = add_cache_breakpoints(messages, 1)
+        return messages
 
-        response = self.model.invoke(messages)
-        return response.content.strip()
+    def _rank_locally(self, query, local_threshold):
+        """
+        Try to rank agents for the query without calling the language model.
+
+        A query the local classifier assigns to one agent with near certainty
+        needs no other agent, so it is ranked as that agent alone. The
+        threshold is far above the one of regular routing, because queries
+        spanning several agents, the ones fan-out exists for, often still
+        lean clearly towards one of them. The routing cache holds single
+        agents for the regular routing path and is not consulted.
+
+        Args:
+            query (str): The user's query
+            local_threshold (Optional[float]): Minimum classifier confidence
+                                               to select a single agent, or
+                                               None to always ask the model
+
+        Returns:
+            Optional[List[RoutingDecision]]: The single confident decision, or
+                                             None if the language model has to rank
+        """
+        self._refresh_routing_prompt()
+        self._count("queries")
+
+        if self.local_confidence_threshold is not None and local_threshold is not None:
+            agent_name, confidence = self.local_classifier.classify(query)
+            if agent_name is not None and confidence >= local_threshold:
+                self._count("local")
+                return [RoutingDecision(agent_name, confidence, source=SOURCE_LOCAL)]
+
+        self._count("model")
+        return None
+
+    def _parse_ranking(self, query, content, k, min_score):
+        """
+        Parse the agents and scores listed in a ranking reply.
+
+        Unknown agent names and repeated agents are skipped. Agents scoring
+        below min_score are dropped, except the best one. A reply without any
+        scored line is parsed as a regular routing reply.
+
+        Args:
+            query (str): The user's query
+            content (str): The reply of the model
+            k (int): Maximum number of agents to return
+            min_score (float): Minimum score of every agent but the best
+
+        Returns:
+            List[RoutingDecision]: Decisions from the best to the worst score
+        """
+        scores = {}
+        for line in content.splitlines():
+            match = _RANKED_LINE_RE.match(line)
+            if match and match.group(1) in self.agent_classes:
+                scores.setdefault(match.group(1), min(1.0, float(match.group(2))))
+        if not scores:
+            return [self._parse_route(query, content)]
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            RoutingDecision(agent_name, score, source=SOURCE_MODEL)
+            for position, (agent_name, score) in enumerate(ranked)
+            if position == 0 or score >= min_score
+        ]
+
+    def rank(
+        self,
+        query,
+        k=ROUTING_CONFIG["fan_out_top_k"],
+        min_score=ROUTING_CONFIG["fan_out_min_score"],
+        local_threshold=ROUTING_CONFIG["fan_out_local_confidence_threshold"],
+    ):
+        """
+        Select up to k agents that should handle the query, with scores.
+
+        This is used by fan-out execution for queries that span several
+        agents, such as "write Python to compute this integral". Queries the
+        local classifier assigns to one agent with at least local_threshold
+        confidence select that agent alone without calling the model. While
+        the model is unavailable, the default agent is selected alone.
+
+        Args:
+            query (str): The user's query
+            k (int): Maximum number of agents to select
+            min_score (float): Minimum score of every agent but the best
+            local_threshold (Optional[float]): Minimum classifier confidence
+                                               to skip ranking by the model,
+                                               or None to always ask the model
+
+        Returns:
+            List[RoutingDecision]: At least one decision, from the best to the
+                                   worst score
+        """
+        started = time.perf_counter()
+        decisions = self._rank_locally(query, local_threshold)
+        if decisions is None:
+            try:
+                response = self.batch_routing_model.invoke(
+                    self._build_ranking_messages(query, k)
+                )
+            except _UNAVAILABLE_ERRORS as e:
+                decisions = [self._fallback(e)]
+            except Exception:
+                llm_errors.inc(component="router")
+                raise
+            else:
+                record_usage("router", response)
+                decisions = self._parse_ranking(query, response.content, k, min_score)
+        self._record_decision(decisions[0], time.perf_counter() - started)
+        return decisions
+
+    async def arank(
+        self,
+        query,
+        k=ROUTING_CONFIG["fan_out_top_k"],
+        min_score=ROUTING_CONFIG["fan_out_min_score"],
+        local_threshold=ROUTING_CONFIG["fan_out_local_confidence_threshold"],
+    ):
+        """
+        Asynchronously select up to k agents that should handle the query.
+
+        This is the asyncio counterpart of rank, built on the model's ainvoke
+        method.
+
+        Args:
+            query (str): The user's query
+            k (int): Maximum number of agents to select
+            min_score (float): Minimum score of every agent but the best
+            local_threshold (Optional[float]): Minimum classifier confidence
+                                               to skip ranking by the model
+
+        Returns:
+            List[RoutingDecision]: At least one decision, from the best to the
+                                   worst score
+        """
+        started = time.perf_counter()
+        decisions = self._rank_locally(query, local_threshold)
+        if decisions is None:
+            try:
+                response = await self.batch_routing_model.ainvoke(
+                    self._build_ranking_messages(query, k)
+                )
+            except _UNAVAILABLE_ERRORS as e:
+                decisions = [self._fallback(e)]
+            except Exception:
+                llm_errors.inc(component="router")
+                raise
+            else:
+                record_usage("router", response)
+                decisions = self._parse_ranking(query, response.content, k, min_score)
+        self._record_decision(decisions[0], time.perf_counter() - started)
+        return decisions
+
+    def route_batch(
+        self,
+        queries,
+        mode="packed",
+        batch_size=ROUTING_CONFIG["batch_size"],
+        max_concurrency=ROUTING_CONFIG["batch_max_concurrency"],
+        max_retries=ROUTING_CONFIG["batch_max_retries"],
+        return_exceptions=False,
+    ):
+        """
+        Route many queries at once.
+
+        Queries that can be resolved from the routing cache or the local
+        classifier never reach the model. The remaining queries are routed in
+        one of two modes:
+        - "packed": up to batch_size queries are numbered and sent in a single
+          routing prompt, and one agent name per query is parsed from the reply.
+          Queries missing from the reply are retried individually.
+        - "concurrent": each query is routed with its own model call, keeping
+          at most max_concurrency calls in flight.
+
+        Failed model calls are retried with exponential backoff, except while
+        the model's circuit breaker is open or after a missed deadline, which
+        the model has already retried. Results are returned in input order.
+
+        Args:
+            queries (Iterable[str]): The queries to route
+            mode (str): Either "packed" or "concurrent"
+            batch_size (int): Number of queries per packed routing prompt
+            max_concurrency (int): Maximum number of model calls in flight
+            max_retries (int): Number of retries for a failed model call
+            return_exceptions (bool): If True, a query whose routing failed after
+                                     all retries yields its exception instead of
+                                     the default agent name
+
+        Returns:
+            list: The selected agent name (or exception) for each query
+        """
+        if mode not in ("packed", "concurrent"):
+            raise ValueError(f"Unknown batch routing mode: {mode!r}")
+
+        queries = list(queries)
+        results = [None] * len(queries)
+        pending = []
+        for index, query in enumerate(queries):
+            decision = self._route_locally(query)
+            if decision is not None:
+                results[index] = decision.agent_name
+            else:
+                pending.append(index)
+
+        if mode == "packed":
+            chunks = [
+                pending[start : start + batch_size]
+                for start in range(0, len(pending), batch_size)
+            ]
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                routed = executor.map(
+                    lambda chunk: self._route_packed(
+                        [queries[index] for index in chunk], max_retries
+                    ),
+                    chunks,
+                )
+                for chunk, names in zip(chunks, routed):
+                    for index, agent_name in zip(chunk, names):
+                        results[index] = agent_name
+            # Queries the packed replies did not cover fall back to single calls
+            pending = [index for index in pending if results[index] is None]
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            routed = executor.map(
+                lambda index: self._route_with_retries(queries[index], max_retries),
+                pending,
+            )
+            for index, agent_name in zip(pending, routed):
+                results[index] = agent_name
+
+        if not return_exceptions:
+            results = [
+                DEFAULT_AGENT_NAME if isinstance(result, Exception) else result
+                for result in results
+            ]
+        return results
+
+    def _route_with_retries(self, query, max_retries):
+        """
+        Route a single query with the model, retrying failed calls.
+
+        Args:
+            query (str): The user's query
+            max_retries (int): Number of retries after the first failed call
+
+        Returns:
+            Union[str, Exception]: The agent name, or the last exception if
+                                   every attempt failed
+        """
+        delay = ROUTING_CONFIG["batch_retry_backoff_seconds"]
+        for attempt in range(max_retries + 1):
+            try:
+                return self._invoke_route(query).agent_name
+            except Exception as e:
+                if attempt == max_retries or isinstance(e, _UNAVAILABLE_ERRORS):
+                    return e
+                time.sleep(delay * 2**attempt)
+
+    def _route_packed(self, queries, max_retries):
+        """
+        Route several queries with a single model call.
+
+        Args:
+            queries (List[str]): The queries to route together
+            max_retries (int): Number of retries after the first failed call
+
+        Returns:
+            list: The agent name for each query, or None for queries that could
+                  not be parsed from the reply
+        """
+        numbered = "\n".join(
+            f"{number}. {' '.join(query.split())}"
+            for number, query in enumerate(queries, start=1)
+        )
+        messages = [
+            SystemMessage(content=self.routing_prompt + BATCH_ROUTING_INSTRUCTIONS),
+            HumanMessage(content=numbered),
+        ]
+        if uses_prompt_caching(self.batch_routing_model):
+            messages = add_cache_breakpoints(messages, 1)
+
+        delay = ROUTING_CONFIG["batch_retry_backoff_seconds"]
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.batch_routing_model.invoke(messages)
+                break
+            except Exception as e:
+                if attempt == max_retries or isinstance(e, _UNAVAILABLE_ERRORS):
+                    return [None] * len(queries)
+                time.sleep(delay * 2**attempt)
+
+        results = [None] * len(queries)
+        for line in response.content.splitlines():
+            match = _BATCH_LINE_RE.match(line)
+            if not match:
+                continue
+            position = int(match.group(1)) - 1
+            agent_name = match.group(2)
+            if 0 <= position < len(queries) and agent_name in self.agent_classes:
+                results[position] = agent_name
+                self._store_route(queries[position], agent_name)
+        return results
+
+    def get_routing_stats(self):
+        """
+        Get statistics on how routing decisions were made.
+
+        Returns:
+            dict: Query counts per routing tier (follow_up, cache, local,
+                  model), fallbacks to the default agent, the fraction of queries resolved without calling the
+                  model and the routing cache statistics
+        """
+        with self._stats_lock:
+            stats = dict(self.routing_stats)
+        queries = stats["queries"]
+        stats["local_fraction"] = (
+            (stats["follow_up"] + stats["cache"] + stats["local"]) / queries
+            if queries
+            else 0.0
+        )
+        stats["cache_stats"] = self.routing_cache.get_stats()
+        return stats
+
+    def reset_session(self, session_id):
+        """
+        Discard the conversation histories of a session for all agents.
+
+        Args:
+            session_id (str): Identifier of the session
+        """
+        self.session_store.remove(session_id)
 
     def get_agent(self, name):
         """
         Get an agent instance by name.
 
-        This method retrieves the agent instance with the specified name.
-        If the requested agent doesn't exist, it falls back to the GeneralAgent.
+        This method retrieves the agent instance with the specified name,
+        instantiating the agent on first use. If the requested agent doesn't
+        exist, it falls back to the GeneralAgent.
 
         Args:
             name (str): The name of the agent to retrieve
@@ -112,4 +1025,21 @@ respond with 'GeneralAgent'.
         Returns:
             BaseAgent: The requested agent instance or GeneralAgent as fallback
         """
-        return self.agent_instances.get(name, self.agent_instances.get("GeneralAgent"))
+        # Cheap when the registry is unchanged; drops instances of replaced classes
+        self._refresh_routing_prompt()
+        agent = self.agent_instances.get(name)
+        if agent is not None:
+            return agent
+
+        if name not in self.agent_classes:
+            routing_fallbacks.inc(reason="unknown_agent")
+            name = DEFAULT_AGENT_NAME
+        with self._agents_lock:
+            agent = self.agent_instances.get(name)
+            if agent is None and name in self.agent_classes:
+                agent_class = self.agent_classes[name]
+                agent = agent_class(self._model_for(agent_class))
+                agent.session_store = self.session_store
+                agent.summary_model = self.summary_model
+                self.agent_instances[name] = agent
+            return agent
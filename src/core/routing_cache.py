@@ -0,0 +1,167 @@
+"""
+Routing Cache - Bounded cache for routing decisions.
+
+This module provides an LRU cache with time-based expiry for the decisions made
+by the router agent. Queries are normalized before lookup so that trivially
+different phrasings of the same request ("What is 2 + 2?" and "what is 2+2")
+share a single entry, and every key includes a hash of the routing prompt so
+that decisions made against an older set of agents are never reused.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.config.model_config import ROUTING_CONFIG
+
+# Whitespace runs collapse to a single space
+_WHITESPACE_RE = re.compile(r"\s+")
+# Whitespace next to a symbol carries no meaning ("2 + 2" == "2+2")
+_SYMBOL_SPACING_RE = re.compile(r"\s*([^\w\s])\s*")
+# Trailing punctuation does not change the intent of a query
+_TRAILING_PUNCTUATION = ".?!,;: "
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for use as a cache key.
+
+    The normalization applies Unicode NFKC folding, case folding, removes
+    whitespace around symbols, collapses remaining whitespace and strips
+    trailing punctuation.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        str: The normalized query
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    text = _SYMBOL_SPACING_RE.sub(r"\1", text)
+    return text.rstrip(_TRAILING_PUNCTUATION)
+
+
+def hash_prompt(prompt: str) -> str:
+    """
+    Compute a short, stable hash of a routing prompt.
+
+    Args:
+        prompt (str): The routing prompt
+
+    Returns:
+        str: Hex digest identifying the prompt
+    """
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RoutingCache:
+    """
+    Thread-safe LRU cache with TTL eviction for routing decisions.
+
+    Entries are keyed on the normalized query and the hash of the routing
+    prompt they were produced with. The cache keeps at most max_size entries,
+    evicting the least recently used entry first, and treats entries older than
+    ttl seconds as misses.
+
+    Any object providing the same get/put/clear/get_stats methods can be passed
+    to the RouterAgent in place of this class.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ROUTING_CONFIG["cache_max_size"],
+        ttl: Optional[float] = ROUTING_CONFIG["cache_ttl_seconds"],
+    ):
+        """
+        Initialize an empty routing cache.
+
+        Args:
+            max_size (int): Maximum number of cached decisions (0 disables caching)
+            ttl (Optional[float]): Seconds an entry stays valid, or None for no expiry
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query: str, prompt_hash: str) -> Optional[str]:
+        """
+        Look up the cached routing decision for a query.
+
+        Args:
+            query (str): The user's query
+            prompt_hash (str): Hash of the routing prompt currently in use
+
+        Returns:
+            Optional[str]: The cached agent name, or None on a miss
+        """
+        key = (prompt_hash, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                agent_name, expires_at = entry
+                if self.ttl is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return agent_name
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, query: str, prompt_hash: str, agent_name: str):
+        """
+        Store a routing decision for a query.
+
+        Args:
+            query (str): The user's query
+            prompt_hash (str): Hash of the routing prompt the decision was made with
+            agent_name (str): The selected agent name
+        """
+        if self.max_size <= 0:
+            return
+        key = (prompt_hash, normalize_query(query))
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (agent_name, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all cached decisions.
+
+        The hit, miss and eviction counters are preserved.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            Dict[str, float]: Size, hit, miss and eviction counts and the hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,165 @@
+"""
+Routing Decision - Structured routing results and follow-up detection.
+
+This module provides the data class returned by RouterAgent.decide, which
+carries the selected agent together with a confidence score and whether the
+query continues the conversation with the current agent. It also provides a
+cheap heuristic detector for follow-up turns such as "and now for n=5?", which
+lets the router keep the current agent without a routing call.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Where a routing decision came from
+SOURCE_FOLLOW_UP = "follow_up"
+SOURCE_CACHE = "cache"
+SOURCE_LOCAL = "local"
+SOURCE_MODEL = "model"
+SOURCE_FALLBACK = "fallback"
+
+# Openings that refer back to the previous turn
+_FOLLOW_UP_CUES = re.compile(
+    r"^(and|what about|how about|what if|same|again|instead|continue|go on|"
+    r"elaborate|explain (it|that|this)|can you (explain|elaborate|expand))\b"
+)
+
+# Openings common in follow-ups but also in queries that stand on their own,
+# such as "why is the sky blue" or "also, tell me a joke"
+_WEAK_FOLLOW_UP_CUES = re.compile(
+    r"^(also|but|so|then|now|or|ok|okay|thanks|thank you|why|how come|another|"
+    r"more|can you also)\b"
+)
+
+# Words that only make sense with the earlier conversation in mind
+_ANAPHORA = frozenset(
+    """it its that this these those them they their there same above previous
+    again instead too""".split()
+)
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+@dataclass
+class RoutingDecision:
+    """
+    Data class to store the result of routing a query.
+
+    Attributes:
+        agent_name (str): Name of the selected agent
+        confidence (float): Confidence in the decision, between 0.0 and 1.0
+        continue_current (bool): Whether the selected agent is the agent that
+                                 handled the previous turn
+        source (str): What produced the decision: "follow_up", "cache",
+                      "local", "model", or "fallback" when the model was
+                      unavailable
+    """
+
+    agent_name: str
+    confidence: float
+    continue_current: bool = False
+    source: str = SOURCE_MODEL
+
+
+class FollowUpDetector:
+    """
+    Heuristic scorer for follow-up turns.
+
+    A query scores higher the more it looks like a continuation: it opens with
+    a cue such as "and" or "what about", it refers back with words such as
+    "it" or "that", and it is short. Openings such as "why", "so" or "also"
+    start many standalone queries too, so they count for less. With the
+    default weights no single signal reaches the router's threshold: a cue
+    needs a short query or a word referring back as well. The score is
+    between 0.0 and 1.0.
+    """
+
+    def __init__(
+        self,
+        cue_weight: float = 0.5,
+        weak_cue_weight: float = 0.25,
+        anaphora_weight: float = 0.3,
+        short_weight: float = 0.2,
+        short_query_words: int = 6,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            cue_weight (float): Score added by an opening follow-up cue
+            weak_cue_weight (float): Score added by an opening that also starts
+                                     standalone queries
+            anaphora_weight (float): Score added by a word referring back
+            short_weight (float): Score added by a short query
+            short_query_words (int): Maximum number of words of a short query
+        """
+        self.cue_weight = cue_weight
+        self.weak_cue_weight = weak_cue_weight
+        self.anaphora_weight = anaphora_weight
+        self.short_weight = short_weight
+        self.short_query_words = short_query_words
+
+    def score(self, query: str) -> float:
+        """
+        Score how likely a query continues the previous turn.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            float: Follow-up score between 0.0 and 1.0
+        """
+        text = query.strip().lower()
+        score = 0.0
+        if _FOLLOW_UP_CUES.match(text):
+            score += self.cue_weight
+        elif _WEAK_FOLLOW_UP_CUES.match(text):
+            score += self.weak_cue_weight
+        if self._refers_back(text):
+            score += self.anaphora_weight
+        if self._is_short(text):
+            score += self.short_weight
+        return min(score, 1.0)
+
+    def stands_alone(self, query: str) -> bool:
+        """
+        Check whether a query can be understood without the previous turn.
+
+        A query stands alone when it is not short and has no word referring
+        back. A confident classification of such a query may override its
+        follow-up cues; a short or referring query, like "and now for n=5?",
+        depends on the conversation whatever it mentions.
+
+        Args:
+            query (str): The user's query
+
+        Returns:
+            bool: True if the query is self-contained
+        """
+        text = query.strip().lower()
+        return not self._refers_back(text) and not self._is_short(text)
+
+    @staticmethod
+    def _refers_back(text: str) -> bool:
+        """
+        Check whether lowercase text has a word referring back.
+
+        Args:
+            text (str): The lowercase query
+
+        Returns:
+            bool: True if a word such as "it" or "that" appears
+        """
+        return any(word in _ANAPHORA for word in _WORD_RE.findall(text))
+
+    def _is_short(self, text: str) -> bool:
+        """
+        Check whether text has at most short_query_words words.
+
+        Args:
+            text (str): The query
+
+        Returns:
+            bool: True for a short query
+        """
+        return len(text.split()) <= self.short_query_words
@@ -0,0 +1,260 @@
+"""
+Session Store - Per-session conversation state for multi-user serving.
+
+This module provides an in-memory store that keeps a separate conversation
+state for every (session, agent) pair, so that a single set of agent and model
+instances can serve many users without mixing their histories. Idle sessions
+are evicted in least-recently-used order when the store exceeds its session
+count or approximate memory cap. With a persistent history backend, evicted
+sessions stay on disk and are lazily reloaded on their next access. Only the
+most recently used sessions keep the message lists sent to the model; the
+others keep just their compact histories until they are accessed again.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, Optional
+
+from src.config.model_config import SESSION_CONFIG
+from .conversation_state import ConversationState
+from .history_backend import HistoryBackend
+
+
+@dataclass
+class Session:
+    """
+    Data class to store the state of one user session.
+
+    Attributes:
+        session_id (str): Identifier of the session
+        states (Dict[str, ConversationState]): Conversation state per agent name
+        last_access (float): time.monotonic() value of the last access
+        approx_bytes (int): Approximate memory held by the session's histories
+    """
+
+    session_id: str
+    states: Dict[str, ConversationState] = field(default_factory=dict)
+    last_access: float = field(default_factory=time.monotonic)
+    approx_bytes: int = 0
+
+
+class SessionStore:
+    """
+    Thread-safe, in-memory store of conversation states keyed by session.
+
+    Sessions are kept in least-recently-used order. Conversation states report
+    their size changes to the store, and whenever a session is accessed the
+    store evicts the least recently used sessions while the session count, the
+    approximate memory cap or the idle timeout is exceeded. Sessions that drop
+    out of the hot_sessions most recently used ones release the message views
+    of their conversation states.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_CONFIG["max_sessions"],
+        max_memory_bytes: Optional[int] = SESSION_CONFIG["max_memory_bytes"],
+        idle_timeout: Optional[float] = SESSION_CONFIG["idle_timeout_seconds"],
+        state_factory: Callable[[], ConversationState] = ConversationState,
+        backend: Optional[HistoryBackend] = None,
+        load_last_turns: Optional[int] = SESSION_CONFIG["load_last_turns"],
+        hot_sessions: Optional[int] = SESSION_CONFIG["hot_sessions"],
+    ):
+        """
+        Initialize an empty session store.
+
+        Args:
+            max_sessions (int): Maximum number of sessions kept in memory
+            max_memory_bytes (Optional[int]): Approximate memory cap for all
+                                              sessions, or None for no cap
+            idle_timeout (Optional[float]): Seconds after which an idle session
+                                            is evicted, or None for never
+            state_factory (Callable): Factory for new conversation states
+            backend (Optional[HistoryBackend]): Storage that conversation
+                                                states write through to
+            load_last_turns (Optional[int]): Number of persisted exchanges
+                                             loaded when a state is created
+            hot_sessions (Optional[int]): Number of most recently used sessions
+                                          whose states keep their message
+                                          views, or None for all sessions
+        """
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_timeout = idle_timeout
+        self.state_factory = state_factory
+        self.backend = backend
+        self.load_last_turns = load_last_turns
+        self.hot_sessions = hot_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._hot: "OrderedDict[str, Session]" = OrderedDict()
+        self._approx_bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Session:
+        """
+        Get a session, creating it if it does not exist.
+
+        Accessing a session marks it as most recently used and may evict
+        other idle sessions.
+
+        Args:
+            session_id (str): Identifier of the session
+
+        Returns:
+            Session: The session
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+                session.last_access = time.monotonic()
+            self._mark_hot(session)
+            self._evict(keep=session_id)
+            return session
+
+    def _mark_hot(self, session: Session):
+        """
+        Mark a session as hot and cool down the least recently used hot sessions.
+
+        Must be called with the lock held.
+
+        Args:
+            session (Session): The session being accessed
+        """
+        if self.hot_sessions is None:
+            return
+        self._hot[session.session_id] = session
+        self._hot.move_to_end(session.session_id)
+        while len(self._hot) > max(1, self.hot_sessions):
+            _, cold = self._hot.popitem(last=False)
+            for state in cold.states.values():
+                state.release_view()
+
+    def get_state(self, session_id: str, agent_name: str) -> ConversationState:
+        """
+        Get the conversation state of an agent within a session.
+
+        Args:
+            session_id (str): Identifier of the session
+            agent_name (str): Name of the agent
+
+        Returns:
+            ConversationState: The conversation state, created if necessary
+        """
+        with self._lock:
+            session = self.get(session_id)
+            state = session.states.get(agent_name)
+            if state is None:
+                state = self.state_factory()
+                if self.backend is not None:
+                    state.attach(self.backend, session_id, agent_name, self.load_last_turns)
+                state.on_resize = partial(self._on_resize, session)
+                session.states[agent_name] = state
+            return state
+
+    def _on_resize(self, session: Session, delta: int):
+        """
+        Account for a change in the size of one of a session's histories.
+
+        Args:
+            session (Session): The session owning the conversation state
+            delta (int): Change in approximate size in bytes
+        """
+        with self._lock:
+            session.approx_bytes += delta
+            if self._sessions.get(session.session_id) is session:
+                self._approx_bytes += delta
+
+    def reset(self, session_id: str, agent_name: Optional[str] = None):
+        """
+        Reset conversation history within a session.
+
+        Args:
+            session_id (str): Identifier of the session
+            agent_name (Optional[str]): Agent whose history to reset. If None,
+                                        the histories of all agents are reset
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            states = session.states.items() if session is not None else ()
+            for name, state in states:
+                if agent_name is None or name == agent_name:
+                    state.reset()
+            if self.backend is not None:
+                # Histories that are persisted but not loaded into memory
+                self.backend.clear(session_id, agent_name)
+
+    def remove(self, session_id: str):
+        """
+        Remove a session and all of its conversation states.
+
+        Persisted histories of the session are deleted as well.
+
+        Args:
+            session_id (str): Identifier of the session
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            self._hot.pop(session_id, None)
+            if session is not None:
+                self._approx_bytes -= session.approx_bytes
+            if self.backend is not None:
+                self.backend.clear(session_id)
+
+    def _evict(self, keep: str):
+        """
+        Evict least recently used sessions until all limits are respected.
+
+        Must be called with the lock held.
+
+        Args:
+            keep (str): Session that must not be evicted (the one being accessed)
+        """
+        deadline = (
+            time.monotonic() - self.idle_timeout if self.idle_timeout is not None else None
+        )
+        while len(self._sessions) > 1:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if oldest_id == keep:
+                break
+            over_count = len(self._sessions) > self.max_sessions
+            over_memory = (
+                self.max_memory_bytes is not None
+                and self._approx_bytes > self.max_memory_bytes
+            )
+            idle = deadline is not None and oldest.last_access < deadline
+            if not (over_count or over_memory or idle):
+                break
+            del self._sessions[oldest_id]
+            self._hot.pop(oldest_id, None)
+            self._approx_bytes -= oldest.approx_bytes
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get session store statistics.
+
+        Returns:
+            Dict[str, int]: Number of sessions and hot sessions, approximate
+                            memory use and number of evictions
+        """
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "hot_sessions": len(self._hot),
+                "approx_bytes": self._approx_bytes,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
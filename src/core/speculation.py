@@ -0,0 +1,302 @@
+"""
+Speculation - Run the current agent while the routing decision is in flight.
+
+In a multi-turn conversation the router usually re-selects the agent that
+handled the previous turn. This module provides an executor that starts the
+current agent's model call concurrently with routing. If routing confirms the
+agent, the speculative result is used and the turn costs roughly one model
+round trip instead of two. If routing selects another agent, the speculative
+call is cancelled and its result discarded; nothing is written to the
+conversation history until the agent is confirmed.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.config.model_config import ROUTING_CONFIG
+from .routing_decision import RoutingDecision
+
+# Marks the end of a speculatively streamed response
+_END_OF_STREAM = object()
+
+
+@dataclass
+class SpeculationStats:
+    """
+    Data class to store the outcome of speculative executions.
+
+    Attributes:
+        attempts (int): Turns on which the current agent was started speculatively
+        hits (int): Speculative results that routing confirmed
+        misses (int): Speculative results discarded because routing switched agents
+        latency_saved (float): Seconds of agent work that overlapped routing on hits
+        wasted_time (float): Seconds of agent work cancelled on misses
+    """
+
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    latency_saved: float = 0.0
+    wasted_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Get the fraction of speculative executions that routing confirmed.
+
+        Returns:
+            float: Hits divided by attempts, or 0.0 before the first attempt
+        """
+        return self.hits / self.attempts if self.attempts else 0.0
+
+    def record_hit(self, saved: float):
+        """
+        Record a confirmed speculative execution.
+
+        Args:
+            saved (float): Seconds of agent work that overlapped routing
+        """
+        self.attempts += 1
+        self.hits += 1
+        self.latency_saved += saved
+
+    def record_miss(self, wasted: float):
+        """
+        Record a discarded speculative execution.
+
+        Args:
+            wasted (float): Seconds the cancelled agent call had been running
+        """
+        self.attempts += 1
+        self.misses += 1
+        self.wasted_time += wasted
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Get the statistics as a dictionary.
+
+        Returns:
+            Dict[str, float]: All counters, the hit rate and the average
+                              latency saved per hit
+        """
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "latency_saved": self.latency_saved,
+            "avg_latency_saved": self.latency_saved / self.hits if self.hits else 0.0,
+            "wasted_time": self.wasted_time,
+        }
+
+
+class SpeculativeExecutor:
+    """
+    Routes a query and runs the selected agent, optionally speculating.
+
+    When speculation is enabled and a current agent is given, the current
+    agent's call is started together with the routing call. Otherwise, and for
+    turns the router recognizes as follow-ups without calling the model, the
+    executor routes first and then runs the selected agent, exactly like the
+    sequential flow.
+    """
+
+    def __init__(self, router, enabled: bool = ROUTING_CONFIG["speculative_execution"]):
+        """
+        Initialize the executor.
+
+        Args:
+            router (RouterAgent): The router that selects and creates agents
+            enabled (bool): Whether to start the current agent speculatively
+        """
+        self.router = router
+        self.enabled = enabled
+        self.stats = SpeculationStats()
+
+    async def _route_first(
+        self, query: str, current_agent_name: Optional[str]
+    ) -> Optional[RoutingDecision]:
+        """
+        Route a turn up front unless the current agent should start speculatively.
+
+        Turns the router recognizes locally as follow-ups need no routing call,
+        so there is nothing to overlap with and no speculation is attempted.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous turn
+
+        Returns:
+            Optional[RoutingDecision]: The routing decision, or None if the
+                                       current agent should run speculatively
+        """
+        decision = self.router.detect_follow_up(query, current_agent_name)
+        if decision is None and not (self.enabled and current_agent_name is not None):
+            decision = await self.router.adecide(query)
+        return decision
+
+    async def _cancel(self, task: asyncio.Task, started: float):
+        """
+        Cancel a speculative task and record the miss.
+
+        Args:
+            task (asyncio.Task): The speculative task
+            started (float): time.perf_counter() value when the task started
+        """
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            # The result is discarded anyway
+            pass
+        self.stats.record_miss(time.perf_counter() - started)
+
+    async def aroute_and_process(
+        self,
+        query: str,
+        current_agent_name: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """
+        Route a query and process it with the selected agent.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous
+                                                turn, which is started
+                                                speculatively
+            session_id (Optional[str]): Identifier of the session
+
+        Returns:
+            Tuple[str, str]: The selected agent name and its response
+        """
+        decision = await self._route_first(query, current_agent_name)
+        if decision is not None:
+            response = await self.router.get_agent(decision.agent_name).aprocess_query(
+                query, session_id
+            )
+            return decision.agent_name, response
+
+        agent = self.router.get_agent(current_agent_name)
+        timing = {}
+
+        async def run():
+            response = await agent.aprocess_query(query, session_id, commit=False)
+            timing["finished_at"] = time.perf_counter()
+            return response
+
+        started = time.perf_counter()
+        task = asyncio.ensure_future(run())
+        try:
+            agent_name = await self.router.aroute_query(query)
+        except BaseException:
+            await self._cancel(task, started)
+            raise
+        routed = time.perf_counter()
+
+        if agent_name != current_agent_name:
+            await self._cancel(task, started)
+            response = await self.router.get_agent(agent_name).aprocess_query(
+                query, session_id
+            )
+            return agent_name, response
+
+        response = await task
+        await agent.acommit_exchange(query, response, session_id)
+        # Agent work up to the routing decision ran in parallel with it
+        self.stats.record_hit(min(routed, timing["finished_at"]) - started)
+        return agent_name, response
+
+    async def aroute_and_stream(
+        self,
+        query: str,
+        current_agent_name: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> Tuple[str, AsyncIterator[str]]:
+        """
+        Route a query and stream the response of the selected agent.
+
+        While routing is in flight, chunks of the current agent's response are
+        buffered. If routing confirms the agent, the returned iterator replays
+        the buffer and continues with the live stream; the exchange is added to
+        the history once the stream completes.
+
+        Args:
+            query (str): The user's query
+            current_agent_name (Optional[str]): Agent that handled the previous
+                                                turn, which is started
+                                                speculatively
+            session_id (Optional[str]): Identifier of the session
+
+        Returns:
+            Tuple[str, AsyncIterator[str]]: The selected agent name and an
+                                            iterator over response chunks. The
+                                            selected agent does not start before
+                                            iteration unless it was speculated
+        """
+        decision = await self._route_first(query, current_agent_name)
+        if decision is not None:
+            agent = self.router.get_agent(decision.agent_name)
+            return decision.agent_name, agent.astream_query(query, session_id)
+
+        agent = self.router.get_agent(current_agent_name)
+        buffer: asyncio.Queue = asyncio.Queue()
+        chunks = []
+        timing = {}
+
+        async def pump():
+            try:
+                async for chunk in agent.astream_query(query, session_id, commit=False):
+                    chunks.append(chunk)
+                    buffer.put_nowait(chunk)
+            except Exception as e:
+                # Re-raised by the consumer once the routing decision is known
+                buffer.put_nowait(e)
+                return
+            timing["finished_at"] = time.perf_counter()
+            buffer.put_nowait(_END_OF_STREAM)
+
+        started = time.perf_counter()
+        task = asyncio.ensure_future(pump())
+        try:
+            agent_name = await self.router.aroute_query(query)
+        except BaseException:
+            await self._cancel(task, started)
+            raise
+        routed = time.perf_counter()
+
+        if agent_name != current_agent_name:
+            await self._cancel(task, started)
+            return agent_name, self.router.get_agent(agent_name).astream_query(
+                query, session_id
+            )
+
+        self.stats.record_hit(min(routed, timing.get("finished_at", routed)) - started)
+
+        async def replay():
+            try:
+                while True:
+                    chunk = await buffer.get()
+                    if chunk is _END_OF_STREAM:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+            finally:
+                # Stop the model call if the consumer gives up early
+                task.cancel()
+            await agent.acommit_exchange(query, "".join(chunks), session_id)
+
+        return agent_name, replay()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get speculation statistics.
+
+        Returns:
+            Dict[str, float]: Attempts, hits, misses, hit rate and latency
+                              saved and wasted in seconds
+        """
+        return self.stats.as_dict()
@@ -0,0 +1,75 @@
+"""
+Streaming - Timing statistics for streamed model responses.
+
+This module provides a data class that records latency and throughput figures
+for a single streamed response, such as time-to-first-token and tokens per
+second.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class StreamStats:
+    """
+    Data class to store timing statistics of a streamed response.
+
+    Attributes:
+        started_at (float): time.perf_counter() value when the request was sent
+        time_to_first_token (Optional[float]): Seconds until the first non-empty
+                                               chunk arrived
+        duration (Optional[float]): Seconds until the stream finished
+        output_tokens (int): Number of generated tokens, taken from the usage
+                             metadata when available and otherwise the number
+                             of non-empty chunks
+        completed (bool): Whether the stream ran to completion
+    """
+
+    started_at: float = field(default_factory=time.perf_counter)
+    time_to_first_token: Optional[float] = None
+    duration: Optional[float] = None
+    output_tokens: int = 0
+    completed: bool = False
+
+    def record_chunk(self, content):
+        """
+        Record the arrival of a streamed chunk.
+
+        Args:
+            content (str): The text content of the chunk
+        """
+        if not content:
+            return
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.started_at
+        self.output_tokens += 1
+
+    def finish(self, usage_metadata=None):
+        """
+        Mark the stream as completed.
+
+        Args:
+            usage_metadata (Optional[dict]): Usage metadata of the assembled
+                                             message, if the model reported it
+        """
+        self.duration = time.perf_counter() - self.started_at
+        if usage_metadata and usage_metadata.get("output_tokens"):
+            self.output_tokens = usage_metadata["output_tokens"]
+        self.completed = True
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """
+        Get the generation throughput after the first token.
+
+        Returns:
+            Optional[float]: Tokens per second, or None if it cannot be computed
+        """
+        if self.duration is None or self.time_to_first_token is None:
+            return None
+        generation_time = self.duration - self.time_to_first_token
+        if generation_time <= 0:
+            return None
+        return self.output_tokens / generation_time
@@ -6,15 +6,24 @@ This script runs the interactive router agent that routes queries to specialized
 It provides a command-line interface for users to interact with the multi-agent system.
 """
 
+import asyncio
+
 from src.core.router_agent import RouterAgent
-from src.config.model_config import DEFAULT_REGION, DEFAULT_MODEL_ID
+from src.core.metrics import start_metrics_server
+from src.core.speculation import SpeculativeExecutor
+from src.config.model_config import (
+    DEFAULT_REGION,
+    DEFAULT_MODEL_ID,
+    METRICS_CONFIG,
+    ROUTING_CONFIG,
+)
 
 
-def main():
+async def amain():
     """
-    Run the interactive router agent.
+    Run the interactive router agent on an asyncio event loop.
 
-    This function:
+    This coroutine:
     1. Creates a router agent
     2. Enters an interactive loop to process user queries
     3. Routes queries to specialized agents based on content
@@ -22,11 +31,23 @@ def main():
     5. Handles special commands like 'exit' and 'reset'
     6. Automatically detects intent changes and reroutes to appropriate agents
 
+    User input is read in a worker thread and model calls are awaited, so the
+    event loop stays free to serve other tasks while a turn is in flight. With
+    speculative execution enabled in ROUTING_CONFIG, the current agent starts
+    answering while the turn is being routed; its hit rate and the latency
+    saved are printed on exit.
+
     Returns:
         None
     """
+    # Expose metrics for scraping if an endpoint is configured
+    if METRICS_CONFIG["http_port"] is not None:
+        host, port = start_metrics_server().server_address[:2]
+        print(f"Serving metrics at http://{host}:{port}/metrics")
+
     # Initialize the router agent with default configuration
     router = RouterAgent(region_name=DEFAULT_REGION, model_id=DEFAULT_MODEL_ID)
+    executor = SpeculativeExecutor(router, ROUTING_CONFIG["speculative_execution"])
     current_agent = None
     current_agent_name = None
 
@@ -39,8 +60,8 @@ def main():
 
     # Main interaction loop
     while True:
-        # Get user input
-        query = input("\nYou: ")
+        # Get user input without blocking the event loop
+        query = await asyncio.to_thread(input, "\nYou: ")
 
         # Handle special commands
         if query.lower() == "exit":
@@ -53,9 +74,12 @@ def main():
                 current_agent_name = None
             continue
 
-        # Check if intent has changed by asking router to analyze the query
-        new_agent_name = router.route_query(query)
-        
+        # Check if intent has changed by asking router to analyze the query,
+        # possibly while the current agent already starts answering
+        new_agent_name, tokens = await executor.aroute_and_stream(
+            query, current_agent_name
+        )
+
         # If this is a new conversation or intent has changed, route to appropriate agent
         if not current_agent or new_agent_name != current_agent_name:
             # If we're switching agents, reset the previous agent's conversation
@@ -64,13 +88,35 @@ def main():
                 print(f"Intent change detected. Switching from {current_agent_name} to {new_agent_name}")
             else:
                 print(f"Routing to {new_agent_name}")
-                
+
             current_agent = router.get_agent(new_agent_name)
             current_agent_name = new_agent_name
 
-        # Process the query with the current agent
-        response = current_agent.process_query(query)
-        print(f"\nAgent: {response}")
+        # Process the query with the current agent, printing tokens as they arrive
+        print("\nAgent: ", end="", flush=True)
+        async for token in tokens:
+            print(token, end="", flush=True)
+        print()
+
+    if executor.enabled:
+        stats = executor.get_stats()
+        print(
+            f"Speculation hit rate: {stats['hit_rate']:.0%} of {stats['attempts']} turns, "
+            f"{stats['latency_saved']:.2f}s saved"
+        )
+
+
+def main():
+    """
+    Run the interactive router agent.
+
+    This function starts the asyncio driver implemented by amain and blocks
+    until the user exits.
+
+    Returns:
+        None
+    """
+    asyncio.run(amain())
 
 
 if __name__ == "__main__":
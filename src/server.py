@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+MultiAgentRegistryKit - Server Mode
+
+This module exposes a shared RouterAgent over HTTP as a plain ASGI application,
+so it can be served by any ASGI server (for example uvicorn) without extra
+framework dependencies. Endpoints:
+- POST /route  {"query", "session_id"?}  -> the routing decision
+- POST /query  {"query", "session_id"?, "fan_out"?}
+                                          -> the selected agent and its response
+- POST /stream {"query", "session_id"?}  -> the response as server-sent events
+- GET  /health                            -> admission statistics
+- GET  /metrics                           -> metrics in the OpenMetrics format
+
+Conversation histories are kept per session ID and the agent that handled a
+session's previous turn is remembered, so follow-up turns can skip routing.
+With "fan_out" set, /query sends the query to the top-ranked agents at once
+and merges their answers (see FanOutExecutor).
+Requests without a session ID are processed in a throwaway session.
+At most max_in_flight requests are processed at a time; further requests wait
+for a slot, and are shed with 429 when the wait queue is full or 503 when the
+wait times out. Requests that need a model whose circuit breaker is open get
+503, and requests whose model call misses its deadline get 504. Any other
+error is answered with a JSON 500 and printed. Local answers, symbolic math and
+history summarization run in worker threads, so they do not block the event
+loop.
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import Optional
+
+from src.config.model_config import SERVER_CONFIG, SESSION_CONFIG
+from src.core.admission import AdmissionController, Overloaded
+from src.core.fan_out import FanOutExecutor
+from src.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from src.core.resilience import CircuitOpenError, DeadlineExceeded
+from src.core.router_agent import RouterAgent
+from src.core.speculation import SpeculativeExecutor
+
+
+class HTTPError(Exception):
+    """
+    Error answered with an HTTP status code and a JSON error message.
+    """
+
+    def __init__(self, status: int, message: str, headers=()):
+        """
+        Initialize the error.
+
+        Args:
+            status (int): HTTP status code
+            message (str): Error message
+            headers: Additional (name, value) response headers
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+class AgentServer:
+    """
+    ASGI application serving a shared RouterAgent.
+
+    Instances are ASGI callables: pass one to an ASGI server as the app.
+    """
+
+    def __init__(
+        self,
+        router: Optional[RouterAgent] = None,
+        admission: Optional[AdmissionController] = None,
+        max_body_bytes: int = SERVER_CONFIG["max_body_bytes"],
+        max_sessions: int = SESSION_CONFIG["max_sessions"],
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            router (Optional[RouterAgent]): The shared router. Defaults to a
+                                            new RouterAgent
+            admission (Optional[AdmissionController]): Limits concurrent
+                                            requests. Defaults to one configured
+                                            from SERVER_CONFIG
+            max_body_bytes (int): Maximum accepted request body size
+            max_sessions (int): Maximum number of sessions whose current agent
+                                is remembered
+        """
+        self.router = router if router is not None else RouterAgent()
+        self.executor = SpeculativeExecutor(self.router)
+        self.fan_out = FanOutExecutor(self.router)
+        self.admission = admission
+        self.max_body_bytes = max_body_bytes
+        self.max_sessions = max_sessions
+        # Agent that handled the previous turn of each session
+        self.current_agents: "OrderedDict[str, str]" = OrderedDict()
+        # Turns of one session are processed one at a time
+        self._session_locks = weakref.WeakValueDictionary()
+        self._routes = {
+            ("POST", "/route"): self.handle_route,
+            ("POST", "/query"): self.handle_query,
+            ("POST", "/stream"): self.handle_stream,
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/metrics"): self.handle_metrics,
+        }
+
+    async def __call__(self, scope, receive, send):
+        """
+        Handle an ASGI connection.
+
+        Args:
+            scope (dict): The connection scope
+            receive: Awaitable returning the next ASGI event
+            send: Awaitable sending an ASGI event
+        """
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        # The admission controller is bound to the server's event loop
+        if self.admission is None:
+            self.admission = AdmissionController()
+
+        # Whether the status line is sent, after which no error response can be
+        response_started = False
+
+        async def send_tracked(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        handler = self._routes.get((scope["method"], scope["path"]))
+        try:
+            if handler is None:
+                if any(path == scope["path"] for _, path in self._routes):
+                    raise HTTPError(405, "Method not allowed")
+                raise HTTPError(404, "Not found")
+            await handler(scope, receive, send_tracked)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"error": e.message}, e.headers)
+        except Overloaded as e:
+            status = 429 if e.reason == "queue_full" else 503
+            headers = [(b"retry-after", str(int(e.retry_after)).encode())]
+            await self._send_json(send, status, {"error": str(e)}, headers)
+        except CircuitOpenError as e:
+            await self._send_json(send, 503, {"error": str(e)})
+        except DeadlineExceeded as e:
+            await self._send_json(send, 504, {"error": str(e)})
+        except Exception as e:
+            print(f"Error handling {scope['method']} {scope['path']}: {e}")
+            if response_started:
+                raise
+            await self._send_json(send, 500, {"error": "Internal server error"})
+
+    async def _lifespan(self, receive, send):
+        """
+        Answer ASGI lifespan events.
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_json(self, receive) -> dict:
+        """
+        Read and decode a JSON request body.
+
+        Args:
+            receive: Awaitable returning the next ASGI event
+
+        Returns:
+            dict: The decoded body
+
+        Raises:
+            HTTPError: If the body is too large or not a JSON object with a query
+        """
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+            if len(body) > self.max_body_bytes:
+                raise HTTPError(413, "Request body too large")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON") from None
+        if not isinstance(payload, dict) or not isinstance(payload.get("query"), str):
+            raise HTTPError(400, "Request body must be a JSON object with a 'query'")
+        session_id = payload.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            raise HTTPError(400, "'session_id' must be a string")
+        return payload
+
+    @staticmethod
+    async def _send_json(send, status: int, payload, headers=()):
+        """
+        Send a complete JSON response.
+
+        Args:
+            send: Awaitable sending an ASGI event
+            status (int): HTTP status code
+            payload: JSON-serializable response body
+            headers: Additional (name, value) response headers
+        """
+        body = json.dumps(payload).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @asynccontextmanager
+    async def _session(self, session_id: Optional[str]):
+        """
+        Process one turn of a session, after any earlier turn has finished.
+
+        Without a session ID, a throwaway session is created and discarded
+        when the turn ends.
+
+        Args:
+            session_id (Optional[str]): Identifier of the session
+
+        Yields:
+            str: The session ID to process the turn with
+        """
+        if session_id is None:
+            session_id = f"anonymous-{uuid.uuid4().hex}"
+            try:
+                yield session_id
+            finally:
+                self.router.reset_session(session_id)
+            return
+
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[session_id] = lock
+        async with lock:
+            yield session_id
+
+    def _remember_agent(self, session_id: Optional[str], agent_name: str):
+        """
+        Remember the agent that handled a session's latest turn.
+
+        Args:
+            session_id (Optional[str]): Identifier of the session
+            agent_name (str): Name of the agent
+        """
+        if session_id is None:
+            return
+        self.current_agents[session_id] = agent_name
+        self.current_agents.move_to_end(session_id)
+        while len(self.current_agents) > self.max_sessions:
+            self.current_agents.popitem(last=False)
+
+    async def handle_route(self, scope, receive, send):
+        """
+        Route a query without processing it.
+        """
+        payload = await self._read_json(receive)
+        async with self.admission.admit():
+            current = self.current_agents.get(payload.get("session_id"))
+            decision = await self.router.adecide(payload["query"], current)
+        await self._send_json(
+            send,
+            200,
+            {
+                "agent": decision.agent_name,
+                "confidence": decision.confidence,
+                "continue_current": decision.continue_current,
+                "source": decision.source,
+            },
+        )
+
+    async def handle_query(self, scope, receive, send):
+        """
+        Route a query and return the selected agent's complete response, or
+        the merged response of several agents if "fan_out" is set.
+        """
+        payload = await self._read_json(receive)
+        requested = payload.get("session_id")
+        async with self.admission.admit(), self._session(requested) as session_id:
+            if payload.get("fan_out"):
+                agent_name, response = await self.fan_out.aroute_and_process(
+                    payload["query"], session_id
+                )
+            else:
+                agent_name, response = await self.executor.aroute_and_process(
+                    payload["query"], self.current_agents.get(requested), session_id
+                )
+            self._remember_agent(requested, agent_name)
+        await self._send_json(send, 200, {"agent": agent_name, "response": response})
+
+    async def handle_stream(self, scope, receive, send):
+        """
+        Route a query and stream the selected agent's response as server-sent
+        events: an "agent" event, one "message" event per chunk and a "done"
+        event.
+        """
+        payload = await self._read_json(receive)
+        requested = payload.get("session_id")
+        async with self.admission.admit(), self._session(requested) as session_id:
+            agent_name, tokens = await self.executor.aroute_and_stream(
+                payload["query"], self.current_agents.get(requested), session_id
+            )
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                    ],
+                }
+            )
+            await self._send_event(send, "agent", agent_name)
+            try:
+                async for token in tokens:
+                    await self._send_event(send, "message", token)
+            except Exception as e:
+                # The status line is already sent, so report the error in-band
+                await self._send_event(send, "error", str(e))
+            else:
+                self._remember_agent(requested, agent_name)
+                await self._send_event(send, "done", "")
+            await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _send_event(send, event: str, data: str):
+        """
+        Send one server-sent event.
+
+        Args:
+            send: Awaitable sending an ASGI event
+            event (str): Event name
+            data (str): Event data, JSON-encoded so it fits on one line
+        """
+        body = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def handle_health(self, scope, receive, send):
+        """
+        Report admission, speculation and fan-out statistics.
+        """
+        await self._send_json(
+            send,
+            200,
+            {
+                "status": "ok",
+                "admission": self.admission.get_stats(),
+                "speculation": self.executor.get_stats(),
+                "fan_out": self.fan_out.get_stats(),
+                "sessions": len(self.current_agents),
+            },
+        )
+
+    async def handle_metrics(self, scope, receive, send):
+        """
+        Serve the process-wide metrics.
+        """
+        body = metrics.render().encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", METRICS_CONTENT_TYPE.encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_app(router: Optional[RouterAgent] = None, **kwargs) -> AgentServer:
+    """
+    Create the ASGI application.
+
+    Args:
+        router (Optional[RouterAgent]): The shared router. Defaults to a new
+                                        RouterAgent
+        **kwargs: Further arguments of AgentServer
+
+    Returns:
+        AgentServer: The ASGI application
+    """
+    return AgentServer(router, **kwargs)
+
+
+def main():
+    """
+    Serve the application with uvicorn.
+
+    uvicorn is an optional dependency of the server mode; any other ASGI server
+    can serve create_app() as well. With --fake-model, the deterministic fake
+    model from the benchmarks package is used, so the server can be tried
+    locally without AWS access.
+    """
+    parser = argparse.ArgumentParser(description="Serve the router over HTTP.")
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument(
+        "--max-in-flight", type=int, default=SERVER_CONFIG["max_in_flight"]
+    )
+    parser.add_argument("--max-queue", type=int, default=SERVER_CONFIG["max_queue"])
+    parser.add_argument(
+        "--queue-timeout", type=float, default=SERVER_CONFIG["queue_timeout_seconds"]
+    )
+    parser.add_argument(
+        "--fake-model",
+        action="store_true",
+        help="Use the fake model of the benchmarks package instead of Bedrock",
+    )
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("Server mode requires uvicorn: pip install uvicorn")
+        return
+
+    model = None
+    if args.fake_model:
+        from benchmarks.fake_model import FakeModelProvider
+
+        model = FakeModelProvider(latency=0.05, tokens_per_second=100).create_model()
+
+    app = create_app(
+        RouterAgent(model=model),
+        admission=AdmissionController(
+            args.max_in_flight, args.max_queue, args.queue_timeout
+        ),
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()